@@ -1,266 +1,99 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import base64
-import requests
-import time
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import folium
-from streamlit_folium import st_folium
-import hashlib
+import numpy as np
+import math
+import os
 from datetime import timedelta
+from snapshot import DATASET_PATH, load_dataset
+from store import HotelStore
+from hotel_index import PRICE_BANDS, band_range
+from ranking import DEFAULT_WEIGHTS
+from weather import WeatherClient, WeatherPrefetcher
+from geocode import GEOCODE_DB, GeocodeStore
+from results_map import create_results_map
+from query_cache import query_key
+from render import render_weather
+from assets import HERO_IMAGE, hero_background_css, load_assets
+from engine import RecommendationEngine
+from reload import DatasetReloader
+from metrics import REGISTRY, end_trace, gauges_from, start_trace, timed
 
-# Download VADER lexicon
-nltk.download('vader_lexicon', quiet=True)
+# Function to get the weather client shared by all sessions (pooled connections, TTL cache)
+@st.cache_resource
+def get_weather_client():
+    return WeatherClient(cache_dir=os.environ.get("WEATHER_CACHE_DIR"))
 
-# Initialize Sentiment Analyzer
-sia = SentimentIntensityAnalyzer()
+# Function to start the per-process background weather refresher for every destination;
+# a dataset reload retargets it rather than starting another
+@st.cache_resource
+def start_weather_prefetcher():
+    reloader = get_dataset_reloader()
+    prefetcher = WeatherPrefetcher(get_weather_client(), reloader.engine.destinations)
+    prefetcher.start()
+    reloader.on_reload(lambda engine: prefetcher.set_cities(engine.destinations))
+    return prefetcher
 
-# Function to get real-time weather data
-def get_weather(city):
-    API_KEY = "7a2bc514b43fc8dc820ae1566673cf29"
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={API_KEY}&units=metric"
+# Function to get the header background CSS (optimised image built once per process, served as a static file)
+@st.cache_resource
+def get_hero_background_css():
     try:
-        response = requests.get(url).json()
-        if response.get("cod") == 200:
-            weather = {
-                "Temperature": f"{response['main']['temp']}°C",
-                "Condition": response["weather"][0]["description"].capitalize(),
-                "Humidity": f"{response['main']['humidity']}%",
-                "Wind Speed": f"{response['wind']['speed']} m/s"
-            }
-            # Get weather icon
-            icon_code = response["weather"][0]["icon"]
-            weather_icon = f"https://openweathermap.org/img/wn/{icon_code}@2x.png"
-            return weather, weather_icon
-        else:
-            return {"Error": "Weather data not available"}, None
+        manifest = load_assets(HERO_IMAGE)
+        return hero_background_css(manifest, serve_static=st.get_option("server.enableStaticServing"))
     except Exception as e:
-        return {"Error": f"Failed to fetch data: {str(e)}"}, None
-
-# Function to encode image in base64
-def get_base64_image(image_path):
-    try:
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode()
-    except FileNotFoundError:
-        st.error(f"Error: File not found at {image_path}")
+        st.error(f"Error preparing header image {HERO_IMAGE}: {str(e)}")
         return ""
 
-# Function to load dataset
-@st.cache_data
-def load_data():
+# Function to open the persistent coordinate store once per process
+@st.cache_resource
+def get_geocode_store():
     try:
-        file_path = "Dataset.xlsx"
-        df = pd.read_excel(file_path)
-        # Ensure sentiment_score is numeric
-        df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce")
-        # Ensure Price Column is Numeric
-        df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
-        return df
+        return GeocodeStore(GEOCODE_DB)
     except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame()
+        st.warning(f"Could not open coordinate store {GEOCODE_DB}: {str(e)}")
+        return None
 
-# Function to get hotel coordinates using a geocoding API
-@st.cache_data
-def get_hotel_coordinates(hotel_name, city_name):
+# Function to get the dataset reloader shared by all sessions. It loads the dataset into the shared,
+# read-only hotel store (once per process, handed out by reference) and holds the current engine; with
+# DATASET_RELOAD_INTERVAL set it swaps in a new one when the workbook changes. Only the reloader keeps
+# the store, so a superseded version is freed once the requests still using it finish.
+@st.cache_resource
+def get_dataset_reloader():
     try:
-        # Use Nominatim (OpenStreetMap) geocoding service
-        base_url = "https://nominatim.openstreetmap.org/search"
-        search_term = f"{hotel_name}, {city_name}"
-        params = {
-            "q": search_term,
-            "format": "json",
-            "limit": 1,
-        }
-        
-        # Add a user agent to comply with Nominatim's usage policy
-        headers = {
-            "User-Agent": "SmartAccommodationFinderApp/1.0"
-        }
-        
-        response = requests.get(base_url, params=params, headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data and len(data) > 0:
-                return [float(data[0]["lat"]), float(data[0]["lon"])]
-        
-        # Fallback to city center coordinates with small random offsets if geocoding fails
-        return fallback_coordinates(hotel_name, city_name)
-    
+        # Reads the Arrow snapshot; only parses the workbook when the snapshot is stale
+        with timed("load_data"):
+            store = HotelStore(load_dataset(DATASET_PATH), DATASET_PATH)
     except Exception as e:
-        st.warning(f"Could not geocode {hotel_name} in {city_name}: {str(e)}")
-        return fallback_coordinates(hotel_name, city_name)
-
-# Fallback function to use when geocoding fails
-def fallback_coordinates(hotel_name, city_name):
-    # City base coordinates
-    city_coordinates = {
-        "Manali": [32.2396, 77.1887],
-        "Darjeeling": [27.0410, 88.2663],
-        "Munnar": [10.0889, 77.0595]
-    }
-    center_lat, center_lon = city_coordinates.get(city_name, [20.5937, 78.9629])
-    
-    # Add a small random offset (but cache it based on hotel name for consistency)
-    hash_obj = hashlib.md5(hotel_name.encode())
-    hash_hex = hash_obj.hexdigest()
-    
-    # Use the hash to create small offsets (between -0.002 and 0.002)
-    offset_multiplier = int(hash_hex[:8], 16) / (16**8)
-    lat_offset = (offset_multiplier * 0.004) - 0.002
-    
-    offset_multiplier = int(hash_hex[8:16], 16) / (16**8)
-    lon_offset = (offset_multiplier * 0.004) - 0.002
-    
-    return [center_lat + lat_offset, center_lon + lon_offset]
-
-# Function to create Folium map for a single hotel (cached to prevent regeneration)
-@st.cache_data
-def create_single_hotel_map(hotel_name, hotel_price, hotel_ratings, sentiment_score, city_name):
-    # Create a base map centered on the city
-    city_coordinates = {
-        "Manali": [32.2396, 77.1887],
-        "Darjeeling": [27.0410, 88.2663],
-        "Munnar": [10.0889, 77.0595]
-    }
-    center_lat, center_lon = city_coordinates.get(city_name, [20.5937, 78.9629])
-    
-    # Get more accurate coordinates for this hotel
-    hotel_lat, hotel_lon = get_hotel_coordinates(hotel_name, city_name)
-    
-    # Center the map on the hotel instead of the city center
-    m = folium.Map(location=[hotel_lat, hotel_lon], zoom_start=15, 
-                   tiles="CartoDB positron")
-    
-    # Use sentiment score to determine marker color
-    if sentiment_score >= 0.75:
-        color = 'green'
-    elif sentiment_score >= 0.5:
-        color = 'blue'
-    else:
-        color = 'orange'
-    
-    # Create a popup with hotel info
-    popup_html = f"""
-    <div style="width: 250px; font-family: 'Arial', sans-serif;">
-        <h4 style="color: #2C3E50; margin-bottom: 10px;">{hotel_name}</h4>
-        <p style="margin: 5px 0;"><b style="color: #2980B9;">Price:</b> ₹{hotel_price:,}</p>
-        <p style="margin: 5px 0;"><b style="color: #2980B9;">Rating:</b> {hotel_ratings}</p>
-        <p style="margin: 5px 0;"><b style="color: #2980B9;">Sentiment:</b> {sentiment_score:.2f}</p>
-    </div>
-    """
-    
-    # Add a marker with custom icon and popup
-    folium.Marker(
-        location=[hotel_lat, hotel_lon],
-        popup=folium.Popup(popup_html, max_width=300),
-        tooltip=hotel_name,
-        icon=folium.Icon(color=color, icon="hotel", prefix="fa")
-    ).add_to(m)
-    
-    return m
-
-# Generate sentiment description based on score
-def get_sentiment_description(score):
-    if score >= 0.8:
-        return "Excellent", "Guests absolutely love this hotel!"
-    elif score >= 0.7:
-        return "Very Good", "Very positive guest experiences reported"
-    elif score >= 0.6:
-        return "Good", "Guests generally have positive experiences"
-    elif score >= 0.5:
-        return "Satisfactory", "Mixed reviews with positive experiences"
-    else:
-        return "Mixed", "Some guests had concerns about their stay"
-
-# Function to get amenity icons
-def get_amenity_icon(amenity):
-    amenity = amenity.strip().lower()
-    icons = {
-        "wifi": "wifi",
-        "swimming pool": "swimming-pool",
-        "pool": "swimming-pool",
-        "parking": "parking",
-        "spa": "spa",
-        "gym": "dumbbell",
-        "fitness": "dumbbell",
-        "restaurant": "utensils",
-        "bar": "glass-martini",
-        "breakfast": "coffee",
-        "air conditioning": "snowflake",
-        "air conditioner": "snowflake",
-        "ac": "snowflake",
-        "pet friendly": "paw",
-        "beach": "umbrella-beach",
-        "room service": "concierge-bell",
-        "laundry": "tshirt",
-        "tv": "tv",
-        "balcony": "door-open"
-    }
-    
-    for key, icon in icons.items():
-        if key in amenity:
-            return icon
-    
-    return "check-circle"  # Default icon
-
-# Custom card for hotel display
-def create_hotel_card(hotel, rank=None):
-    name = hotel['Hotel Name']
-    price = hotel['Price']
-    rating = hotel['Ratings']
-    sentiment = hotel['sentiment_score']
-    destination = hotel['Destination']
-    
-    # Handle different formats of amenities
-    if isinstance(hotel['Amenities'], str):
-        amenities = hotel['Amenities'].split(',')
-    elif isinstance(hotel['Amenities'], list):
-        amenities = hotel['Amenities']
-    else:
-        amenities = []
-    
-    sentiment_label, sentiment_desc = get_sentiment_description(sentiment)
-    
-    # Card header with rank
-    rank_emoji = ""
-    if rank == 0:
-        rank_emoji = "🥇 "
-    elif rank == 1:
-        rank_emoji = "🥈 "
-    elif rank == 2:
-        rank_emoji = "🥉 "
-    
-    # HTML/CSS for styled card
-    card_html = f"""
-    <div style="background-color: white; border-radius: 10px; padding: 15px; margin-bottom: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-        <h3 style="color: #1E3A8A; margin-top: 0;">{rank_emoji}{name}</h3>
-        <div style="display: flex; margin-bottom: 10px;">
-            <div style="background-color: #3B82F6; color: white; font-weight: bold; padding: 3px 10px; border-radius: 15px; margin-right: 10px;">
-                ₹{price:,}
-            </div>
-            <div style="background-color: #10B981; color: white; font-weight: bold; padding: 3px 10px; border-radius: 15px; margin-right: 10px;">
-                ⭐ {rating}
-            </div>
-            <div style="background-color: #8B5CF6; color: white; font-weight: bold; padding: 3px 10px; border-radius: 15px;">
-                {sentiment_label} ({sentiment:.2f})
-            </div>
-        </div>
-        <p style="color: #4B5563; margin-bottom: 5px;"><i class="fas fa-map-marker-alt"></i> {destination}</p>
-        <p style="color: #4B5563; font-style: italic; margin-bottom: 15px;">{sentiment_desc}</p>
-    """
-    
-    
-    
-    # Close the HTML
-    card_html += """
-    </div>
-    """
-    
-    return card_html
+        st.error(f"Error loading data: {str(e)}")
+        store = HotelStore.empty()
+    engine = RecommendationEngine(store, weather_client=get_weather_client(), geocode_store=get_geocode_store())
+    reloader = DatasetReloader(engine, DATASET_PATH)
+    reloader.start()
+    return reloader
+
+# Function to get the recommendation engine for the current dataset version; the page is a thin client of it
+def get_engine():
+    return get_dataset_reloader().engine
+
+# Function to create one Folium map with every matching hotel (coordinates from the local store, filled offline by `python geocode.py`);
+# takes the rerun's engine so the rows and their lookups come from the same dataset version
+def create_hotels_map(engine, hotels, city_name, focus=None, highlight=()):
+    with timed("coordinates"):
+        coordinates = [engine.coordinates(name, city_name) for name in hotels['Hotel Name']]
+    with timed("map_build"):
+        return create_results_map(hotels, coordinates, engine.city_center(city_name), focus=focus, highlight=highlight)
+
+# Function to render the results map as static HTML (cached; never triggers a rerun). The engine
+# isn't hashed; its dataset version keys the cache instead.
+@st.cache_data(max_entries=64)
+def render_static_hotels_map(_engine, version, hotels, city_name, focus=None, highlight=()):
+    hotels_map = create_hotels_map(_engine, hotels, city_name, focus, highlight)
+    with timed("map_html"):
+        return hotels_map.get_root().render()
+
+# Callback for the "Show more hotels" button
+def show_more_results():
+    st.session_state["pages_shown"] = st.session_state.get("pages_shown", 1) + 1
 
 # Calculate length of stay and return formatted nights text
 def calculate_stay_length(check_in, check_out):
@@ -271,6 +104,9 @@ def calculate_stay_length(check_in, check_out):
     else:
         return f"{nights} nights"
 
+# Stage timings of this rerun, for the metrics and the debug panel
+start_trace()
+
 # Page configuration
 st.set_page_config(
     page_title="Yatri Mitra", 
@@ -280,15 +116,55 @@ st.set_page_config(
 )
 
 # Load data
-df = load_data()
+engine = get_engine()
+hotel_store = engine.store
 
-if df.empty:
+if hotel_store.df.empty:
     st.error("Failed to load dataset. Please check the file path.")
     st.stop()
 
-# Encode background image
-bg_image_path = "a.jpg"
-bg_image_base64 = get_base64_image(bg_image_path)
+df = hotel_store.df
+hotel_index = hotel_store.hotel_index
+amenity_catalogue = hotel_store.amenity_catalogue
+
+# Keep weather for every destination warm in the background (WEATHER_PREFETCH=0 disables)
+weather_prefetcher = None
+if os.environ.get("WEATHER_PREFETCH", "1") != "0":
+    weather_prefetcher = start_weather_prefetcher()
+
+# Ranking preferences
+with st.sidebar:
+    st.markdown("### ⚖ Ranking Preferences")
+    ranking_weights = {
+        "sentiment": st.slider("Guest sentiment", 0.0, 1.0, DEFAULT_WEIGHTS["sentiment"], 0.05),
+        "ratings": st.slider("Star ratings", 0.0, 1.0, DEFAULT_WEIGHTS["ratings"], 0.05),
+        "price": st.slider("Value for money", 0.0, 1.0, DEFAULT_WEIGHTS["price"], 0.05),
+        "amenities": st.slider("Amenities on offer", 0.0, 1.0, DEFAULT_WEIGHTS["amenities"], 0.05),
+    }
+
+    st.markdown("### 🗺 Map")
+    interactive_map = st.checkbox("Interactive map", value=False, 
+                                  help="Sync the map with the server. Static maps are lighter and never rerun the page.")
+    
+    st.markdown("### 📏 Distance")
+    max_distance_km = st.number_input("Within km of the city centre", min_value=0.0, value=0.0, step=1.0, 
+                                      help="0 shows hotels at any distance.")
+    
+    st.markdown("### 🔎 Find a Hotel")
+    name_query = st.text_input("Hotel name", placeholder="e.g. Hadimba Regency")
+    if name_query.strip():
+        # Typo-tolerant lookup through the trigram name index
+        name_matches = engine.find_hotels(name_query, limit=8)
+        if name_matches:
+            st.markdown("\n".join(
+                f"- **{hotel_store.names[row]}**, {hotel_store.destinations[row]} (₹{hotel_store.df['Price'].iat[row]:,.0f})"
+                for row, _ in name_matches
+            ))
+        else:
+            st.caption("No hotels with a similar name.")
+
+# Background image for the header
+bg_image_css = get_hero_background_css()
 
 # Inject custom CSS for styling
 st.markdown(
@@ -415,12 +291,12 @@ st.markdown(
 )
 
 # If background image is present, add it to the CSS
-if bg_image_base64:
+if bg_image_css:
     st.markdown(
         f"""
         <style>
         .header-container {{
-            background-image: url("data:image/jpeg;base64,{bg_image_base64}");
+            {bg_image_css}
             background-size: cover;
             background-position: center;
             position: relative;
@@ -467,21 +343,25 @@ with st.container():
     col1, col2, col3 = st.columns([1, 1, 1])
     
     with col1:
-        destination = st.selectbox("🌍 Destination", df["Destination"].unique(), 
+        destination = st.selectbox("🌍 Destination", hotel_index.destinations, 
                                    help="Select your travel destination")
         
         # Simplified price range selection with a single control
-        price_options = ["Budget (₹0 - ₹5000)", "Comfort (₹5001 - ₹10000)", "Luxury (₹10001+)"]
+        price_options = list(PRICE_BANDS) + ["Custom range"]
         price_selection = st.radio("💰 Price Range", price_options, 
                                  help="Select your budget preference")
         
-        # Convert selection to actual price range for filtering
-        if price_selection == "Budget (₹0 - ₹5000)":
-            price_range = "₹0 - ₹5000"
-        elif price_selection == "Comfort (₹5001 - ₹10000)":
-            price_range = "₹5001 - ₹10000"
+        # Convert selection to actual price bounds for filtering
+        if price_selection in PRICE_BANDS:
+            min_price, max_price = band_range(price_selection)
         else:
-            price_range = "₹10001 and above"
+            lowest, highest = hotel_index.price_bounds(destination)
+            lowest, highest = math.floor(lowest or 0), math.ceil(highest or 0)
+            if lowest < highest:
+                min_price, max_price = st.slider("Price per night (₹)", lowest, highest, 
+                                                 (lowest, highest))
+            else:
+                min_price, max_price = lowest, highest
     
     with col2:
         # Date selection
@@ -499,14 +379,13 @@ with st.container():
         
         # Calculate and display stay length
         stay_length = calculate_stay_length(checkin_date, checkout_date)
+        nights = (checkout_date - checkin_date).days
         st.markdown(f"<p><i>Stay duration: {stay_length}</i></p>", unsafe_allow_html=True)
     
     with col3:
         # Amenities selection
-        all_amenities = sorted(set(",".join(df["Amenities"].dropna()).split(",")))
-        all_amenities = [amenity.strip() for amenity in all_amenities if amenity.strip()]
         selected_amenities = st.multiselect("🛎 Must-have Amenities", 
-                                          all_amenities, 
+                                          amenity_catalogue.names, 
                                           help="Select amenities you need during your stay")
         
         # Add a search button
@@ -517,97 +396,108 @@ with st.container():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Weather information
-st.markdown('<div class="results-container">', unsafe_allow_html=True)
-st.markdown(f'<h2 class="subheader">Current Weather in {destination}</h2>', unsafe_allow_html=True)
+# Weather information (one batched emission for the whole panel)
+weather_data, weather_icon = engine.weather(destination)
+st.markdown(render_weather(destination, weather_data, weather_icon), unsafe_allow_html=True)
 
-weather_data, weather_icon = get_weather(destination)
-weather_cols = st.columns(4)
+if "sentiment_score" not in df.columns:
+    st.error("⚠ 'sentiment_score' column not found in dataset.")
+    st.stop()
 
-for i, (key, value) in enumerate(weather_data.items()):
-    with weather_cols[i % 4]:
-        st.markdown(
-            f"""
-            <div class="weather-card">
-                <h3 style="color: #3B82F6; margin-top: 0;">{key}</h3>
-                <p style="font-size: 1.5rem; font-weight: bold;">{value}</p>
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+# Matching hotels; repeated searches are served from the engine's cross-session result cache
+near_centre = (*engine.city_center(destination), max_distance_km) if max_distance_km > 0 else None
+search_result = engine.search(destination, min_price, max_price, selected_amenities, ranking_weights, nights, 
+                              checkin_date, checkout_date, near=near_centre)
 
-if weather_icon:
-    st.markdown(
-        f"""
-        <div style="text-align: center; margin-top: 10px;">
-            <img src="{weather_icon}" alt="Weather Icon" style="width: 60px; height: 60px;">
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-st.markdown('</div>', unsafe_allow_html=True)
+# A new search starts again from the first page
+search_key = query_key(destination, min_price, max_price, selected_amenities, ranking_weights, nights, 
+                       search_result.stay, near_centre and ("near",) + near_centre)
+if st.session_state.get("results_key") != search_key:
+    st.session_state["results_key"] = search_key
+    st.session_state["pages_shown"] = 1
 
-# Filter hotels based on criteria
-if price_range == "₹0 - ₹5000":
-    filtered_df = df[(df["Destination"] == destination) & (df["Price"] <= 5000)]
-elif price_range == "₹5001 - ₹10000":
-    filtered_df = df[(df["Destination"] == destination) & (df["Price"].between(5001, 10000, inclusive="both"))]
-else:
-    filtered_df = df[(df["Destination"] == destination) & (df["Price"] > 10000)]
+# Only the pages viewed so far are ranked, rendered and materialised for this session
+result_pages = [engine.results_page(search_result, page, destination, ranking_weights, nights, render=True, 
+                                    amenities=selected_amenities) 
+                for page in range(st.session_state["pages_shown"])]
+shown_rows = np.concatenate([result_page.rows for result_page in result_pages])
+shown_hotels = hotel_store.rows(shown_rows)
 
-# Filter based on selected amenities
-if selected_amenities:
-    filtered_df = filtered_df[filtered_df["Amenities"].apply(lambda x: all(amenity in str(x).split(",") for amenity in selected_amenities))]
-
-# Get the top 3 hotels with highest sentiment scores
-if "sentiment_score" not in filtered_df.columns:
-    st.error("⚠ 'sentiment_score' column not found in dataset.")
+if shown_hotels.empty:
+    st.warning("⚠ No hotels found for this destination and criteria. Try adjusting your filters!")
 else:
-    top_hotels = filtered_df.dropna(subset=["sentiment_score"]).sort_values(by="sentiment_score", ascending=False).head(3)
-
-    if top_hotels.empty:
-        st.warning("⚠ No hotels found for this destination and criteria. Try adjusting your filters!")
-    else:
-        # Top hotels section
-        st.markdown('<div class="results-container">', unsafe_allow_html=True)
-        st.markdown('<h2 class="subheader">Top Recommended Hotels</h2>', unsafe_allow_html=True)
-        st.markdown(f"<p>Found <b>{len(filtered_df)}</b> hotels matching your criteria. Here are our top picks:</p>", unsafe_allow_html=True)
+    # Top hotels section
+    st.markdown('<h2 class="subheader">Top Recommended Hotels</h2>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([1, 1])
+    shown_names = tuple(shown_hotels['Hotel Name'])
+    top_names = shown_names[:3]
+    
+    with col1:
+        # Only hotels the ranking can list count, not matches it drops for lacking a sentiment score
+        ranked_count = engine.ranked_count(search_result)
+        st.markdown(
+            f"<p>Found <b>{ranked_count}</b> hotels matching your criteria. Here are our top picks:</p>",
+            unsafe_allow_html=True
+        )
+        
+        # Each page of cards goes out as a single emission
+        for result_page in result_pages:
+            st.markdown(result_page.fragment, unsafe_allow_html=True)
+        
+        # A short last page means the ranking is exhausted
+        if len(result_pages[-1].rows) == engine.page_size and len(shown_rows) < ranked_count:
+            st.button("Show more hotels", on_click=show_more_results)
         
-        # Display each hotel with improved styling
-        for i, (idx, hotel) in enumerate(top_hotels.iterrows()):
-            hotel_name = hotel['Hotel Name']
-            
-            col1, col2 = st.columns([1, 1])
-            
-            with col1:
-                # Display hotel card
-                st.markdown(create_hotel_card(hotel, rank=i), unsafe_allow_html=True)
-                
-                # Create a link to Google Maps
-                hotel_name_encoded = hotel_name.replace(' ', '+')
-                location_encoded = hotel['Destination'].replace(' ', '+')
-                st.markdown(f"[🗺 View on Google Maps](https://www.google.com/maps/search/?api=1&query={hotel_name_encoded}+{location_encoded})")
-                
-            with col2:
-                # Create a styled container for the map
-                st.markdown('<div class="map-container">', unsafe_allow_html=True)
-                # Create an individual map for this hotel
-                hotel_map = create_single_hotel_map(
-                    hotel_name, 
-                    hotel['Price'], 
-                    hotel['Ratings'], 
-                    hotel['sentiment_score'], 
-                    destination
-                )
-                
-                # Use a unique key for each folium map
-                map_key = f"map_{hotel_name}_{i}"
-                st_folium(hotel_map, width=600, height=300, key=map_key)
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            
-            # Add a separator between hotels
-            if i < len(top_hotels) - 1:
-                st.markdown("<hr style='margin: 30px 0; border-color: #E5E7EB;'>", unsafe_allow_html=True)
+        # Focus one of the listed hotels on the results map
+        focused_hotel = st.selectbox("📍 Show on map", (None,) + shown_names,
+                                     format_func=lambda name: "All listed hotels" if name is None else name)
         
-        st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+        # Closest other hotels to the focused one (proximity index) and the most similar ones (precomputed)
+        if focused_hotel is not None:
+            focused_row = int(shown_rows[shown_names.index(focused_hotel)])
+            nearby_rows, nearby_km = engine.nearby(focused_row, n=5)
+            nearby_hotels = ", ".join(f"{hotel_store.names[row]} ({km:.1f} km)" 
+                                      for row, km in zip(nearby_rows, nearby_km))
+            st.markdown(f"**Nearby:** {nearby_hotels}")
+            similar_rows, _ = engine.similar(focused_row, n=5)
+            if len(similar_rows):
+                st.markdown("**More like this:** " + ", ".join(
+                    f"{hotel_store.names[row]} (₹{hotel_store.df['Price'].iat[row]:,.0f})" for row in similar_rows
+                ))
+    
+    with col2:
+        # One clustered map of the listed hotels (it grows with the pages shown), top picks pinned
+        if interactive_map:
+            # Imported on first use; only the interactive map needs the component
+            from streamlit_folium import st_folium
+            hotels_map = create_hotels_map(engine, shown_hotels, destination, focused_hotel, top_names)
+            with timed("st_folium"):
+                st_folium(hotels_map, width=600, height=600, key="results_map", returned_objects=[])
+        else:
+            with timed("static_map"):
+                components.html(render_static_hotels_map(engine, hotel_store.version, shown_hotels, destination, focused_hotel, top_names), 
+                                height=600)
+
+rerun_trace = end_trace("rerun")
+
+# Opt-in debug panel (YAATRIMITRA_DEBUG=1 or ?debug=1): this rerun's stages and the process-wide metrics
+if os.environ.get("YAATRIMITRA_DEBUG") == "1" or st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🛠 Debug: performance", expanded=True):
+        st.markdown(f"**This rerun:** {rerun_trace.elapsed() * 1000:.1f} ms")
+        st.dataframe(pd.DataFrame([(stage, seconds * 1000) for stage, seconds in rerun_trace.stages], 
+                                  columns=["Stage", "ms"]), hide_index=True)
+        st.markdown("**This process** (bucket upper bounds)")
+        st.dataframe(pd.DataFrame.from_dict(REGISTRY.summary(), orient="index"))
+        reload_status = get_dataset_reloader().status()
+        st.markdown(f"**Dataset version:** `{reload_status['version']}`")
+        if reload_status["last_reload"]:
+            st.json(reload_status["last_reload"], expanded=False)
+        if reload_status["last_error"]:
+            st.warning(f"Last reload failed: {reload_status['last_error']}")
+        if st.button("Reload dataset"):
+            get_dataset_reloader().request_reload()
+        gauges = engine.metrics()
+        if weather_prefetcher is not None:
+            gauges += gauges_from("weather", weather_prefetcher.metrics(), "city")
+        st.code(REGISTRY.prometheus_text(gauges), language="text")
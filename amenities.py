@@ -0,0 +1,192 @@
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Font Awesome icons by amenity keyword
+AMENITY_ICONS = {
+    "wifi": "wifi",
+    "swimming pool": "swimming-pool",
+    "pool": "swimming-pool",
+    "parking": "parking",
+    "spa": "spa",
+    "gym": "dumbbell",
+    "fitness": "dumbbell",
+    "restaurant": "utensils",
+    "bar": "glass-martini",
+    "breakfast": "coffee",
+    "air conditioning": "snowflake",
+    "air conditioner": "snowflake",
+    "air-conditioned": "snowflake",
+    "ac": "snowflake",
+    "pet friendly": "paw",
+    "beach": "umbrella-beach",
+    "room service": "concierge-bell",
+    "laundry": "tshirt",
+    "tv": "tv",
+    "balcony": "door-open",
+    "hot tub": "hot-tub",
+    "airport shuttle": "shuttle-van",
+}
+
+WORD_BITS = 64
+
+# Set bits of every byte value, for counting the bits of a mask a byte at a time
+_BYTE_BITS = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+# Number of set bits in each row of a (rows, words) uint64 mask array
+def popcount(masks):
+    masks = np.ascontiguousarray(masks, dtype=np.uint64)
+    return _BYTE_BITS[masks.view(np.uint8)].reshape(len(masks), -1).sum(axis=1, dtype=np.int64)
+
+
+# Canonical form used to unify spelling variants ("Wi-Fi", "wifi", "WiFi" -> "wifi")
+def canonical_amenity(amenity):
+    return re.sub(r"[^a-z0-9]+", "", str(amenity).lower())
+
+
+# Keywords in canonical form, longest first so "beach" wins over "ac"
+_ICON_KEYWORDS = sorted(
+    ((canonical_amenity(key), icon) for key, icon in AMENITY_ICONS.items()),
+    key=lambda item: len(item[0]),
+    reverse=True,
+)
+
+
+# Function to get amenity icons
+def get_amenity_icon(amenity):
+    amenity = canonical_amenity(amenity)
+    for key, icon in _ICON_KEYWORDS:
+        if key in amenity:
+            return icon
+
+    return "check-circle"  # Default icon
+
+
+# Split a raw Amenities cell into trimmed names; handles strings, lists and missing values
+def split_amenities(value):
+    if isinstance(value, str):
+        items = value.split(",")
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        items = value
+    else:
+        items = []
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+# Add (sign=1) or remove (sign=-1) the spellings of each value to per-amenity counts;
+# returns the canonical amenity keys of each value
+def _count_spellings(values, spellings, sign=1):
+    row_keys = []
+    for value in values:
+        keys = set()
+        for name in split_amenities(value):
+            key = canonical_amenity(name)
+            if key:
+                spellings[key][name] += sign
+                keys.add(key)
+        row_keys.append(keys)
+    return row_keys
+
+
+# Load-time amenity vocabulary with integer IDs and a per-hotel bitmask
+class AmenityCatalogue:
+    def __init__(self, amenities_column):
+        # Spelling counts per amenity, kept so a new dataset version can be applied incrementally
+        self.spellings = defaultdict(Counter)
+        row_keys = _count_spellings(amenities_column, self.spellings)
+        self._set_vocabulary()
+        self.masks = np.zeros((len(row_keys), self.n_words), dtype=np.uint64)
+        self._set_bits(np.arange(len(row_keys)), row_keys)
+
+    def _set_vocabulary(self):
+        # Display each amenity under its most common spelling
+        display = {key: counts.most_common(1)[0][0] for key, counts in self.spellings.items()}
+        self.names = sorted(display.values(), key=str.lower)
+        self.ids = {canonical_amenity(name): i for i, name in enumerate(self.names)}
+        self.icons = [get_amenity_icon(name) for name in self.names]
+        self.n_words = max(1, -(-len(self.names) // WORD_BITS))
+
+    # Set the bits of each row's amenity keys
+    def _set_bits(self, rows, row_keys):
+        rows = np.repeat(rows, [len(keys) for keys in row_keys])
+        ids = np.array([self.ids[key] for keys in row_keys for key in keys], dtype=np.int64)
+        if len(ids):
+            bits = np.left_shift(np.uint64(1), (ids % WORD_BITS).astype(np.uint64))
+            np.bitwise_or.at(self.masks, (rows, ids // WORD_BITS), bits)
+
+    # Catalogue for a new version of the column. Rows with source[row] >= 0 are unchanged copies of
+    # that row here and keep its bits; only the others are parsed. dropped_values are the cells of
+    # rows here that are gone or changed, so their spellings stop counting.
+    def updated(self, amenities_column, source, dropped_values):
+        catalogue = AmenityCatalogue.__new__(AmenityCatalogue)
+        catalogue.spellings = defaultdict(Counter, {key: Counter(counts) for key, counts in self.spellings.items()})
+        _count_spellings(dropped_values, catalogue.spellings, sign=-1)
+        parsed = np.flatnonzero(source < 0)
+        row_keys = _count_spellings(amenities_column.iloc[parsed], catalogue.spellings)
+        # Amenities no hotel lists any more leave the vocabulary
+        catalogue.spellings = defaultdict(Counter, {key: +counts for key, counts in catalogue.spellings.items()
+                                                    if +counts})
+        catalogue._set_vocabulary()
+
+        catalogue.masks = np.zeros((len(source), catalogue.n_words), dtype=np.uint64)
+        kept = np.flatnonzero(source >= 0)
+        old_masks = self.masks[source[kept]]
+        if catalogue.names == self.names:
+            catalogue.masks[kept] = old_masks
+        else:
+            # IDs moved (an amenity was added, dropped or respelled): carry each bit to its new position
+            for key, old_id in self.ids.items():
+                new_id = catalogue.ids.get(key)
+                if new_id is None:
+                    continue
+                has = (old_masks[:, old_id // WORD_BITS] >> np.uint64(old_id % WORD_BITS)) & np.uint64(1)
+                catalogue.masks[kept, new_id // WORD_BITS] |= has << np.uint64(new_id % WORD_BITS)
+        catalogue._set_bits(parsed, row_keys)
+        return catalogue
+
+    # Catalogue ID for any spelling of an amenity, or None if it is unknown
+    def id_of(self, amenity):
+        return self.ids.get(canonical_amenity(amenity))
+
+    # Bit words with one bit set per requested amenity; None if any amenity is unknown
+    def query_mask(self, amenities):
+        query = np.zeros(self.n_words, dtype=np.uint64)
+        for amenity in amenities:
+            amenity_id = self.id_of(amenity)
+            if amenity_id is None:
+                return None
+            query[amenity_id // WORD_BITS] |= np.uint64(1) << np.uint64(amenity_id % WORD_BITS)
+        return query
+
+    # Boolean array telling which rows (all rows by default) have every requested amenity
+    def has_all(self, amenities, rows=None):
+        masks = self.masks if rows is None else self.masks[rows]
+        query = self.query_mask(amenities)
+        if query is None:
+            return np.zeros(len(masks), dtype=bool)
+        return ((masks & query) == query).all(axis=1)
+
+    # Share of the requested amenities each row (all rows by default) has, from 0 to 1; amenities
+    # missing from the catalogue count as not had. None when no amenity is requested.
+    def match_share(self, amenities, rows=None):
+        requested = {canonical_amenity(amenity) for amenity in amenities} - {""}
+        if not requested:
+            return None
+        known = [key for key in requested if key in self.ids]
+        masks = self.masks if rows is None else self.masks[rows]
+        if not known:
+            return np.zeros(len(masks))
+        query = self.query_mask(known)
+        return popcount(masks & query) / len(requested)
+
+    # Display names of the amenities a row has
+    def amenities_of(self, row):
+        words = self.masks[row]
+        return [name for i, name in enumerate(self.names)
+                if words[i // WORD_BITS] >> np.uint64(i % WORD_BITS) & np.uint64(1)]
+
+    # Number of catalogue amenities each row has
+    def counts(self):
+        return popcount(self.masks)
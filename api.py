@@ -0,0 +1,347 @@
+import argparse
+import hmac
+import json
+import logging
+import math
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from engine import NotFound, RecommendationEngine
+from metrics import REGISTRY, count, timed
+from ranking import FEATURES
+from reload import DATASET_RELOAD_INTERVAL, DatasetReloader
+from snapshot import DATASET_PATH
+
+# JSON API over the recommendation engine, for other frontends and batch jobs:
+#   python api.py --port 8080 --workers 16
+#   GET /search?destination=Manali&max_price=5000&amenities=pool,free wifi&nights=2&page=0
+#       (optional ranking weights: w_sentiment, w_ratings, w_price, w_amenities;
+#        optional check_in/check_out dates as YYYY-MM-DD for date-aware prices;
+#        optional near=lat,lon with radius_km, or bbox=south,west,north,east for a map viewport)
+#   GET /hotel/{id}
+#   GET /hotel/{id}/nearby?n=5
+#   GET /hotel/{id}/similar?n=5
+#   GET /suggest?q=hadimba regncy&limit=10
+#   GET /weather/{city}
+#   GET /metrics   (Prometheus text: per-route latency histograms, call counters, cache gauges)
+#   POST /admin/reload   (reload the dataset in the background; GET shows the reload status)
+#       needs the X-Admin-Token header to match API_ADMIN_TOKEN; disabled when that isn't set
+
+# Requests served at once per process
+API_WORKERS = int(os.environ.get("API_WORKERS", "8"))
+# Accepted connections that may wait for a busy worker; beyond that a connection is answered 503
+# at once, so overload shows up as fast refusals instead of an ever-growing queue
+API_QUEUE = int(os.environ.get("API_QUEUE", "32"))
+
+# Shared secret for the /admin endpoints; they answer 403 while it is unset
+API_ADMIN_TOKEN = os.environ.get("API_ADMIN_TOKEN", "")
+
+# Most hotels one /nearby, /similar or /suggest call returns (n, limit)
+MAX_RESULTS = 50
+
+# First path segments timed as their own stage; anything else is timed as "api_other"
+API_ROUTES = ("search", "suggest", "hotel", "weather", "metrics", "admin")
+
+
+logger = logging.getLogger("yaatrimitra.api")
+
+
+# Raised for malformed query parameters; answered with 400
+class BadRequest(Exception):
+    pass
+
+
+def _number(query, name, cast=float):
+    value = query.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        number = cast(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be a number")
+    # float() accepts "nan" and "inf", which no filter or coordinate can use
+    if not math.isfinite(number):
+        raise BadRequest(f"{name} must be a finite number")
+    return number
+
+
+# A result count such as n or limit: the default when absent, else 1 to MAX_RESULTS
+def _result_count(query, name, default):
+    value = _number(query, name, int)
+    if value is None:
+        return default
+    if not 1 <= value <= MAX_RESULTS:
+        raise BadRequest(f"{name} must be between 1 and {MAX_RESULTS}")
+    return value
+
+
+def _date(query, name):
+    value = query.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be a YYYY-MM-DD date")
+
+
+def _floats(query, name, count):
+    value = query.get(name)
+    if not value:
+        return None
+    try:
+        values = tuple(float(part) for part in value.split(","))
+    except ValueError:
+        values = ()
+    if len(values) != count or not all(math.isfinite(value) for value in values):
+        raise BadRequest(f"{name} must be {count} comma-separated finite numbers")
+    return values
+
+
+def search(engine, query):
+    destination = query.get("destination")
+    if not destination:
+        raise BadRequest("destination is required")
+    amenities = [amenity.strip() for amenity in query.get("amenities", "").split(",") if amenity.strip()]
+    weights = {name: _number(query, f"w_{name}") for name in FEATURES}
+    weights = {name: weight for name, weight in weights.items() if weight is not None}
+    check_in, check_out = _date(query, "check_in"), _date(query, "check_out")
+    nights = (check_out - check_in).days if check_in and check_out else _number(query, "nights", int) or 1
+    page = _number(query, "page", int) or 0
+    if page < 0 or nights < 1:
+        raise BadRequest("page must be >= 0 and the stay at least one night")
+
+    near = _floats(query, "near", 2)
+    if near:
+        radius_km = _number(query, "radius_km")
+        if radius_km is None or radius_km <= 0:
+            raise BadRequest("near needs a positive radius_km")
+        near += (radius_km,)
+
+    result = engine.search(destination, _number(query, "min_price"), _number(query, "max_price"),
+                           amenities, weights, nights, check_in, check_out,
+                           near=near, bbox=_floats(query, "bbox", 4))
+    result_page = engine.results_page(result, page, destination, weights, nights, amenities=amenities)
+    hotels = [engine.hotel_record(row) for row in result_page.rows]
+    prices = engine.stay_prices(result, result_page.rows)
+    if prices is not None:
+        for hotel, price in zip(hotels, prices):
+            hotel["nightly_price"] = round(float(price), 2)
+    return {
+        "destination": destination,
+        "total": engine.ranked_count(result),
+        "page": page,
+        "page_size": engine.page_size,
+        "version": engine.store.version,
+        "hotels": hotels,
+    }
+
+
+def nearby(engine, hotel_id, query):
+    rows, distances = engine.nearby(hotel_id, _result_count(query, "n", 5))
+    hotels = [engine.hotel_record(row) for row in rows]
+    for hotel, distance in zip(hotels, distances):
+        hotel["distance_km"] = round(float(distance), 3)
+    return {"id": hotel_id, "hotels": hotels}
+
+
+def suggest(engine, query):
+    text = query.get("q", "")
+    if not text.strip():
+        raise BadRequest("q is required")
+    matches = engine.find_hotels(text, _result_count(query, "limit", 10))
+    hotels = [engine.hotel_record(row) for row, _ in matches]
+    for hotel, (_, score) in zip(hotels, matches):
+        hotel["score"] = round(score, 3)
+    return {"q": text, "hotels": hotels}
+
+
+def similar(engine, hotel_id, query):
+    rows, scores = engine.similar(hotel_id, _result_count(query, "n", 5))
+    hotels = [engine.hotel_record(row) for row in rows]
+    for hotel, score in zip(hotels, scores):
+        hotel["similarity"] = round(float(score), 3)
+    return {"id": hotel_id, "hotels": hotels}
+
+
+def weather(engine, city):
+    data, icon = engine.weather(city)
+    return {"city": city, "weather": data, "icon": icon}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        # One engine for the whole request, even if a dataset reload swaps in a new one meanwhile
+        engine = self.server.engine
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        with timed(f"api_{parts[0] if parts[0] in API_ROUTES else 'other'}"):
+            self._route(engine, method, parts, query)
+
+    def _route(self, engine, method, parts, query):
+        try:
+            if parts == ["admin", "reload"]:
+                self._admin_reload(method)
+            elif method != "GET":
+                self._send(405, {"error": "method not allowed"})
+            elif parts == ["metrics"]:
+                body = REGISTRY.prometheus_text(engine.metrics()).encode()
+                self._send_body(200, body, "text/plain; version=0.0.4; charset=utf-8")
+            elif parts == ["search"]:
+                self._send(200, search(engine, query))
+            elif parts == ["suggest"]:
+                self._send(200, suggest(engine, query))
+            elif parts[0] == "hotel" and (len(parts) == 2 or parts[2:] in (["nearby"], ["similar"])):
+                try:
+                    hotel_id = int(parts[1])
+                except ValueError:
+                    raise BadRequest("hotel id must be an integer")
+                if len(parts) == 2:
+                    self._send(200, engine.hotel(hotel_id))
+                elif parts[2] == "nearby":
+                    self._send(200, nearby(engine, hotel_id, query))
+                else:
+                    self._send(200, similar(engine, hotel_id, query))
+            elif len(parts) == 2 and parts[0] == "weather":
+                self._send(200, weather(engine, parts[1]))
+            else:
+                self._send(404, {"error": "not found"})
+        except BadRequest as e:
+            self._send(400, {"error": str(e)})
+        except NotFound as e:
+            self._send(404, {"error": str(e)})
+        except Exception:
+            # Anything else is a bug: log it and still answer, rather than drop the connection
+            logger.exception("Error serving %s", self.path)
+            self._send(500, {"error": "internal server error"})
+
+    def _admin_reload(self, method):
+        token = self.headers.get("X-Admin-Token", "")
+        if not API_ADMIN_TOKEN or not hmac.compare_digest(token.encode(), API_ADMIN_TOKEN.encode()):
+            self._send(403, {"error": "admin token required"})
+        elif method == "POST":
+            if not self.server.reloader.request_reload():
+                raise NotFound("this server has no dataset to reload")
+            self._send(202, self.server.reloader.status())
+        else:
+            self._send(200, self.server.reloader.status())
+
+    def _send(self, status, payload):
+        self._send_body(status, json.dumps(payload).encode(), "application/json")
+
+    def _send_body(self, status, body, content_type):
+        count("api_responses_total", status=status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Sent on the accepting thread when every worker and queue slot is taken
+OVERLOADED_BODY = json.dumps({"error": "server overloaded, retry shortly"}).encode()
+OVERLOADED_RESPONSE = (b"HTTP/1.0 503 Service Unavailable\r\nContent-Type: application/json\r\n"
+                       b"Retry-After: 1\r\nConnection: close\r\nContent-Length: "
+                       + str(len(OVERLOADED_BODY)).encode() + b"\r\n\r\n" + OVERLOADED_BODY)
+
+
+# HTTP server handing each connection to a fixed pool of worker threads, so concurrency is
+# bounded and threads are reused instead of one new thread per request. At most workers + queue
+# connections are held at once; the executor's own queue is unbounded, so admission is gated here.
+class PooledHTTPServer(HTTPServer):
+    def __init__(self, address, handler, engine, workers=API_WORKERS, reloader=None, queue=API_QUEUE):
+        super().__init__(address, handler)
+        # Holds the current engine; without a dataset path it never swaps it
+        self.reloader = reloader or DatasetReloader(engine, source_path=None)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self.slots = threading.BoundedSemaphore(workers + queue)
+
+    @property
+    def engine(self):
+        return self.reloader.engine
+
+    def process_request(self, request, client_address):
+        if not self.slots.acquire(blocking=False):
+            self._refuse(request)
+            return
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.slots.release()
+
+    # Answer 503 without parsing the request; a client that already left just gets the socket closed
+    def _refuse(self, request):
+        count("api_responses_total", status=503)
+        try:
+            request.sendall(OVERLOADED_RESPONSE)
+            request.shutdown(socket.SHUT_WR)
+            # Take in what the client has sent (waiting only briefly), since closing with unread
+            # data resets the connection and can discard the response before the client reads it
+            request.settimeout(0.05)
+            request.recv(65536)
+        except OSError:
+            pass
+        self.close_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+# Start the API on a background thread; port 0 picks a free port. Returns the server.
+def start_api_server(engine, host="127.0.0.1", port=0, workers=API_WORKERS, reloader=None, queue=API_QUEUE):
+    server = PooledHTTPServer((host, port), ApiHandler, engine, workers, reloader, queue)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve hotel recommendations as a JSON API")
+    parser.add_argument("--source", default=DATASET_PATH, help="path to the .xlsx workbook")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="worker threads")
+    parser.add_argument("--queue", type=int, default=API_QUEUE,
+                        help="connections that may wait for a worker before new ones get 503")
+    parser.add_argument("--reload-interval", type=float, default=DATASET_RELOAD_INTERVAL,
+                        help="seconds between checks for a changed dataset (0: reload only on POST /admin/reload)")
+    args = parser.parse_args()
+
+    engine = RecommendationEngine.from_dataset(args.source)
+    reloader = DatasetReloader(engine, args.source, args.reload_interval)
+    reloader.start()
+    server = PooledHTTPServer((args.host, args.port), ApiHandler, engine, args.workers, reloader, args.queue)
+    print(f"Serving {len(engine.store.df)} hotels on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reloader.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
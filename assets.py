@@ -0,0 +1,145 @@
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+from functools import lru_cache
+
+from snapshot import file_sha256
+
+# Header image, optimised at build time into content-hashed files under static/.
+# Streamlit serves that folder at app/static/ when server.enableStaticServing is on
+# (see .streamlit/config.toml); otherwise the page falls back to an inline data URI.
+HERO_IMAGE = os.environ.get("HERO_IMAGE", "Hotel.jpg")
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+MANIFEST_NAME = "manifest.json"
+
+# The header is never shown wider than this, so larger sources are scaled down
+HERO_WIDTH = 1280
+
+# Encodings in order of preference: (key, Pillow format, extension, MIME type, save options).
+# No AVIF: Streamlit's static handler only serves image types it knows (.webp, .jpg, ...).
+ENCODINGS = (
+    ("webp", "WEBP", ".webp", "image/webp", {"quality": 78, "method": 6}),
+    ("jpeg", "JPEG", ".jpg", "image/jpeg", {"quality": 78, "optimize": True, "progressive": True}),
+)
+
+# Bump when the resize/encode settings change so existing builds are redone
+ASSET_SCHEMA_VERSION = "1"
+
+
+def manifest_path(static_dir=STATIC_DIR):
+    return os.path.join(static_dir, MANIFEST_NAME)
+
+
+def read_manifest(static_dir=STATIC_DIR):
+    try:
+        with open(manifest_path(static_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# The build is current when it came from the same source bytes and settings and its files still exist
+def assets_are_fresh(manifest, source_path, static_dir=STATIC_DIR):
+    if not manifest or manifest.get("schema_version") != ASSET_SCHEMA_VERSION:
+        return False
+    if manifest.get("source_sha256") != file_sha256(source_path):
+        return False
+    return all(os.path.exists(os.path.join(static_dir, entry["file"])) for entry in manifest["files"].values())
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+# Resize and re-encode the source into every format; file names carry a hash of their bytes
+def build_assets(source_path=HERO_IMAGE, static_dir=STATIC_DIR, width=HERO_WIDTH):
+    from PIL import Image
+
+    os.makedirs(static_dir, exist_ok=True)
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        files = {}
+        for key, image_format, extension, mime, options in ENCODINGS:
+            buffer = io.BytesIO()
+            image.save(buffer, image_format, **options)
+            data = buffer.getvalue()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            name = f"{stem}.{digest}{extension}"
+            _write_atomic(os.path.join(static_dir, name), data)
+            files[key] = {"file": name, "mime": mime, "digest": digest, "bytes": len(data)}
+
+    manifest = {
+        "schema_version": ASSET_SCHEMA_VERSION,
+        "source": os.path.basename(source_path),
+        "source_sha256": file_sha256(source_path),
+        "width": image.width,
+        "height": image.height,
+        "files": files,
+    }
+    _write_atomic(manifest_path(static_dir), json.dumps(manifest, indent=2).encode("utf-8"))
+
+    # Drop earlier builds of the same image
+    current = {entry["file"] for entry in files.values()}
+    for name in os.listdir(static_dir):
+        if name.startswith(f"{stem}.") and name not in current and not name.endswith(".json"):
+            os.remove(os.path.join(static_dir, name))
+    return manifest
+
+
+# Manifest of the optimised image, rebuilding it when the source changed
+def load_assets(source_path=HERO_IMAGE, static_dir=STATIC_DIR):
+    manifest = read_manifest(static_dir)
+    if assets_are_fresh(manifest, source_path, static_dir):
+        return manifest
+    return build_assets(source_path, static_dir)
+
+
+# URL of a built file under Streamlit's static route. The ?v= argument makes the server send
+# long-lived cache headers; the hashed name guarantees a changed image gets a new URL.
+def static_url(entry):
+    return f"app/static/{entry['file']}?v={entry['digest']}"
+
+
+# Inline fallback: the file's bytes are read and encoded once per process
+@lru_cache(maxsize=8)
+def data_uri(path, mime):
+    with open(path, "rb") as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode()}"
+
+
+# CSS background-image declarations for the header.
+# Served statically: an image-set() so each browser fetches only the best format it supports,
+# after a plain JPEG url() for browsers without image-set(). Inline: only the smallest file.
+def hero_background_css(manifest, serve_static=True, static_dir=STATIC_DIR):
+    files = manifest["files"]
+    if serve_static:
+        fallback = static_url(files["jpeg"])
+        options = ", ".join(f'url("{static_url(entry)}") type("{entry["mime"]}")' for entry in files.values())
+        return f'background-image: url("{fallback}"); background-image: image-set({options});'
+    smallest = min(files.values(), key=lambda entry: entry["bytes"])
+    return f'background-image: url("{data_uri(os.path.join(static_dir, smallest["file"]), smallest["mime"])}");'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resize and re-encode the header image into static/")
+    parser.add_argument("source", nargs="?", default=HERO_IMAGE, help="source image")
+    parser.add_argument("--width", type=int, default=HERO_WIDTH)
+    args = parser.parse_args()
+
+    manifest = build_assets(args.source, width=args.width)
+    for key, entry in manifest["files"].items():
+        print(f"{key}: static/{entry['file']} ({entry['bytes'] / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
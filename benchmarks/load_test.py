@@ -0,0 +1,348 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+# Load test: many concurrent users clicking through the real app on a `streamlit run` server.
+# Each simulated user talks to the server over the same websocket protocol as the browser, so
+# every interaction is a full rerun of Yaatrimitra.py with the server's real threading and caches.
+# Weather and geocoding go to stub_server.py with a configurable latency.
+#   python benchmarks/load_test.py --sessions 200 --duration 60 --stub-latency 0.2
+#   python benchmarks/load_test.py --sessions 50 --rows 100000 -o load.json
+# Reports reruns per second, p50/p95/p99 rerun latency (interaction sent -> script finished) per
+# action and overall, and how much the server process's memory grew.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+DEFAULT_SESSIONS = 50
+DEFAULT_DURATION = 30
+# Mean seconds a user waits between interactions (exponentially distributed)
+DEFAULT_THINK_TIME = 1.0
+# Seconds over which users join, so the server isn't hit by every first load at once
+DEFAULT_RAMP = 5.0
+# Seconds before a rerun with no script_finished counts as a timeout
+RERUN_TIMEOUT = 60.0
+# Seconds between samples of the server's memory
+MEMORY_SAMPLE_INTERVAL = 0.5
+
+# One visit: a first load, then interactions with the widgets of the search form and results.
+# (action, widget label); the widget is looked up by label in the previous rerun's output.
+JOURNEY = (
+    ("load", None),
+    ("destination", "🌍 Destination"),
+    ("price", "💰 Price Range"),
+    ("amenities", "🛎 Must-have Amenities"),
+    ("show_more", "Show more hotels"),
+    ("focus", "📍 Show on map"),
+)
+
+
+# Resident memory of a process in MB, from /proc; None where that isn't available
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+# Widget state the browser would send after the user interacts with a widget; None when the
+# widget can't take this interaction (e.g. no options)
+def interaction(kind, element, rng):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=element.id)
+    if kind == "selectbox" and element.options:
+        # Index 0 of "Show on map" means no hotel focused, so prefer a real choice
+        state.int_value = rng.randrange(1 if len(element.options) > 1 else 0, len(element.options))
+    elif kind == "radio" and element.options:
+        # The last price option opens a custom range slider; stick to the preset bands
+        state.int_value = rng.randrange(max(len(element.options) - 1, 1))
+    elif kind == "multiselect" and element.options:
+        state.int_array_value.data.extend(rng.sample(range(len(element.options)), rng.randint(0, 2)))
+    elif kind == "button":
+        state.trigger_value = True
+    else:
+        return None
+    return state
+
+
+# One simulated user: a browser session over the websocket, rerunning the script per interaction
+class SimulatedSession:
+    def __init__(self, url, rng):
+        self.url = url
+        self.rng = rng
+        self.ws = None
+        # Latest widget elements by label, and the widget values this user has set
+        self.widgets = {}
+        self.states = {}
+        self.exceptions = 0
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"], max_message_size=64 * 1024 * 1024)
+        self.widgets = {}
+        self.states = {}
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+            self.ws = None
+
+    # Send one rerun with the current widget states (plus a one-shot trigger); seconds until it finished
+    async def rerun(self, trigger=None):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.page_script_hash = ""
+        widgets = message.rerun_script.widget_states.widgets
+        widgets.extend(self.states.values())
+        if trigger is not None:
+            widgets.append(trigger)
+
+        started = time.perf_counter()
+        await self.ws.write_message(message.SerializeToString(), binary=True)
+        widgets_seen = {}
+        while True:
+            payload = await asyncio.wait_for(self.ws.read_message(), RERUN_TIMEOUT)
+            if payload is None:
+                raise ConnectionError("server closed the session")
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    self.exceptions += 1
+                elif element_kind in ("selectbox", "radio", "multiselect", "button"):
+                    widget = getattr(element, element_kind)
+                    widgets_seen[widget.label] = (element_kind, widget)
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                self.widgets = widgets_seen
+                return time.perf_counter() - started
+
+    # Run one step of the journey; None when the widget isn't on the page this time
+    async def act(self, action, label):
+        if action == "load":
+            return await self.rerun()
+        found = self.widgets.get(label)
+        if found is None:
+            return None
+        state = interaction(*found, self.rng)
+        if state is None:
+            return None
+        if found[0] == "button":
+            return await self.rerun(trigger=state)
+        self.states[state.id] = state
+        return await self.rerun()
+
+
+# Keep one user clicking through journeys until the deadline; each journey is a new visit
+async def run_user(url, seed, deadline, think_time, start_delay, results):
+    rng = random.Random(seed)
+    await asyncio.sleep(start_delay)
+    session = SimulatedSession(url, rng)
+    while time.perf_counter() < deadline:
+        try:
+            await session.connect()
+            for action, label in JOURNEY:
+                if time.perf_counter() >= deadline:
+                    break
+                seconds = await session.act(action, label)
+                if seconds is not None:
+                    results["latencies"].setdefault(action, []).append(seconds)
+                if think_time:
+                    await asyncio.sleep(rng.expovariate(1.0 / think_time))
+            results["journeys"] += 1
+        except (asyncio.TimeoutError, ConnectionError, OSError) as e:
+            results["errors"].append(f"{type(e).__name__}: {e}")
+        finally:
+            results["exceptions"] += session.exceptions
+            session.exceptions = 0
+            session.close()
+
+
+async def sample_memory(pid, samples, stop):
+    while not stop.is_set():
+        value = rss_mb(pid)
+        if value is not None:
+            samples.append((time.perf_counter(), value))
+        try:
+            await asyncio.wait_for(stop.wait(), MEMORY_SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def latency_summary(seconds):
+    values = np.array(seconds) * 1000
+    if len(values) == 0:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p95_ms": round(float(np.percentile(values, 95)), 1),
+        "p99_ms": round(float(np.percentile(values, 99)), 1),
+        "max_ms": round(float(values.max()), 1),
+    }
+
+
+async def load_test(base_url, sessions, duration, think_time, ramp, server_pid=None, seed=0):
+    url = base_url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+    # One visit first, so the run measures a warm server rather than the dataset load
+    warmup = {"latencies": {}, "journeys": 0, "errors": [], "exceptions": 0}
+    await run_user(url, seed, time.perf_counter() + RERUN_TIMEOUT, 0, 0, warmup)
+
+    results = {"latencies": {}, "journeys": 0, "errors": [], "exceptions": 0}
+    memory, stop = [], asyncio.Event()
+    sampler = asyncio.ensure_future(sample_memory(server_pid, memory, stop)) if server_pid else None
+    memory_before = rss_mb(server_pid) if server_pid else None
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(run_user(url, seed + 1 + i, deadline, think_time, ramp * i / max(sessions, 1), results)
+                           for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    if sampler is not None:
+        # Sessions are closed now; give the server a moment to drop them before the last sample
+        await asyncio.sleep(2.0)
+        stop.set()
+        await sampler
+
+    every = [seconds for values in results["latencies"].values() for seconds in values]
+    report = {
+        "sessions": sessions,
+        "duration_seconds": round(elapsed, 1),
+        "think_time_seconds": think_time,
+        "reruns": len(every),
+        "journeys": results["journeys"],
+        "throughput_reruns_per_second": round(len(every) / elapsed, 2),
+        "latency": latency_summary(every),
+        "latency_by_action": {action: latency_summary(values) for action, values in results["latencies"].items()},
+        "script_exceptions": results["exceptions"],
+        "errors": len(results["errors"]),
+        "error_samples": sorted(set(results["errors"]))[:5],
+        "warmup_first_load_ms": latency_summary(warmup["latencies"].get("load", [])).get("max_ms"),
+    }
+    if memory:
+        values = [value for _, value in memory]
+        report["server_memory_mb"] = {
+            "before": round(memory_before, 1),
+            "peak": round(max(values), 1),
+            "after": round(values[-1], 1),
+            "growth": round(values[-1] - memory_before, 1),
+        }
+    report["client_memory_mb"] = rss_mb(os.getpid())
+    return report
+
+
+# Start `streamlit run` on a free port with the stub services; returns (process, base_url).
+# The server's stderr goes to a temporary file: an undrained pipe would fill up on a long run
+# and block the server under test.
+def start_app_server(env, port):
+    command = [sys.executable, "-m", "streamlit", "run", os.path.join(REPO_ROOT, "Yaatrimitra.py"),
+               "--server.headless", "true", "--server.address", "127.0.0.1", "--server.port", str(port),
+               "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"]
+    with tempfile.TemporaryFile() as log:
+        process = subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=log)
+        base_url = f"http://127.0.0.1:{port}"
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if process.poll() is not None:
+                log.seek(0)
+                raise RuntimeError(f"streamlit exited: {log.read().decode(errors='replace')[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"{base_url}/_stcore/health", timeout=1) as response:
+                    if response.read() == b"ok":
+                        return process, base_url
+            except OSError:
+                time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("streamlit did not become healthy within 60s")
+
+
+def _free_port():
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    from stub_server import nominatim_url, start_stub_server, weather_base_url
+
+    parser = argparse.ArgumentParser(description="Drive the app with many concurrent simulated users")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="concurrent users")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds of load")
+    parser.add_argument("--think-time", type=float, default=DEFAULT_THINK_TIME,
+                        help="mean seconds between a user's interactions (0 clicks as fast as possible)")
+    parser.add_argument("--ramp", type=float, default=DEFAULT_RAMP, help="seconds over which users join")
+    parser.add_argument("--stub-latency", type=float, default=0.2,
+                        help="seconds the weather and geocoding stubs take per request")
+    parser.add_argument("--dataset", help="workbook for the app to serve")
+    parser.add_argument("--rows", type=int, help="serve a synthetic catalogue of this many hotels instead")
+    parser.add_argument("--weather-prefetch", action="store_true", help="keep the background weather refresher on")
+    parser.add_argument("--server-url", help="load an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="process id of --server-url, for its memory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the report JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    stub = start_stub_server(latency=args.stub_latency)
+    process = None
+    base_url, server_pid = args.server_url, args.server_pid
+    try:
+        if base_url is None:
+            env = {**os.environ, "PYTHONPATH": REPO_ROOT,
+                   "OPENWEATHER_BASE_URL": weather_base_url(stub), "NOMINATIM_URL": nominatim_url(stub),
+                   "WEATHER_PREFETCH": "1" if args.weather_prefetch else "0"}
+            if args.rows:
+                from synthetic_dataset import WORKDIR, cached_dataset
+
+                env["YAATRIMITRA_DATASET"] = cached_dataset(WORKDIR, args.rows, args.seed)
+            elif args.dataset:
+                env["YAATRIMITRA_DATASET"] = os.path.abspath(args.dataset)
+            process, base_url = start_app_server(env, _free_port())
+            server_pid = process.pid
+
+        report = asyncio.run(load_test(base_url, args.sessions, args.duration, args.think_time, args.ramp,
+                                       server_pid, args.seed))
+        report["stub_latency_seconds"] = args.stub_latency
+        report["stub_requests"] = stub.request_count
+    finally:
+        stub.shutdown()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    latency = report["latency"]
+    print(f"{report['reruns']} reruns from {args.sessions} users in {report['duration_seconds']}s: "
+          f"{report['throughput_reruns_per_second']}/s, p50 {latency.get('p50_ms')} ms, "
+          f"p95 {latency.get('p95_ms')} ms, p99 {latency.get('p99_ms')} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
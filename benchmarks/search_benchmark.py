@@ -0,0 +1,325 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import warnings
+
+# Microbenchmarks of the search path on synthetic catalogues of growing size. Each stage is timed
+# on its own at each size; results go to JSON so runs on different commits can be compared.
+#   python benchmarks/search_benchmark.py --sizes 1000,10000,100000 -o bench.json
+#   python benchmarks/search_benchmark.py --sizes 1000,10000,100000 --compare bench.json
+# At 1M hotels and up, stages with a budget in BUDGETS_MS fail the run when their median is over it.
+# Fully offline: weather and geocoding requests go to the local stub server, coordinates come
+# from a temporary store. Generated catalogues are cached in --workdir between runs.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# A price calendar in the working directory belongs to the real dataset, not the synthetic one
+os.environ["PRICE_CALENDAR"] = ""
+
+import numpy as np  # noqa: E402
+
+from synthetic_dataset import DESTINATION_CENTERS, WORKDIR, cached_dataset, hotel_coordinates  # noqa: E402
+
+# The map tiles warning is about the browser fetching tiles, which never happens here
+warnings.filterwarnings("ignore", message="CartoDB tiles", category=UserWarning)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+# Timed runs per stage; stages that rebuild the whole store run fewer times
+DEFAULT_REPEATS = 50
+BUILD_REPEATS = 3
+# Hotels on the benchmarked results map
+MAP_HOTELS = 50
+# Median budgets in ms for catalogues of at least BUDGET_MIN_SIZE hotels; the run exits 1 past them
+BUDGET_MIN_SIZE = 1_000_000
+BUDGETS_MS = {
+    "name_search": 5.0,
+}
+
+
+# {"runs", "min_ms", "median_ms", "p95_ms", "mean_ms"} over the timings of fn(i) for i in range(repeats)
+def measure(fn, repeats, warmup=1):
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    samples = np.array(samples) * 1000
+    return {
+        "runs": repeats,
+        "min_ms": round(float(samples.min()), 4),
+        "median_ms": round(float(np.median(samples)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+        "mean_ms": round(float(samples.mean()), 4),
+    }
+
+
+# A coordinate store filled as `python geocode.py` would have left it
+def fill_geocode_store(path, df, seed=0):
+    from geocode import SOURCE_NOMINATIM, GeocodeStore
+
+    if os.path.exists(path):
+        os.remove(path)
+    store = GeocodeStore(path)
+    coordinates = hotel_coordinates(df, seed)
+    store.put_many(((name, city, float(lat), float(lon)) for name, city, (lat, lon)
+                    in zip(df["Hotel Name"], df["Destination"].astype(str), coordinates)), SOURCE_NOMINATIM)
+    return store
+
+
+# Name with one character dropped, like a typo in the search box
+def _typo(name, rng):
+    position = int(rng.integers(0, len(name)))
+    return name[:position] + name[position + 1:]
+
+
+def bench_size(n, repeats, workdir, seed=0):
+    from amenities import canonical_amenity
+    from engine import RecommendationEngine
+    from hotel_index import PRICE_BANDS, band_range
+    from ranking import FEATURES
+    from render import clear_fragment_caches, render_card_list
+    from results_map import create_results_map
+    from snapshot import load_dataset
+    from store import HotelStore
+    from weather import WeatherClient
+
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+    path = cached_dataset(workdir, n, seed)
+    generate_seconds = time.perf_counter() - started
+    build_repeats = min(repeats, BUILD_REPEATS)
+
+    stages = {}
+    stages["load_snapshot"] = measure(lambda i: load_dataset(path), build_repeats)
+    df = load_dataset(path)
+    # Every derived structure from scratch: indexes, amenity bitmasks, ranking features, name index
+    stages["build_store"] = measure(lambda i: HotelStore(df), build_repeats, warmup=0)
+    store = HotelStore(df, path)
+    geocode_store = fill_geocode_store(os.path.join(workdir, f"geocode-{n}-{seed}.sqlite"), store.df, seed)
+    weather_client = WeatherClient(base_url="http://127.0.0.1:9/unused")
+    stages["build_engine"] = measure(
+        lambda i: RecommendationEngine(store, weather_client=weather_client, geocode_store=geocode_store),
+        build_repeats, warmup=0)
+    engine = RecommendationEngine(store, weather_client=weather_client, geocode_store=geocode_store)
+
+    destinations = list(store.hotel_index.destinations)
+    bands = [band_range(band) for band in PRICE_BANDS]
+    amenity_names = list(store.amenity_catalogue.names)
+    queries = []
+    for i in range(repeats + 1):
+        destination = destinations[int(rng.integers(len(destinations)))]
+        low, high = bands[int(rng.integers(len(bands)))]
+        queries.append({
+            "destination": destination,
+            # A distinct price bound per query, so every search misses the result cache
+            "min_price": (low or 0) + i * 1e-3,
+            "max_price": high,
+            "amenities": list(rng.choice(amenity_names, size=int(rng.integers(1, 3)), replace=False)),
+            "weights": dict(zip(FEATURES, np.round(rng.random(len(FEATURES)), 2))),
+        })
+
+    def price_filter(i):
+        q = queries[i]
+        return store.hotel_index.select(q["destination"], q["min_price"], q["max_price"])
+
+    def amenity_filter(i):
+        q = queries[i]
+        rows = store.hotel_index.select(q["destination"])
+        return rows[store.amenity_catalogue.has_all(q["amenities"], rows)]
+
+    def rank_top5(i):
+        q = queries[i]
+        return store.ranker.page(price_filter(i), 0, 5, weights=q["weights"], destination=q["destination"])
+
+    # New weights each time, so the destination's full ordering is computed rather than cached
+    def rank_destination(i):
+        q = queries[i]
+        return store.ranker.page(store.hotel_index.select(q["destination"]), 0, 5, weights=q["weights"],
+                                 destination=q["destination"])
+
+    pages = [rank_top5(i) for i in range(repeats + 1)]
+
+    def render_cold(i):
+        clear_fragment_caches()
+        return render_card_list(store.rows(pages[i]))
+
+    def search_uncached(i):
+        q = queries[i]
+        result = engine.search(q["destination"], q["min_price"], q["max_price"], q["amenities"], q["weights"])
+        return engine.results_page(result, 0, q["destination"], q["weights"], render=True, amenities=q["amenities"])
+
+    cached_query = queries[0]
+    search_uncached(0)
+
+    def search_cached(i):
+        q = cached_query
+        result = engine.search(q["destination"], q["min_price"], q["max_price"], q["amenities"], q["weights"])
+        return engine.results_page(result, 0, q["destination"], q["weights"], render=True, amenities=q["amenities"])
+
+    def radius_search(i):
+        q = queries[i]
+        lat, lon = DESTINATION_CENTERS[q["destination"]]
+        return engine.search(q["destination"], near=(lat, lon, 1.0 + i * 1e-3))
+
+    typos = [_typo(store.names[int(row)], rng) for row in rng.integers(0, len(store.df), repeats + 1)]
+    hotel_rows = rng.integers(0, len(store.df), repeats + 1)
+
+    def map_html(i):
+        q = queries[i]
+        hotels = store.rows(store.hotel_index.select(q["destination"])[:MAP_HOTELS])
+        coordinates = [engine.coordinates(name, q["destination"]) for name in hotels["Hotel Name"]]
+        return create_results_map(hotels, coordinates, DESTINATION_CENTERS[q["destination"]]).get_root().render()
+
+    stages["price_filter"] = measure(price_filter, repeats)
+    stages["amenity_filter"] = measure(amenity_filter, repeats)
+    stages["rank_top5"] = measure(rank_top5, repeats)
+    stages["rank_destination"] = measure(rank_destination, repeats)
+    stages["render_cards_cold"] = measure(render_cold, repeats)
+    stages["render_cards_warm"] = measure(lambda i: render_card_list(store.rows(pages[i])), repeats)
+    stages["search_uncached"] = measure(search_uncached, repeats)
+    stages["search_cached"] = measure(search_cached, repeats)
+    stages["radius_search"] = measure(radius_search, repeats)
+    stages["name_search"] = measure(lambda i: engine.find_hotels(typos[i], 10), repeats)
+    stages["nearby"] = measure(lambda i: engine.nearby(int(hotel_rows[i]), 5), repeats)
+    stages["map_html"] = measure(map_html, min(repeats, 10))
+    geocode_store.close()
+
+    memory = store.df.memory_usage(deep=True).sum()
+    return {
+        "rows": len(store.df),
+        "destinations": len(destinations),
+        "amenities": len({canonical_amenity(name) for name in amenity_names}),
+        "dataset_mb": round(memory / 1e6, 1),
+        "generate_seconds": round(generate_seconds, 2),
+        "stages": stages,
+    }
+
+
+# External calls against the local stub, to check the client overhead around them
+def bench_services(repeats):
+    import requests
+
+    from geocode import geocode
+    from stub_server import nominatim_url, start_stub_server, weather_base_url
+    from weather import WeatherClient
+
+    server = start_stub_server()
+    try:
+        client = WeatherClient(base_url=weather_base_url(server))
+        session = requests.Session()
+        cities = list(DESTINATION_CENTERS)
+        return {
+            "weather_request": measure(lambda i: client.fetch(cities[i % len(cities)]), repeats),
+            "weather_cached": measure(lambda i: client.get(cities[i % len(cities)]), repeats),
+            "geocode_request": measure(
+                lambda i: geocode(f"Hotel {i}", cities[i % len(cities)], session=session,
+                                  base_url=nominatim_url(server)), repeats),
+        }
+    finally:
+        server.shutdown()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, repeats, workdir, seed=0):
+    import pandas as pd
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor() or None,
+            "cpus": os.cpu_count(),
+            "repeats": repeats,
+            "seed": seed,
+        },
+        "sizes": {},
+        "services": bench_services(repeats),
+    }
+    for n in sizes:
+        print(f"Benchmarking {n} hotels...", file=sys.stderr)
+        results["sizes"][str(n)] = bench_size(n, repeats, workdir, seed)
+    return results
+
+
+# Median of every stage next to a baseline run's, with the ratio (above 1 is slower)
+def compare(results, baseline):
+    lines = [f"{'stage':<20} {'size':>9} {'baseline ms':>12} {'now ms':>10} {'ratio':>7}"]
+    sections = [("-", results["services"], baseline.get("services", {}))]
+    sections += [(size, entry["stages"], baseline.get("sizes", {}).get(size, {}).get("stages", {}))
+                 for size, entry in results["sizes"].items()]
+    for size, stages, old_stages in sections:
+        for stage, timing in stages.items():
+            old = old_stages.get(stage)
+            if old is None:
+                continue
+            ratio = timing["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+            lines.append(f"{stage:<20} {size:>9} {old['median_ms']:>12.3f} {timing['median_ms']:>10.3f} "
+                         f"{ratio:>7.2f}")
+    return "\n".join(lines)
+
+
+# Stages whose median went over budget, e.g. "name_search at 1000000 hotels: median 7.20 ms (budget 5.00 ms)"
+def budget_failures(results):
+    failures = []
+    for size, entry in results["sizes"].items():
+        if int(size) < BUDGET_MIN_SIZE:
+            continue
+        for stage, budget in BUDGETS_MS.items():
+            median = entry["stages"][stage]["median_ms"]
+            if median > budget:
+                failures.append(f"{stage} at {size} hotels: median {median:.2f} ms (budget {budget:.2f} ms)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the search path on synthetic catalogues")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated catalogue sizes, e.g. 1000,100000,1000000")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="timed runs per stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=WORKDIR, help="where generated catalogues are cached")
+    parser.add_argument("--fresh", action="store_true", help="regenerate the catalogues")
+    parser.add_argument("-o", "--output", help="write the results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="results JSON of an earlier run to compare against")
+    args = parser.parse_args()
+
+    if args.fresh and os.path.isdir(args.workdir):
+        shutil.rmtree(args.workdir)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = run(sizes, args.repeats, args.workdir, args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(results, json.load(f)), file=sys.stderr)
+
+    failures = budget_failures(results)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Startup budget check: fails (exit 1) when importing the app's modules or the first
+# script run gets slower than its budget, or when a heavy dependency is imported eagerly.
+#   python benchmarks/startup_budget.py --dataset Dataset_final.xlsx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, measured in a fresh interpreter
+BUDGETS = {
+    "import_seconds": 2.0,
+    "first_run_seconds": 5.0,
+}
+
+# Modules the app imports at the top of Yaatrimitra.py
+APP_MODULES = ("streamlit", "snapshot", "hotel_index", "amenities", "ranking", "weather", "geocode", "results_map",
+               "store", "query_cache", "render", "assets", "engine", "pricing", "geo_index", "name_search",
+               "similar_hotels", "metrics", "reload")
+
+# Heavy dependencies that must only load on first use
+LAZY_MODULES = ("nltk", "folium", "streamlit_folium", "sklearn")
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "eager": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+FIRST_RUN_PROBE = """
+import json, os, sys, time
+from streamlit.testing.v1 import AppTest
+from stub_server import start_stub_server
+server = start_stub_server()
+host, port = server.server_address[:2]
+os.environ["OPENWEATHER_BASE_URL"] = f"http://{{host}}:{{port}}/data/2.5"
+app = AppTest.from_file({script!r}, default_timeout=60)
+start = time.perf_counter()
+app.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "exceptions": [str(e.value) for e in app.exception],
+                  "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe(code, env):
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(dataset=None):
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT, "WEATHER_PREFETCH": "0"}
+    if dataset:
+        env["YAATRIMITRA_DATASET"] = os.path.abspath(dataset)
+
+    imports = _probe(IMPORT_PROBE.format(modules=APP_MODULES, lazy=LAZY_MODULES), env)
+    script = os.path.join(REPO_ROOT, "Yaatrimitra.py")
+    # Run twice: the first builds the snapshot if needed, the second is a clean cold-process run
+    _probe(FIRST_RUN_PROBE.format(script=script, lazy=LAZY_MODULES), env)
+    first_run = _probe(FIRST_RUN_PROBE.format(script=script, lazy=LAZY_MODULES), env)
+    return {
+        "import_seconds": imports["seconds"],
+        "eager_imports": imports["eager"],
+        "first_run_seconds": first_run["seconds"],
+        "first_run_exceptions": first_run["exceptions"],
+        "first_run_loaded": first_run["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check app import time and first-run time against budgets")
+    parser.add_argument("--dataset", help="workbook to run the app against")
+    parser.add_argument("--import-budget", type=float, default=BUDGETS["import_seconds"])
+    parser.add_argument("--first-run-budget", type=float, default=BUDGETS["first_run_seconds"])
+    args = parser.parse_args()
+
+    result = measure(args.dataset)
+    print(json.dumps(result, indent=2))
+
+    failures = []
+    if result["import_seconds"] > args.import_budget:
+        failures.append(f"import took {result['import_seconds']:.2f}s (budget {args.import_budget:.2f}s)")
+    if result["eager_imports"]:
+        failures.append(f"imported eagerly: {', '.join(result['eager_imports'])}")
+    if result["first_run_seconds"] > args.first_run_budget:
+        failures.append(f"first run took {result['first_run_seconds']:.2f}s (budget {args.first_run_budget:.2f}s)")
+    if result["first_run_exceptions"]:
+        failures.append(f"first run raised: {result['first_run_exceptions']}")
+    if "nltk" in result["first_run_loaded"]:
+        failures.append("the web process loaded nltk")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
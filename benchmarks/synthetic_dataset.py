@@ -0,0 +1,207 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Synthetic hotel catalogues with the bundled workbook's schema, for benchmarks at scales the
+# real data doesn't reach. Same seed and size give the same catalogue.
+#   python benchmarks/synthetic_dataset.py --rows 100000 -o /tmp/Hotels_100k.xlsx
+# Writes the workbook and its Arrow snapshot, so the app can run on it straight away:
+#   YAATRIMITRA_DATASET=/tmp/Hotels_100k.xlsx streamlit run Yaatrimitra.py
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Bump when the generated values change so cached benchmark catalogues are regenerated
+GENERATOR_VERSION = "1"
+# Where benchmarks cache the catalogues they generate
+WORKDIR = os.path.join(tempfile.gettempdir(), "yaatrimitra-bench")
+
+COLUMNS = ("Destination", "Hotel Name", "Ratings", "Hotel Type", "Additional facilities", "Price", "Amenities",
+           "sentiment_score")
+
+# The real destinations first; catalogue share falls off with rank, like real travel demand
+DESTINATIONS = ("Manali", "Darjeeling", "Munnar", "Shimla", "Ooty", "Goa", "Rishikesh", "Jaipur", "Udaipur", "Leh",
+                "Gangtok", "Coorg", "Mussoorie", "Nainital", "Kodaikanal", "Pondicherry", "Varanasi", "Alleppey",
+                "Mysuru", "Hampi")
+
+# Approximate town centres; hotels are scattered a few km around them
+DESTINATION_CENTERS = {
+    "Manali": (32.2396, 77.1887), "Darjeeling": (27.0410, 88.2663), "Munnar": (10.0889, 77.0595),
+    "Shimla": (31.1048, 77.1734), "Ooty": (11.4102, 76.6950), "Goa": (15.4909, 73.8278),
+    "Rishikesh": (30.0869, 78.2676), "Jaipur": (26.9124, 75.7873), "Udaipur": (24.5854, 73.7125),
+    "Leh": (34.1526, 77.5771), "Gangtok": (27.3389, 88.6065), "Coorg": (12.4244, 75.7382),
+    "Mussoorie": (30.4598, 78.0644), "Nainital": (29.3919, 79.4542), "Kodaikanal": (10.2381, 77.4892),
+    "Pondicherry": (11.9416, 79.8083), "Varanasi": (25.3176, 82.9739), "Alleppey": (9.4981, 76.3388),
+    "Mysuru": (12.2958, 76.6394), "Hampi": (15.3350, 76.4600),
+}
+# Spread of hotels around their town centre, in degrees (about 3 km)
+CENTER_SPREAD = 0.03
+
+# Hotel type -> (share of hotels, median price per night in ₹), after the bundled workbook
+HOTEL_TYPES = {
+    "3-star hotel": (0.35, 1800), "Hotel": (0.20, 1700), "2-star hotel": (0.11, 1400), "4-star hotel": (0.08, 3400),
+    "Home Stay": (0.08, 1500), "Resort hotel": (0.04, 2300), "Backpacker Hostel": (0.03, 850),
+    "Cottage": (0.03, 1500), "5-star hotel": (0.03, 8600), "Guest house": (0.01, 1300),
+    "Bed & breakfast": (0.01, 1800), "1-star hotel": (0.01, 1150), "Lodge": (0.01, 1150), "Inn": (0.01, 1100),
+}
+
+# Amenity -> share of hotels offering it, after the bundled workbook
+AMENITIES = {
+    "Free Wi-Fi": 0.69, "Breakfast": 0.61, "Wi-Fi": 0.51, "Free breakfast": 0.48, "Free parking": 0.35,
+    "Pool": 0.16, "Air-conditioned": 0.12, "Parking": 0.10, "Spa": 0.09, "Restaurant": 0.09,
+    "Airport shuttle": 0.09, "Hot tub": 0.03, "Pet-friendly": 0.01,
+}
+
+# Pieces of "Additional facilities" descriptions, e.g. "Relaxed hillside hotel with dining & a spa"
+DESCRIPTION_STYLES = ("Casual", "Relaxed", "Modest", "Unassuming", "Polished", "Upscale", "Cosy", "Laid-back",
+                      "Informal", "Refined", "Tranquil")
+DESCRIPTION_PLACES = ("hotel", "hillside hotel", "budget hotel", "resort", "lodging", "mountainside hotel",
+                      "hilltop hotel", "quarters")
+DESCRIPTION_FEATURES = ("dining", "a restaurant", "a spa", "a terrace", "a gym", "views of the valley",
+                        "a vegetarian eatery", "guided hikes", "a dining room", "a lounge", "2 restaurants",
+                        "massages", "an Ayurvedic spa", "forest views")
+# Share of hotels without a description, as in the bundled workbook
+MISSING_DESCRIPTION_SHARE = 0.6
+
+# Pieces of hotel names, e.g. "Hotel Pine Crest Residency"
+NAME_PREFIXES = ("Hotel", "The", "Royal", "Grand", "Hotel", "", "", "")
+NAME_CORES = ("Pine", "Cedar", "Himalayan", "Snow", "Valley", "River", "Maple", "Emerald", "Alpine", "Tea County",
+              "Hillview", "Orchid", "Misty", "Sunrise", "Silver Oak", "Blue Moon", "Heritage", "Forest",
+              "Mountain Trail", "Green Park", "Lake View", "Summit", "Cloud Nine", "Rhododendron", "Sandalwood")
+NAME_SUFFIXES = ("Retreat", "Residency", "Inn", "Resort", "Homestay", "Cottages", "Lodge", "Palace", "Suites",
+                 "Regency", "Villa", "Camp", "Stay", "Manor", "House")
+
+
+def _choice(rng, options, size, weights=None):
+    options = np.array(options, dtype=object)
+    if weights is not None:
+        weights = np.asarray(weights, dtype="float64")
+        weights = weights / weights.sum()
+    return options[rng.choice(len(options), size=size, p=weights)]
+
+
+# Unique within a destination: repeats get a number, as chains do ("Hotel Pine Inn 2")
+def _hotel_names(rng, destinations):
+    n = len(destinations)
+    names = pd.Series(_choice(rng, NAME_PREFIXES, n)) + " " + _choice(rng, NAME_CORES, n) + " " \
+        + _choice(rng, NAME_SUFFIXES, n)
+    # A third of the hotels carry the destination in their name, like "Munnar Resort"
+    with_city = rng.random(n) < 0.3
+    names[with_city] = names[with_city] + " " + destinations[with_city]
+    names = names.str.strip()
+    repeat = names.groupby([names, pd.Series(destinations)]).cumcount().to_numpy()
+    numbered = repeat > 0
+    names[numbered] = names[numbered] + " " + (repeat[numbered] + 1).astype(str)
+    return names.to_numpy(dtype=object)
+
+
+def _amenity_lists(rng, n):
+    names = list(AMENITIES)
+    offered = rng.random((n, len(names))) < np.array(list(AMENITIES.values()))
+    # Shuffle each hotel's listing order, as the source data has no canonical order
+    order = np.argsort(rng.random((n, len(names))), axis=1)
+    offered = np.take_along_axis(offered, order, axis=1)
+    names = np.array(names, dtype=object)[order]
+    lists = [", ".join(row_names[row_offered]) for row_names, row_offered in zip(names, offered)]
+    # Hotels listing nothing have an empty cell, as in the workbook
+    return np.array([value or None for value in lists], dtype=object)
+
+
+def _descriptions(rng, n):
+    descriptions = (pd.Series(_choice(rng, DESCRIPTION_STYLES, n)) + " " + _choice(rng, DESCRIPTION_PLACES, n)
+                    + " with " + _choice(rng, DESCRIPTION_FEATURES, n))
+    two_features = rng.random(n) < 0.4
+    descriptions[two_features] = descriptions[two_features] + " & " \
+        + _choice(rng, DESCRIPTION_FEATURES, int(two_features.sum()))
+    descriptions = descriptions.to_numpy(dtype=object)
+    descriptions[rng.random(n) < MISSING_DESCRIPTION_SHARE] = None
+    return descriptions
+
+
+# A catalogue of n hotels spread over the first `destinations` DESTINATIONS
+def generate(n, seed=0, destinations=len(DESTINATIONS)):
+    rng = np.random.default_rng(seed)
+    cities = DESTINATIONS[:max(1, min(destinations, len(DESTINATIONS)))]
+    destination = _choice(rng, cities, n, weights=1.0 / np.arange(1, len(cities) + 1) ** 0.8)
+
+    hotel_type = _choice(rng, list(HOTEL_TYPES), n, weights=[share for share, _ in HOTEL_TYPES.values()])
+    median_price = np.array([HOTEL_TYPES[value][1] for value in hotel_type], dtype="float64")
+    price = np.clip(np.round(median_price * rng.lognormal(0.0, 0.35, n)), 300, 50000).astype("int64")
+
+    ratings = np.round(np.clip(rng.normal(4.28, 0.37, n), 3.0, 5.0), 1)
+    # Guest sentiment tracks the star rating loosely
+    sentiment = np.clip(0.27 + (ratings - 4.28) * 0.2 + rng.normal(0.0, 0.14, n), -0.6, 0.9)
+
+    df = pd.DataFrame({
+        "Destination": destination,
+        "Hotel Name": _hotel_names(rng, destination),
+        "Ratings": ratings,
+        "Hotel Type": hotel_type,
+        "Additional facilities": _descriptions(rng, n),
+        "Price": price,
+        "Amenities": _amenity_lists(rng, n),
+        "sentiment_score": sentiment,
+    })
+    return df[list(COLUMNS)]
+
+
+# (lat, lon) per hotel around its destination's centre, standing in for geocoded positions
+def hotel_coordinates(df, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    centers = np.array([DESTINATION_CENTERS[city] for city in df["Destination"].astype(str)], dtype="float64")
+    return (centers + rng.normal(0.0, CENTER_SPREAD, centers.shape)).reshape(-1, 2)
+
+
+# Write the catalogue as a workbook plus its Arrow snapshot, so loading it never parses the workbook
+def write_dataset(df, path):
+    import openpyxl
+
+    from snapshot import clean_dataset, write_snapshot
+
+    # Write-only mode streams rows instead of holding every cell in memory
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(df.columns))
+    for row in df.itertuples(index=False):
+        sheet.append([None if isinstance(value, float) and np.isnan(value) else value for value in row])
+    tmp_path = f"{path}.tmp.{os.getpid()}.xlsx"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+    write_snapshot(clean_dataset(df.copy()), path)
+    return path
+
+
+# Workbook for (n, seed) in a cache directory, generated on first use
+def cached_dataset(directory, n, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"synthetic-v{GENERATOR_VERSION}-{n}-{seed}.xlsx")
+    from snapshot import snapshot_is_fresh, snapshot_path_for
+
+    if not (os.path.exists(path) and snapshot_is_fresh(path, snapshot_path_for(path))):
+        write_dataset(generate(n, seed), path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic hotel catalogue workbook and snapshot")
+    parser.add_argument("--rows", type=int, default=100_000, help="hotels to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--destinations", type=int, default=len(DESTINATIONS),
+                        help=f"number of destinations (at most {len(DESTINATIONS)})")
+    parser.add_argument("-o", "--output", help="workbook path (default synthetic-<rows>.xlsx)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = generate(args.rows, args.seed, args.destinations)
+    path = write_dataset(df, args.output or f"synthetic-{args.rows}.xlsx")
+    print(f"Wrote {len(df)} hotels in {df['Destination'].nunique()} destinations to {path} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import math
+import os
+
+import numpy as np
+
+from geo_index import GeoIndex, dataset_coordinates
+from geocode import CITY_COORDINATES, DEFAULT_CENTER, GEOCODE_DB, GeocodeStore, lookup_coordinates
+from metrics import gauges_from, timed
+from query_cache import QueryCache, QueryResult, add_page, query_key
+from render import fragment_cache_info, render_card_list
+from snapshot import DATASET_PATH, load_dataset
+from store import HotelStore
+from weather import WeatherClient
+
+# The recommendation core without any UI: dataset store, filtering, ranking, weather and coordinates.
+# Yaatrimitra.py and api.py are both thin clients of one process-wide engine.
+
+# Hotels per page of results
+RESULTS_PAGE_SIZE = int(os.environ.get("RESULTS_PAGE_SIZE", "5"))
+
+# Dataset columns returned for a hotel, and their names in hotel records
+RECORD_FIELDS = {
+    "Hotel Name": "name",
+    "Destination": "destination",
+    "Hotel Type": "hotel_type",
+    "Additional facilities": "description",
+    "Price": "price",
+    "Ratings": "ratings",
+    "sentiment_score": "sentiment",
+}
+
+
+# Raised for requests the engine can't answer, e.g. an unknown hotel id
+class NotFound(Exception):
+    pass
+
+
+# JSON-friendly scalar: numpy numbers become Python ones and missing values None.
+# float32 columns go through their shortest repr so 4.1 doesn't come out as 4.099999904632568.
+def _plain(value):
+    if isinstance(value, np.floating):
+        value = float(str(value))
+    elif isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class RecommendationEngine:
+    def __init__(self, store, weather_client=None, geocode_store=None, query_cache=None,
+                 page_size=RESULTS_PAGE_SIZE, previous=None):
+        self.store = store
+        self.weather_client = weather_client or WeatherClient(cache_dir=os.environ.get("WEATHER_CACHE_DIR"))
+        self.geocode_store = geocode_store
+        self.query_cache = query_cache or QueryCache(max_entries=int(os.environ.get("QUERY_CACHE_SIZE", "256")))
+        self.page_size = page_size
+        # Proximity index over every hotel's coordinates, built once at load
+        self.geo_index = GeoIndex(self._coordinates(store, previous)) if len(store.df) else None
+
+    # Coordinates of every row. A hotel's position depends only on its name and destination, so hotels
+    # the previous engine already placed keep their point and only added ones are looked up.
+    def _coordinates(self, store, previous=None):
+        if previous is None or previous.geo_index is None or store.diff is None:
+            return dataset_coordinates(store.df, self.geocode_store)
+        coordinates = np.empty((len(store.df), 2), dtype="float64")
+        kept = np.flatnonzero(store.diff.new_to_old >= 0)
+        coordinates[kept, 0] = previous.geo_index.lats[store.diff.new_to_old[kept]]
+        coordinates[kept, 1] = previous.geo_index.lons[store.diff.new_to_old[kept]]
+        coordinates[store.diff.added] = dataset_coordinates(store.df.iloc[store.diff.added], self.geocode_store)
+        return coordinates
+
+    # Engine over the dataset snapshot with default clients, for scripts and the API server
+    @classmethod
+    def from_dataset(cls, source_path=DATASET_PATH, geocode_db=GEOCODE_DB, **kwargs):
+        geocode_store = GeocodeStore(geocode_db) if os.path.exists(geocode_db) else None
+        return cls(HotelStore(load_dataset(source_path), source_path), geocode_store=geocode_store, **kwargs)
+
+    # Engine over a newer store built from this one's (HotelStore(df, previous=...)), sharing the
+    # weather client and coordinate store. Results are cached afresh for the new version.
+    def updated(self, store):
+        return RecommendationEngine(store, self.weather_client, self.geocode_store,
+                                    QueryCache(max_entries=self.query_cache.max_entries), self.page_size,
+                                    previous=self)
+
+    @property
+    def destinations(self):
+        return self.store.hotel_index.destinations
+
+    # The (check_in, check_out) pair prices depend on, or None when prices don't vary by date
+    def stay(self, check_in=None, check_out=None):
+        if self.store.calendar is None or check_in is None or check_out is None or check_out <= check_in:
+            return None
+        return check_in, check_out
+
+    # Every hotel matching the criteria; results are cached across callers, pages are ranked lazily.
+    # With a price calendar and dates, the price range applies to each hotel's average nightly price
+    # for that stay and ranking uses it too. near=(lat, lon, radius_km) and bbox=(south, west, north, east)
+    # keep only hotels within a distance of a point or inside a map viewport.
+    @timed("search")
+    def search(self, destination, min_price=None, max_price=None, amenities=(), weights=None, nights=1,
+               check_in=None, check_out=None, near=None, bbox=None):
+        stay = self.stay(check_in, check_out)
+        area = ("near",) + tuple(near) if near else ("bbox",) + tuple(bbox) if bbox else None
+        key = query_key(destination, min_price, max_price, amenities, weights, nights, stay, area)
+        result = self.query_cache.get(key, self.store.version)
+        if result is None:
+            prices = None
+            if stay is None:
+                # Filter hotels based on criteria (binary search over the destination's price-sorted rows)
+                rows = self.store.hotel_index.select(destination, min_price, max_price)
+            else:
+                rows = self.store.hotel_index.select(destination)
+            # Filter based on selected amenities (bitwise AND against the amenity bitmasks)
+            if amenities:
+                rows = rows[self.store.amenity_catalogue.has_all(amenities, rows)]
+            if area is not None:
+                rows = rows[self._in_area(area, rows)]
+            if stay is not None:
+                # One vectorised prefix-sum lookup prices the stay at every candidate
+                prices = self.store.calendar.nightly_prices(rows, *stay)
+                keep = np.ones(len(rows), dtype=bool)
+                if min_price is not None:
+                    keep &= prices >= min_price
+                if max_price is not None:
+                    keep &= prices <= max_price
+                rows, prices = rows[keep], prices[keep]
+            result = QueryResult(rows, prices, stay, {})
+            self.query_cache.put(key, result, self.store.version)
+        return result
+
+    # Up to limit (row, similarity) pairs for a typed hotel name, best first; tolerates typos
+    @timed("name_search")
+    def find_hotels(self, query, limit=10):
+        return self.store.name_index.search(query, self.store.names, self.store.destinations, limit)
+
+    # (rows, similarity) of up to n hotels most like a hotel, from the precomputed neighbour lists.
+    # Empty until `python similar_hotels.py` has been run for the current dataset version.
+    @timed("similar")
+    def similar(self, hotel_id, n=5):
+        if not 0 <= hotel_id < len(self.store.df):
+            raise NotFound(f"no hotel with id {hotel_id}")
+        if self.store.similar is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        return self.store.similar.of(hotel_id, n)
+
+    # Mask over rows of those inside a proximity area; the grid index finds them without a full scan
+    def _in_area(self, area, rows):
+        if area[0] == "near":
+            inside, _ = self.geo_index.within_radius(*area[1:])
+        else:
+            inside = self.geo_index.within_bbox(*area[1:])
+        mask = np.zeros(len(self.store.df), dtype=bool)
+        mask[inside] = True
+        return mask[rows]
+
+    # (rows, distances_km) of the n hotels nearest to a hotel, nearest first
+    @timed("nearby")
+    def nearby(self, hotel_id, n=5):
+        if not 0 <= hotel_id < len(self.store.df):
+            raise NotFound(f"no hotel with id {hotel_id}")
+        return self.geo_index.nearest_to_row(hotel_id, n)
+
+    # How many of the result's rows the ranking can list; rows without a sentiment score are never shown
+    def ranked_count(self, result):
+        return int(np.count_nonzero(self.store.ranker.valid[result.rows]))
+
+    # Nightly price of the result's stay at the given rows, or None when prices don't vary by date
+    def stay_prices(self, result, rows):
+        if result.stay is None:
+            return None
+        return self.store.calendar.nightly_prices(rows, *result.stay)
+
+    # One ranked page of a search result. Pass the criteria used for the search, amenities included, since
+    # ranking scores how well each hotel matches them. With render=True the page also gets its card HTML;
+    # both are computed on first use and shared through the cache.
+    def results_page(self, result, page, destination, weights=None, nights=1, render=False, amenities=()):
+        result_page = result.pages.get(page)
+        if result_page is None:
+            with timed("rank"):
+                rows = self.store.ranker.page(result.rows, page, self.page_size, weights=weights, nights=nights,
+                                              destination=destination, prices=result.prices, amenities=amenities)
+                result_page = add_page(result, page, rows, None)
+        if render and result_page.fragment is None:
+            with timed("render_cards"):
+                hotels = self.store.rows(result_page.rows)
+                prices = self.stay_prices(result, result_page.rows)
+                if prices is not None:
+                    # Cards show the average nightly price for the chosen dates
+                    hotels = hotels.assign(Price=prices)
+                fragment = render_card_list(hotels, first_rank=page * self.page_size)
+                result_page = add_page(result, page, result_page.rows, fragment)
+        return result_page
+
+    # A hotel as a plain dict; the id is its row position in the current dataset version
+    def hotel_record(self, row):
+        hotel = self.store.df.iloc[row]
+        record = {"id": int(row)}
+        for column, field in RECORD_FIELDS.items():
+            if column in hotel:
+                record[field] = _plain(hotel[column])
+        record["amenities"] = self.store.amenity_catalogue.amenities_of(row)
+        record["lat"], record["lon"] = self.geo_index.point(row)
+        return record
+
+    def hotel(self, hotel_id):
+        if not 0 <= hotel_id < len(self.store.df):
+            raise NotFound(f"no hotel with id {hotel_id}")
+        return self.hotel_record(hotel_id)
+
+    # (weather, icon_url) for a city, from the shared TTL cache
+    @timed("weather")
+    def weather(self, city):
+        return self.weather_client.get(city)
+
+    # Stored coordinates of a hotel; never a network call
+    def coordinates(self, hotel_name, city_name):
+        return lookup_coordinates(self.geocode_store, hotel_name, city_name)
+
+    def city_center(self, city_name):
+        return CITY_COORDINATES.get(city_name, DEFAULT_CENTER)
+
+    # Gauge samples for the metrics output: result cache, card/popup fragment caches and dataset size
+    def metrics(self):
+        query_cache = self.query_cache.stats()
+        samples = [(f"query_cache_{field}", {}, query_cache[field])
+                   for field in ("hits", "misses", "evictions", "entries")]
+        samples += gauges_from("fragment_cache", fragment_cache_info(), "cache")
+        samples.append(("hotels", {"version": self.store.version}, len(self.store.df)))
+        return samples
@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+from geocode import fallback_coordinates
+
+# Grid index over hotel coordinates for proximity queries. Hotels are bucketed into cells of
+# CELL_DEGREES and sorted by cell, so the cells along one latitude band are one contiguous slice:
+# a radius, nearest-N or viewport query binary-searches a handful of bands and measures exact
+# distances only for the hotels in them.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# About 5.5 km of latitude per cell
+CELL_DEGREES = 0.05
+# Longitude cells per latitude band, enough for the whole globe at any cell size >= 0.001 degrees
+_BAND_WIDTH = 1 << 20
+
+
+# Great-circle distance in km; vectorised over numpy arrays
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# Coordinates of every dataset row, from the geocode store where available, the fallback otherwise
+def dataset_coordinates(df, geocode_store=None):
+    stored = geocode_store.all() if geocode_store is not None else {}
+    points = []
+    for name, city in zip(df["Hotel Name"], df["Destination"].astype(str)):
+        row = stored.get((name, city))
+        points.append((row[0], row[1]) if row is not None else fallback_coordinates(name, city))
+    return np.array(points, dtype="float64").reshape(-1, 2)
+
+
+class GeoIndex:
+    def __init__(self, coordinates, cell_degrees=CELL_DEGREES):
+        self.lats = np.ascontiguousarray(coordinates[:, 0])
+        self.lons = np.ascontiguousarray(coordinates[:, 1])
+        self.cell_degrees = cell_degrees
+        rows = np.flatnonzero(np.isfinite(self.lats) & np.isfinite(self.lons))
+        keys = self._key(self._cell(self.lats[rows]), self._cell(self.lons[rows]))
+        order = np.argsort(keys, kind="stable")
+        self._rows = rows[order]
+        self._keys = keys[order]
+
+    def _cell(self, degrees):
+        return np.floor(np.asarray(degrees) / self.cell_degrees).astype(np.int64)
+
+    @staticmethod
+    def _key(lat_cells, lon_cells):
+        return lat_cells * _BAND_WIDTH + (lon_cells + _BAND_WIDTH // 2)
+
+    # Rows whose cell lies in the box; a superset of the rows inside it
+    def _candidates(self, south, west, north, east):
+        # A NaN bound would become an INT64_MIN cell and an endless loop over bands
+        if np.isnan([south, west, north, east]).any():
+            return np.empty(0, dtype=np.intp)
+        south, north = max(south, -90.0), min(north, 90.0)
+        west, east = max(west, -180.0), min(east, 180.0)
+        if south > north or west > east:
+            return np.empty(0, dtype=np.intp)
+        lon_low, lon_high = self._cell(west), self._cell(east)
+        slices = []
+        for band in range(int(self._cell(south)), int(self._cell(north)) + 1):
+            low = np.searchsorted(self._keys, self._key(band, lon_low), side="left")
+            high = np.searchsorted(self._keys, self._key(band, lon_high), side="right")
+            if high > low:
+                slices.append(self._rows[low:high])
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.intp)
+
+    # Rows inside a map viewport (south-west and north-east corners), in dataset order
+    def within_bbox(self, south, west, north, east):
+        rows = self._candidates(south, west, north, east)
+        inside = ((self.lats[rows] >= south) & (self.lats[rows] <= north)
+                  & (self.lons[rows] >= west) & (self.lons[rows] <= east))
+        return np.sort(rows[inside])
+
+    # (rows, distances_km) within radius_km of a point, nearest first
+    def within_radius(self, lat, lon, radius_km):
+        lat_span = radius_km / KM_PER_DEGREE
+        # Near the poles a radius can cover every longitude
+        cos_lat = math.cos(math.radians(min(abs(lat) + lat_span, 90.0)))
+        lon_span = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+        rows = self._candidates(lat - lat_span, lon - lon_span, lat + lat_span, lon + lon_span)
+        distances = haversine_km(lat, lon, self.lats[rows], self.lons[rows])
+        inside = distances <= radius_km
+        rows, distances = rows[inside], distances[inside]
+        order = np.lexsort((rows, distances))
+        return rows[order], distances[order]
+
+    # (rows, distances_km) of the n hotels nearest a point, nearest first. The search radius
+    # doubles until it holds n hotels, so only nearby cells are ever scanned.
+    def nearest(self, lat, lon, n=5, exclude=None):
+        wanted = n + (exclude is not None)
+        radius_km = self.cell_degrees * KM_PER_DEGREE
+        while True:
+            rows, distances = self.within_radius(lat, lon, radius_km)
+            if len(rows) >= wanted or radius_km >= math.pi * EARTH_RADIUS_KM:
+                break
+            radius_km *= 2
+        if exclude is not None:
+            keep = rows != exclude
+            rows, distances = rows[keep], distances[keep]
+        return rows[:n], distances[:n]
+
+    # The n hotels nearest to the hotel at a row
+    def nearest_to_row(self, row, n=5):
+        return self.nearest(self.lats[row], self.lons[row], n, exclude=row)
+
+    def point(self, row):
+        return float(self.lats[row]), float(self.lons[row])
@@ -0,0 +1,223 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from metrics import count
+
+# Coordinate store the app reads from; fill it with `python geocode.py`
+GEOCODE_DB = os.environ.get("GEOCODE_DB", "geocode.sqlite")
+NOMINATIM_URL = os.environ.get("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+# Add a user agent to comply with Nominatim's usage policy
+USER_AGENT = "SmartAccommodationFinderApp/1.0"
+
+# City base coordinates
+CITY_COORDINATES = {
+    "Manali": [32.2396, 77.1887],
+    "Darjeeling": [27.0410, 88.2663],
+    "Munnar": [10.0889, 77.0595]
+}
+DEFAULT_CENTER = [20.5937, 78.9629]
+
+SOURCE_NOMINATIM = "nominatim"
+SOURCE_FALLBACK = "fallback"
+
+
+# Fallback function to use when geocoding fails
+def fallback_coordinates(hotel_name, city_name):
+    center_lat, center_lon = CITY_COORDINATES.get(city_name, DEFAULT_CENTER)
+
+    # Add a small random offset (but cache it based on hotel name for consistency)
+    hash_obj = hashlib.md5(hotel_name.encode())
+    hash_hex = hash_obj.hexdigest()
+
+    # Use the hash to create small offsets (between -0.002 and 0.002)
+    offset_multiplier = int(hash_hex[:8], 16) / (16**8)
+    lat_offset = (offset_multiplier * 0.004) - 0.002
+
+    offset_multiplier = int(hash_hex[8:16], 16) / (16**8)
+    lon_offset = (offset_multiplier * 0.004) - 0.002
+
+    return [center_lat + lat_offset, center_lon + lon_offset]
+
+
+# Persistent hotel coordinates keyed by (hotel name, city), shared by restarts and workers.
+# Each row records whether it came from Nominatim or the fallback so fallbacks can be upgraded.
+class GeocodeStore:
+    def __init__(self, path=GEOCODE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS coordinates (
+                    hotel_name TEXT NOT NULL,
+                    city TEXT NOT NULL,
+                    lat REAL NOT NULL,
+                    lon REAL NOT NULL,
+                    source TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (hotel_name, city)
+                )"""
+            )
+
+    # (lat, lon, source) for a hotel, or None if it was never geocoded
+    def get(self, hotel_name, city_name):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT lat, lon, source FROM coordinates WHERE hotel_name = ? AND city = ?",
+                (hotel_name, city_name),
+            ).fetchone()
+
+    def put(self, hotel_name, city_name, lat, lon, source):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO coordinates VALUES (?, ?, ?, ?, ?, ?)",
+                (hotel_name, city_name, lat, lon, source, time.time()),
+            )
+
+    # Store many (hotel_name, city, lat, lon) rows from one source in a single transaction
+    def put_many(self, rows, source):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO coordinates VALUES (?, ?, ?, ?, ?, ?)",
+                ((hotel_name, city_name, lat, lon, source, now) for hotel_name, city_name, lat, lon in rows),
+            )
+
+    # All stored rows as {(hotel_name, city): (lat, lon, source)}
+    def all(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT hotel_name, city, lat, lon, source FROM coordinates").fetchall()
+        return {(name, city): (lat, lon, source) for name, city, lat, lon, source in rows}
+
+    # The (hotel, city) pairs that still need geocoding
+    def pending(self, pairs, upgrade_fallback=False):
+        stored = self.all()
+        return [
+            pair for pair in pairs
+            if pair not in stored or (upgrade_fallback and stored[pair][2] == SOURCE_FALLBACK)
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Token bucket rate limiter; acquire() blocks until a token is available
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Look up one hotel on Nominatim; [lat, lon], or None when it has no match. Raises on HTTP errors.
+def geocode(hotel_name, city_name, session=None, base_url=NOMINATIM_URL, timeout=(3.05, 10)):
+    import requests
+
+    session = session or requests
+    count("external_requests_total", service="nominatim")
+    params = {
+        "q": f"{hotel_name}, {city_name}",
+        "format": "json",
+        "limit": 1,
+    }
+    response = session.get(base_url, params=params, headers={"User-Agent": USER_AGENT}, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    if data:
+        return [float(data[0]["lat"]), float(data[0]["lon"])]
+    return None
+
+
+# Geocode every pending hotel into the store. Progress is committed per hotel, so an
+# interrupted run resumes where it stopped. Returns (geocoded, fallbacks) counts.
+def geocode_all(pairs, store, rate=1.0, retries=3, upgrade_fallback=False, base_url=NOMINATIM_URL, log=print):
+    import requests
+
+    bucket = TokenBucket(rate)
+    session = requests.Session()
+    pending = store.pending(pairs, upgrade_fallback=upgrade_fallback)
+    geocoded = fallbacks = 0
+    for i, (hotel_name, city_name) in enumerate(pending, 1):
+        coordinates = None
+        for attempt in range(retries):
+            bucket.acquire()
+            try:
+                coordinates = geocode(hotel_name, city_name, session=session, base_url=base_url)
+                break
+            except (requests.RequestException, ValueError) as e:
+                log(f"[{i}/{len(pending)}] {hotel_name}, {city_name}: attempt {attempt + 1} failed: {e}")
+                if attempt < retries - 1:
+                    time.sleep(2 ** attempt)
+            except (KeyError, IndexError, TypeError) as e:
+                # Valid JSON of an unexpected shape (no lat/lon, not a list): asking again won't help,
+                # so count it as a failed lookup and carry on with the batch
+                log(f"[{i}/{len(pending)}] {hotel_name}, {city_name}: unexpected response: {e!r}")
+                break
+
+        if coordinates is not None:
+            store.put(hotel_name, city_name, coordinates[0], coordinates[1], SOURCE_NOMINATIM)
+            geocoded += 1
+        elif store.get(hotel_name, city_name) is None:
+            # Keep the approximate position, marked so a later --upgrade-fallback run retries it
+            lat, lon = fallback_coordinates(hotel_name, city_name)
+            store.put(hotel_name, city_name, lat, lon, SOURCE_FALLBACK)
+            fallbacks += 1
+        log(f"[{i}/{len(pending)}] {hotel_name}, {city_name}: {'ok' if coordinates else 'fallback'}")
+    return geocoded, fallbacks
+
+
+# Coordinates for the UI: a pure local lookup, never a network call
+def lookup_coordinates(store, hotel_name, city_name):
+    row = store.get(hotel_name, city_name) if store is not None else None
+    if row is not None:
+        count("cache_requests_total", cache="geocode", result="hit")
+        return [row[0], row[1]]
+    count("cache_requests_total", cache="geocode", result="miss")
+    return fallback_coordinates(hotel_name, city_name)
+
+
+def main():
+    from snapshot import DATASET_PATH, load_dataset
+
+    parser = argparse.ArgumentParser(description="Geocode every hotel in the dataset into the local store")
+    parser.add_argument("source", nargs="?", default=DATASET_PATH, help="path to the .xlsx workbook")
+    parser.add_argument("--db", default=GEOCODE_DB, help="coordinate store path")
+    parser.add_argument("--rate", type=float, default=1.0, help="requests per second (Nominatim allows 1)")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--upgrade-fallback", action="store_true", help="retry hotels stored with fallback coordinates")
+    parser.add_argument("--limit", type=int, help="geocode at most this many hotels")
+    args = parser.parse_args()
+
+    df = load_dataset(args.source)
+    pairs = list(dict.fromkeys(zip(df["Hotel Name"], df["Destination"])))
+    store = GeocodeStore(args.db)
+    if args.limit is not None:
+        pairs = store.pending(pairs, upgrade_fallback=args.upgrade_fallback)[:args.limit]
+    geocoded, fallbacks = geocode_all(pairs, store, rate=args.rate, retries=args.retries,
+                                      upgrade_fallback=args.upgrade_fallback)
+    print(f"Geocoded {geocoded} hotels, {fallbacks} stored with fallback coordinates")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import numpy as np
+
+# Price bands offered in the search form as half-open (above, up_to] bounds, so together they
+# cover every price (calendar averages aren't whole rupees); None leaves a side open
+PRICE_BANDS = {
+    "Budget (₹0 - ₹5000)": (None, 5000),
+    "Comfort (₹5001 - ₹10000)": (5000, 10000),
+    "Luxury (₹10001+)": (10000, None),
+}
+
+
+# Inclusive (min_price, max_price) for a band, as select() and searches take them: the lower
+# bound is the next float above the band's, so ₹10000 stays in Comfort and ₹10000.50 is Luxury
+def band_range(band):
+    above, up_to = PRICE_BANDS[band]
+    return (None if above is None else float(np.nextafter(above, np.inf))), up_to
+
+
+# Row positions of each destination, pre-sorted by price so a price range is one contiguous slice
+class HotelIndex:
+    def __init__(self, df):
+        prices = df["Price"].to_numpy(dtype="float64")
+        self.destinations = []
+        self._rows = {}
+        self._prices = {}
+        for destination, rows in df.groupby("Destination", sort=False, observed=True).indices.items():
+            # Rows without a price can never match a price filter
+            rows = rows[~np.isnan(prices[rows])]
+            order = np.argsort(prices[rows], kind="stable")
+            self.destinations.append(destination)
+            self._rows[destination] = rows[order]
+            self._prices[destination] = prices[rows][order]
+
+    # Row positions for a destination with min_price <= Price <= max_price, in ascending price order
+    def select(self, destination, min_price=None, max_price=None):
+        rows = self._rows.get(destination)
+        if rows is None:
+            return np.empty(0, dtype=np.intp)
+        prices = self._prices[destination]
+        start = 0 if min_price is None else np.searchsorted(prices, min_price, side="left")
+        stop = len(prices) if max_price is None else np.searchsorted(prices, max_price, side="right")
+        return rows[start:stop]
+
+    # Cheapest and most expensive price in a destination, e.g. for slider bounds
+    def price_bounds(self, destination):
+        prices = self._prices.get(destination)
+        if prices is None or len(prices) == 0:
+            return None, None
+        return prices[0], prices[-1]
@@ -0,0 +1,215 @@
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+
+# In-process instrumentation: stage timings aggregated into histograms, call counters and
+# gauges collected from the caches, exposed as Prometheus text (GET /metrics on the API,
+# the debug panel in the app) or as one log line per rerun (METRICS_LOG=1).
+#   with timed("search"): ...        or        @timed("weather")
+
+# Metric name prefix in the Prometheus output
+METRICS_PREFIX = "yaatrimitra"
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Log every rerun's stage timings through the "yaatrimitra.metrics" logger
+METRICS_LOG = os.environ.get("METRICS_LOG", "0") == "1"
+
+logger = logging.getLogger("yaatrimitra.metrics")
+if METRICS_LOG and not logger.handlers:
+    # Nothing else configures logging under `streamlit run`, so log to stderr
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # counts[i] observations fell in (buckets[i - 1], buckets[i]]; the last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # Upper bound of the bucket holding the q-th quantile; None before any observation
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+# Process-wide histograms (one per stage) and counters (one per name and label set)
+class MetricsRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # {stage: {"count", "sum", "p50", "p95", "p99"}} for every stage observed so far
+    def summary(self):
+        with self._lock:
+            return {
+                stage: {
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                }
+                for stage, histogram in sorted(self._histograms.items())
+            }
+
+    def counters(self):
+        with self._lock:
+            return {key: value for key, value in sorted(self._counters.items())}
+
+    # Prometheus text exposition; gauges are extra (name, labels, value) samples, e.g. cache sizes
+    def prometheus_text(self, gauges=()):
+        stage_metric = f"{METRICS_PREFIX}_stage_seconds"
+        lines = [f"# HELP {stage_metric} Time spent in each stage of a rerun or API request",
+                 f"# TYPE {stage_metric} histogram"]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{stage_metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{stage_metric}_sum{{stage="{stage}"}} {histogram.sum!r}')
+                lines.append(f'{stage_metric}_count{{stage="{stage}"}} {histogram.count}')
+            counters = sorted(self._counters.items())
+
+        typed = set()
+        for (name, labels), value in counters:
+            metric = f"{METRICS_PREFIX}_{name}"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_labels(dict(labels))} {value}")
+        for name, labels, value in gauges:
+            if value is not None:
+                lines.append(f"{METRICS_PREFIX}_{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+# The registry every module records into
+REGISTRY = MetricsRegistry()
+
+# Stage timings of the rerun or request running on this thread, when one is being traced
+_local = threading.local()
+
+
+def count(name, amount=1, **labels):
+    REGISTRY.count(name, amount, **labels)
+
+
+# Stage timings of one rerun or request, in the order the stages finished
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def log_line(self):
+        stages = " ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in self.stages)
+        return f"{self.elapsed() * 1000:.1f}ms {stages}"
+
+
+# Start tracing the current thread's stages; replaces a trace left over from an interrupted run
+def start_trace():
+    _local.trace = Trace()
+    return _local.trace
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+# Stop tracing and record the whole run as the given stage; returns the trace (None if none was started)
+def end_trace(stage="rerun"):
+    trace = current_trace()
+    _local.trace = None
+    if trace is None:
+        return None
+    REGISTRY.observe(stage, trace.elapsed())
+    if METRICS_LOG:
+        logger.info("%s %s", stage, trace.log_line())
+    return trace
+
+
+# Times a block or a function as one stage: into the process histogram and the current trace
+class timed:
+    def __init__(self, stage, registry=REGISTRY):
+        self.stage = stage
+        self.registry = registry
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self._started
+        self.registry.observe(self.stage, seconds)
+        trace = current_trace()
+        if trace is not None:
+            trace.stages.append((self.stage, seconds))
+        return False
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # A fresh timer per call, so one decorated function can run on many threads at once
+            with timed(self.stage, self.registry):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+# Gauge samples from a nested mapping such as {"Manali": {"age_seconds": 12.0}}, one label per outer key
+def gauges_from(prefix, mapping, label):
+    return [(f"{prefix}_{field}", {label: key}, value)
+            for key, fields in mapping.items() for field, value in fields.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)]
@@ -0,0 +1,222 @@
+import argparse
+import difflib
+import os
+import re
+import time
+
+import numpy as np
+
+# Typo-tolerant hotel lookup by name. A trigram inverted index over "name destination" finds
+# candidates sharing the most trigrams with the query; those are reranked by similarity.
+# The index is saved next to the dataset snapshot and reused while the snapshot version matches.
+
+# Candidates taken from the trigram counts before reranking
+MAX_CANDIDATES = 64
+# Postings merged per query. Only the query's rarest trigram lists are merged: any row sharing at
+# least half the query's trigrams is in one of its shortest (n - ceil(n / 2) + 1) lists. The rows
+# counted most often there are then checked against the remaining, common lists (e.g. "hot", "tel")
+# by binary search, so a large catalogue never has most of its rows counted for one query.
+MAX_MERGED_POSTINGS = 120_000
+# Most counted rows checked against the common lists
+VERIFIED_CANDIDATES = 8 * MAX_CANDIDATES
+# Dice hits reranked with difflib; the rest keep their Dice score
+RERANK_CANDIDATES = 5
+# Matches less similar than this are dropped
+MIN_SIMILARITY = 0.4
+# Bump when normalisation or the file layout change so saved indexes are rebuilt
+NAME_INDEX_SCHEMA_VERSION = "1"
+
+
+def normalise(text):
+    return " ".join(re.findall(r"\w+", str(text).lower()))
+
+
+# Trigrams of a normalised string, padded so word starts and ends count
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Trigrams of every row's "name destination", concatenated, and how many each row has
+def _row_grams(names, destinations):
+    all_grams = []
+    gram_counts = np.zeros(len(names), dtype=np.int32)
+    for row, (name, destination) in enumerate(zip(names, destinations)):
+        grams = trigrams(normalise(f"{name} {destination}"))
+        gram_counts[row] = len(grams)
+        all_grams.extend(grams)
+    return np.array(all_grams, dtype="<U3"), gram_counts
+
+
+# Saved index file that belongs with a source workbook's snapshot
+def name_index_path_for(source_path):
+    return os.path.splitext(source_path)[0] + ".names.npz"
+
+
+class NameIndex:
+    def __init__(self, vocabulary, offsets, postings, gram_counts, version=None):
+        # Sorted trigram strings; postings[offsets[i]:offsets[i + 1]] are the rows containing trigram i
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+        # Distinct trigrams per row, for the Dice coefficient
+        self.gram_counts = gram_counts
+        self.version = version
+
+    @classmethod
+    def build(cls, names, destinations, version=None):
+        grams, gram_counts = _row_grams(names, destinations)
+        rows = np.repeat(np.arange(len(gram_counts), dtype=np.int32), gram_counts)
+        vocabulary, gram_ids = np.unique(grams, return_inverse=True)
+        order = np.argsort(gram_ids, kind="stable")
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_ids, minlength=len(vocabulary)), out=offsets[1:])
+        return cls(vocabulary, offsets, rows[order], gram_counts, version)
+
+    # Index for a new dataset version. A row's trigrams depend only on its hotel name and destination,
+    # so hotels still present keep their postings, renumbered through old_to_new (-1 for removed rows);
+    # only the rows listed in added are tokenised.
+    def updated(self, old_to_new, added, names, destinations, version=None):
+        added_grams, added_counts = _row_grams(names[added], destinations[added])
+        vocabulary, merged_ids = np.unique(np.concatenate([self.vocabulary, added_grams]), return_inverse=True)
+        old_ids, added_ids = merged_ids[:len(self.vocabulary)], merged_ids[len(self.vocabulary):]
+
+        gram_ids = old_ids[np.repeat(np.arange(len(self.vocabulary)), np.diff(self.offsets))]
+        rows = old_to_new[self.postings]
+        kept = rows >= 0
+        gram_ids = np.concatenate([gram_ids[kept], added_ids]).astype(np.int64)
+        rows = np.concatenate([rows[kept], np.repeat(added, added_counts)])
+        # One in-place sort of (trigram, row) packed into an int64 orders the postings like build() does
+        keys = gram_ids * len(names) + rows
+        keys.sort()
+        gram_ids, rows = keys // len(names), (keys % len(names)).astype(np.int32)
+
+        # Trigrams left without postings drop out of the vocabulary
+        starts = np.flatnonzero(np.r_[True, gram_ids[1:] != gram_ids[:-1]]) if len(gram_ids) else gram_ids
+        offsets = np.append(starts, len(gram_ids)).astype(np.int64)
+        gram_counts = np.zeros(len(names), dtype=np.int32)
+        survivors = np.flatnonzero(old_to_new >= 0)
+        gram_counts[old_to_new[survivors]] = self.gram_counts[survivors]
+        gram_counts[added] = added_counts
+        return NameIndex(vocabulary[gram_ids[starts]], offsets, rows, gram_counts, version)
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp.{os.getpid()}.npz"
+        np.savez(tmp_path, vocabulary=self.vocabulary, offsets=self.offsets, postings=self.postings,
+                 gram_counts=self.gram_counts,
+                 meta=np.array([NAME_INDEX_SCHEMA_VERSION, self.version or ""]))
+        os.replace(tmp_path, path)
+
+    # The saved index, or None if it is missing or was built from another dataset version
+    @classmethod
+    def load(cls, path, version=None):
+        try:
+            with np.load(path) as data:
+                schema_version, saved_version = data["meta"]
+                if schema_version != NAME_INDEX_SCHEMA_VERSION or (version and saved_version != version):
+                    return None
+                return cls(data["vocabulary"], data["offsets"], data["postings"], data["gram_counts"], version)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    # Saved index for this dataset version if there is one; otherwise build it (and save it when a path is given)
+    @classmethod
+    def load_or_build(cls, df, path=None, version=None):
+        index = cls.load(path, version) if path and version else None
+        if index is None:
+            index = cls.build(df["Hotel Name"], df["Destination"].astype(str), version)
+            if path and version:
+                try:
+                    index.save(path)
+                except OSError:
+                    pass
+        return index
+
+    # Rows sharing the most trigrams with the query, with their shared-trigram counts
+    def candidates(self, query_grams, limit=MAX_CANDIDATES):
+        query_grams = np.array(sorted(query_grams), dtype="<U3")
+        ids = np.searchsorted(self.vocabulary, query_grams)
+        found = ids < len(self.vocabulary)
+        found[found] = self.vocabulary[ids[found]] == query_grams[found]
+        ids = ids[found]
+        if len(ids) == 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        sizes = self.offsets[ids + 1] - self.offsets[ids]
+        order = np.argsort(sizes, kind="stable")
+        ids, sizes = ids[order], sizes[order]
+        # Rarest lists first, as many as the pigeonhole bound needs and the cap allows; the rarest
+        # one is always merged, truncated to the cap if need be
+        merged = len(ids) - (len(ids) + 1) // 2 + 1
+        merged = max(1, min(merged, np.searchsorted(np.cumsum(sizes), MAX_MERGED_POSTINGS, side="right")))
+        postings = np.sort(np.concatenate([
+            self.postings[self.offsets[i]:min(self.offsets[i + 1], self.offsets[i] + MAX_MERGED_POSTINGS)]
+            for i in ids[:merged]]))
+        first = np.empty(len(postings), dtype=bool)
+        first[0] = True
+        np.not_equal(postings[1:], postings[:-1], out=first[1:])
+        starts = np.flatnonzero(first)
+        counts = np.diff(starts, append=len(postings))
+        # Rows counted at least as often as the limit-th most counted one
+        at_least = np.cumsum(np.bincount(counts)[::-1])[::-1]
+        threshold = max(np.searchsorted(-at_least, -limit, side="right") - 1, 1)
+        best = np.flatnonzero(counts >= threshold)
+        if len(best) > VERIFIED_CANDIDATES:
+            # Ties at the threshold: verify only the most counted of them
+            best = best[np.argpartition(-counts[best], VERIFIED_CANDIDATES - 1)[:VERIFIED_CANDIDATES]]
+        rows, shared = postings[starts[best]], counts[best]
+        for i in ids[merged:]:
+            listed = self.postings[self.offsets[i]:self.offsets[i + 1]]
+            positions = np.minimum(np.searchsorted(listed, rows), len(listed) - 1)
+            shared = shared + (listed[positions] == rows)
+        if len(rows) > limit:
+            best = np.argpartition(-shared, limit - 1)[:limit]
+            rows, shared = rows[best], shared[best]
+        return rows, shared
+
+    # Up to limit (row, score) matches for a query, best first; score is 0-1 similarity
+    def search(self, query, names, destinations, limit=10, min_score=MIN_SIMILARITY):
+        query = normalise(query)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        rows, shared = self.candidates(query_grams)
+        if len(rows) == 0:
+            return []
+        # Dice coefficient on trigrams orders the candidates; one difflib ratio reorders the leaders.
+        # The ratio compares against "name destination" cut to the query's length, so a typed prefix,
+        # a whole name or a name with its town all line up; the Dice score keeps a word from the middle.
+        dice = 2.0 * shared / (len(query_grams) + self.gram_counts[rows])
+        keep = np.argsort(-dice, kind="stable")[:max(limit, RERANK_CANDIDATES)]
+        matches = []
+        for rank, (row, score) in enumerate(zip(rows[keep], dice[keep])):
+            score = float(score)
+            if rank < RERANK_CANDIDATES:
+                label = f"{normalise(names[row])} {normalise(destinations[row])}"
+                score = max(difflib.SequenceMatcher(None, query, label[:len(query) + 1]).ratio(), score)
+            if score >= min_score:
+                matches.append((int(row), score))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+
+def main():
+    from snapshot import DATASET_PATH, load_dataset
+
+    parser = argparse.ArgumentParser(description="Build the hotel name index next to the dataset snapshot")
+    parser.add_argument("source", nargs="?", default=DATASET_PATH, help="path to the .xlsx workbook")
+    parser.add_argument("--query", help="look a name up after building")
+    args = parser.parse_args()
+
+    df = load_dataset(args.source)
+    start = time.perf_counter()
+    index = NameIndex.build(df["Hotel Name"], df["Destination"].astype(str), df.attrs.get("snapshot_version"))
+    index.save(name_index_path_for(args.source))
+    print(f"Indexed {len(df)} hotels ({len(index.vocabulary)} trigrams) in {time.perf_counter() - start:.2f}s")
+    if args.query:
+        names, destinations = df["Hotel Name"].to_numpy(), df["Destination"].astype(str).to_numpy()
+        for row, score in index.search(args.query, names, destinations):
+            print(f"{score:.2f}  {names[row]}, {destinations[row]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+# Optional nightly rates: a .csv or .arrow table with Hotel Name, Destination, Date and Price rows.
+# Nights without a rate (or outside the calendar) cost the hotel's base Price.
+PRICE_CALENDAR = os.environ.get("PRICE_CALENDAR", "price_calendar.csv")
+# Days of rates kept from the earliest rate on; later rows are dropped with a warning
+PRICE_CALENDAR_DAYS = int(os.environ.get("PRICE_CALENDAR_DAYS", str(3 * 366)))
+
+logger = logging.getLogger("yaatrimitra.pricing")
+
+
+def read_rates(path):
+    if path.endswith(".arrow"):
+        from pyarrow import ipc
+
+        with ipc.open_file(path) as reader:
+            return reader.read_pandas()
+    return pd.read_csv(path)
+
+
+# Nightly rates of every hotel in CSR form: one entry per rated night, sorted by (hotel row, day), with
+# prefix sums over them. Memory follows the number of rates, not the calendar's date range; a stay's
+# rated nights at each hotel are one contiguous run found with two searchsorted lookups.
+class PriceCalendar:
+    def __init__(self, base_prices, start, days, rows, offsets, prices):
+        self.start = np.datetime64(start, "D")
+        self.days = days
+        self.base = np.asarray(base_prices, dtype="float64")
+        # (row * days + day offset) of each rate, ascending; unique per hotel and night
+        self.keys = rows.astype(np.int64) * days + offsets
+        self.prefix = np.zeros(len(prices) + 1, dtype="float64")
+        np.cumsum(prices, out=self.prefix[1:])
+
+    # Calendar from a rate table, or None when no rate belongs to a dataset hotel
+    @classmethod
+    def from_table(cls, df, table, days=PRICE_CALENDAR_DAYS):
+        positions = {key: row for row, key in enumerate(zip(df["Hotel Name"], df["Destination"].astype(str)))}
+        rows = np.array([positions.get(key, -1) for key in zip(table["Hotel Name"], table["Destination"].astype(str))],
+                        dtype=np.intp)
+        dates = pd.to_datetime(table["Date"]).to_numpy().astype("datetime64[D]")
+        prices = pd.to_numeric(table["Price"], errors="coerce").to_numpy(dtype="float64")
+        # Rates for hotels that aren't in the dataset (or without a date or price) are ignored
+        known = (rows >= 0) & ~np.isnat(dates) & ~np.isnan(prices)
+        rows, dates, prices = rows[known], dates[known], prices[known]
+        if len(rows) == 0:
+            return None
+
+        start = dates.min()
+        offsets = (dates - start).astype(np.int64)
+        within = offsets < days
+        if not within.all():
+            logger.warning("Dropped %d rates dated %d days or more after the first one (%s)",
+                           int((~within).sum()), days, start)
+            rows, offsets, prices = rows[within], offsets[within], prices[within]
+        # Sorted by (row, day); of several rates for the same night the last listed wins
+        keys = rows.astype(np.int64) * days + offsets
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        last = np.append(keys[1:] != keys[:-1], True)
+        order = order[last]
+        return cls(df["Price"].to_numpy(dtype="float64"), start, days, rows[order], offsets[order], prices[order])
+
+    # Total cost of staying from check_in to check_out (exclusive) at each of the given rows
+    def stay_totals(self, rows, check_in, check_out):
+        first = int((np.datetime64(check_in, "D") - self.start).astype(np.int64))
+        last = int((np.datetime64(check_out, "D") - self.start).astype(np.int64))
+        nights = max(last - first, 0)
+        low, high = min(max(first, 0), self.days), min(max(last, 0), self.days)
+        base_keys = np.asarray(rows, dtype=np.int64) * self.days
+        lo = np.searchsorted(self.keys, base_keys + low)
+        hi = np.searchsorted(self.keys, base_keys + max(high, low))
+        # Nights without a rate, inside or outside the calendar window, cost the base price
+        return self.prefix[hi] - self.prefix[lo] + (nights - (hi - lo)) * self.base[rows]
+
+    # Average price per night of the stay at each of the given rows
+    def nightly_prices(self, rows, check_in, check_out):
+        nights = max((np.datetime64(check_out, "D") - np.datetime64(check_in, "D")).astype(np.int64), 1)
+        return self.stay_totals(rows, check_in, check_out) / nights
+
+
+# Calendar for the dataset's rows, or None when there is no rate file or none of its rates apply
+def load_price_calendar(df, path=PRICE_CALENDAR):
+    if not path or not os.path.exists(path):
+        return None
+    table = read_rates(path)
+    if table.empty:
+        return None
+    calendar = PriceCalendar.from_table(df, table)
+    if calendar is None:
+        # A stale or mismatched rate file: serve base prices rather than fail to start
+        logger.warning("No rate in %s matches a dataset hotel; using base prices", path)
+    return calendar
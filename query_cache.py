@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from amenities import canonical_amenity
+from ranking import stay_weights
+
+# Cached outcome of one search: every matching row, their nightly price for the stay (None without
+# a price calendar), the (check_in, check_out) dates and the result pages viewed so far (page number -> ResultPage)
+QueryResult = namedtuple("QueryResult", ["rows", "prices", "stay", "pages"])
+
+# One page of ranked rows and their rendered card list
+ResultPage = namedtuple("ResultPage", ["rows", "fragment"])
+
+
+# Normalised cache key: amenity spelling/order and equivalent weight settings map to the same key.
+# stay is the (check_in, check_out) pair when prices depend on the dates; area is a proximity filter.
+def query_key(destination, min_price, max_price, amenities, weights, nights, stay=None, area=None):
+    return (
+        destination,
+        None if min_price is None else float(min_price),
+        None if max_price is None else float(max_price),
+        tuple(sorted({canonical_amenity(amenity) for amenity in amenities})),
+        tuple(round(float(weight), 6) for weight in stay_weights(weights, nights)),
+        None if stay is None else tuple(str(day) for day in stay),
+        None if area is None else (area[0],) + tuple(round(float(value), 6) for value in area[1:]),
+    )
+
+
+# Bounded, process-wide LRU of search results shared by every session.
+# Entries belong to one dataset version; a lookup with a new version empties the cache.
+class QueryCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result, version):
+        # Results are shared between sessions, so their arrays must not be modified
+        for array in (result.rows, result.prices):
+            if array is not None:
+                array.flags.writeable = False
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "version": self.version,
+            }
+
+    def _check_version(self, version):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+
+# Add a page to a cached result; pages are filled lazily as sessions page through the results
+def add_page(result, page, rows, fragment):
+    rows.flags.writeable = False
+    result_page = ResultPage(rows, fragment)
+    result.pages[page] = result_page
+    return result_page
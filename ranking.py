@@ -0,0 +1,128 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Ranking criteria, in feature-matrix column order
+FEATURES = ("sentiment", "ratings", "price", "amenities")
+
+# Relative importance of each criterion; weights need not sum to 1
+DEFAULT_WEIGHTS = {"sentiment": 0.4, "ratings": 0.3, "price": 0.2, "amenities": 0.1}
+
+# Cached per-destination orderings kept per process
+MAX_CACHED_ORDERINGS = 64
+
+
+# Scale values to 0-1 within a group; constant or empty groups score 0
+def _min_max(values):
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return np.zeros_like(values)
+    low, high = finite.min(), finite.max()
+    if high == low:
+        return np.zeros_like(values)
+    return np.nan_to_num((values - low) / (high - low), nan=0.0)
+
+
+# Weight vector for a stay; longer stays make the total price matter more
+def stay_weights(weights=None, nights=1):
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    vector = np.array([float(weights[name]) for name in FEATURES])
+    vector[FEATURES.index("price")] *= 1 + math.log(max(int(nights), 1))
+    return vector
+
+
+# Weighted multi-criteria scoring with top-k selection over the hotel table
+class HotelRanker:
+    def __init__(self, df, hotel_index, amenity_catalogue):
+        n_rows = len(df)
+        sentiment = df["sentiment_score"].to_numpy(dtype="float64")
+        ratings = df["Ratings"].to_numpy(dtype="float64") if "Ratings" in df else np.zeros(n_rows)
+        prices = df["Price"].to_numpy(dtype="float64")
+        amenity_counts = amenity_catalogue.counts().astype("float64")
+
+        # Rows without a sentiment score are never recommended
+        self.valid = ~np.isnan(sentiment)
+        # For the per-query amenity match
+        self.amenity_catalogue = amenity_catalogue
+
+        # Features are normalised per destination so scores compare hotels within a city
+        self.features = np.zeros((n_rows, len(FEATURES)), dtype=np.float32)
+        self._partitions = {}
+        for destination in hotel_index.destinations:
+            rows = hotel_index.select(destination)
+            self.features[rows, 0] = _min_max(sentiment[rows])
+            self.features[rows, 1] = _min_max(ratings[rows])
+            # Cheaper is better; log scale so one luxury outlier doesn't flatten the rest
+            self.features[rows, 2] = 1.0 - _min_max(np.log1p(prices[rows]))
+            # How many amenities a hotel has; queries that select amenities score the match instead
+            self.features[rows, 3] = _min_max(amenity_counts[rows])
+            self._partitions[destination] = rows[self.valid[rows]]
+
+        self._orderings = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Scores for the given rows in one matrix-vector product. prices (aligned with rows) replaces the
+    # static price feature, e.g. with the stay's nightly price; it is normalised over these rows.
+    # Selected amenities replace the amenity feature with the share of them each hotel has.
+    def scores(self, rows, weights=None, nights=1, prices=None, amenities=()):
+        features = self.features[rows]
+        if prices is not None:
+            features[:, FEATURES.index("price")] = 1.0 - _min_max(np.log1p(np.asarray(prices, dtype="float64")))
+        share = self.amenity_catalogue.match_share(amenities, rows) if amenities else None
+        if share is not None:
+            features[:, FEATURES.index("amenities")] = share
+        return features @ stay_weights(weights, nights)
+
+    # Every ranked row of a destination, best first; cached and shared across sessions
+    def ordering(self, destination, weights=None, nights=1):
+        vector = stay_weights(weights, nights)
+        key = (destination, tuple(vector))
+        with self._lock:
+            if key in self._orderings:
+                self._orderings.move_to_end(key)
+                return self._orderings[key]
+
+        rows = self._partitions.get(destination, np.empty(0, dtype=np.intp))
+        scores = self.features[rows] @ vector
+        ordering = rows[np.lexsort((rows, -scores))]
+
+        with self._lock:
+            self._orderings[key] = ordering
+            if len(self._orderings) > MAX_CACHED_ORDERINGS:
+                self._orderings.popitem(last=False)
+        return ordering
+
+    # The k best rows among the candidates, best first, without sorting the whole candidate set.
+    # Pass destination when rows all come from that destination so full partitions hit the cache.
+    def top_k(self, rows, k=3, weights=None, nights=1, destination=None, prices=None, amenities=()):
+        valid = self.valid[rows]
+        rows = rows[valid]
+        if prices is not None:
+            prices = prices[valid]
+        if k <= 0 or len(rows) == 0:
+            return rows[:0]
+        if (prices is None and not amenities and destination is not None
+                and len(rows) == len(self._partitions.get(destination, ()))):
+            # Unfiltered destination: reuse the precomputed ordering
+            return self.ordering(destination, weights, nights)[:k]
+
+        scores = self.scores(rows, weights, nights, prices, amenities)
+        if len(rows) > k:
+            # argpartition keeps an arbitrary subset of the rows tied with the kth score, so take all of them;
+            # otherwise pages cut from different k would overlap and skip hotels
+            kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            candidates = np.flatnonzero(scores >= kth_score)
+        else:
+            candidates = np.arange(len(rows))
+        # Ties fall back to dataset order so results are stable between reruns and pages
+        best = candidates[np.lexsort((rows[candidates], -scores[candidates]))][:k]
+        return rows[best]
+
+    # One page of the ranking: page_size rows starting at rank page * page_size, best first.
+    # Only the rows up to the end of the page are ordered, never the whole candidate set.
+    def page(self, rows, page, page_size, weights=None, nights=1, destination=None, prices=None, amenities=()):
+        start = page * page_size
+        return self.top_k(rows, k=start + page_size, weights=weights, nights=nights,
+                          destination=destination, prices=prices, amenities=amenities)[start:]
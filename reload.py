@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+
+from metrics import count, timed
+from snapshot import DATASET_PATH, load_dataset, snapshot_path_for
+from store import HotelStore
+
+# Hot dataset reload. A watcher thread (or an admin trigger) notices the workbook or its snapshot
+# changing, loads the new rows in the background, diffs them against the live store by hotel
+# identity and builds the next store from the previous one, so only new and changed hotels are
+# parsed, tokenised and placed again. The new engine then replaces the old one in a single
+# assignment: callers read `reloader.engine` once per rerun or request and see one version
+# throughout, while requests already running finish on the old one.
+
+# Seconds between checks of the dataset files; 0 disables the watcher (reloads only on request)
+DATASET_RELOAD_INTERVAL = float(os.environ.get("DATASET_RELOAD_INTERVAL", "0"))
+
+
+# (mtime_ns, size) of the workbook and its snapshot; changes when either is rewritten
+def dataset_signature(source_path):
+    signature = []
+    for path in (source_path, snapshot_path_for(source_path)):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class DatasetReloader:
+    def __init__(self, engine, source_path=DATASET_PATH, interval=DATASET_RELOAD_INTERVAL):
+        # The engine over the current dataset version; replaced whole, never modified
+        self.engine = engine
+        self.source_path = source_path
+        self.interval = interval
+        self.last_reload = None
+        self.last_error = None
+
+        self._signature = dataset_signature(source_path) if source_path else None
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Start watching the dataset files; does nothing without an interval or a source
+    def start(self):
+        if self._thread is not None or self.interval <= 0 or not self.source_path:
+            return
+        self._thread = threading.Thread(target=self._run, name="dataset-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    # Call callback(engine) with every new engine after it is swapped in, e.g. to follow new destinations
+    def on_reload(self, callback):
+        self._listeners.append(callback)
+
+    # Ask for a reload without waiting for it (admin trigger); the watcher thread runs it, or a
+    # one-off thread when nothing is watching. Returns False if there is no dataset to reload.
+    def request_reload(self):
+        if not self.source_path:
+            return False
+        if self._thread is not None:
+            self._wake.set()
+        else:
+            threading.Thread(target=self.reload, kwargs={"force": True}, name="dataset-reload", daemon=True).start()
+        return True
+
+    # Reload now if the dataset files changed (or always with force). Returns True when a new
+    # version was swapped in; on failure the current engine keeps serving and the error is kept.
+    def reload(self, force=False):
+        with self._reload_lock:
+            signature = dataset_signature(self.source_path)
+            if not force and signature == self._signature:
+                return False
+            started = time.perf_counter()
+            try:
+                with timed("dataset_reload"):
+                    # Parses the workbook only when its snapshot is stale, like a cold start
+                    df = load_dataset(self.source_path)
+                    current = self.engine
+                    if df.attrs.get("snapshot_version") == current.store.version:
+                        self._signature = signature
+                        count("dataset_reloads_total", outcome="unchanged")
+                        return False
+                    store = HotelStore(df, self.source_path, previous=current.store)
+                    if store.diff is not None and store.diff.is_empty():
+                        # Rewritten without changing any hotel: keep the warm caches of the current version
+                        self._signature = signature
+                        count("dataset_reloads_total", outcome="unchanged")
+                        return False
+                    engine = current.updated(store)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                count("dataset_reloads_total", outcome="error")
+                return False
+            self.engine = engine
+            self._signature = signature
+            self.last_error = None
+            self.last_reload = {
+                "version": store.version,
+                "previous_version": current.store.version,
+                "hotels": len(store.df),
+                "incremental": store.diff is not None,
+                "seconds": round(time.perf_counter() - started, 3),
+                "at": time.time(),
+                **(store.diff.summary() if store.diff is not None else {}),
+            }
+            count("dataset_reloads_total", outcome="applied")
+            for callback in self._listeners:
+                try:
+                    callback(engine)
+                except Exception as e:
+                    # The new version is already serving; report the listener's failure alongside it
+                    self.last_error = f"{type(e).__name__}: {e}"
+            return True
+
+    # Current version, the last reload's outcome and row changes, and the last error if it failed
+    def status(self):
+        return {
+            "version": self.engine.store.version,
+            "hotels": len(self.engine.store.df),
+            "watching": self._thread is not None,
+            "interval": self.interval,
+            "last_reload": self.last_reload,
+            "last_error": self.last_error,
+        }
+
+    def _run(self):
+        seen = self._signature
+        while not self._stop.is_set():
+            forced = self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if forced:
+                self.reload(force=True)
+                continue
+            # Only reload once the files have stayed the same for a whole interval, so a workbook
+            # still being copied (or written before its snapshot) isn't picked up half-way
+            signature = dataset_signature(self.source_path)
+            if signature != self._signature and signature == seen:
+                self.reload()
+            seen = signature
@@ -0,0 +1,148 @@
+import html
+from functools import lru_cache
+from urllib.parse import quote_plus
+
+# HTML fragments for hotel cards, map popups and the weather panel.
+# Templates are compacted once at import; rendered fragments are cached per hotel, keyed by
+# the row values they show, so a changed row renders afresh and an unchanged one is free.
+
+MAX_CACHED_FRAGMENTS = 4096
+
+RANK_EMOJI = ("🥇 ", "🥈 ", "🥉 ")
+
+
+# Strip indentation and blank lines: Markdown would turn an indented line after a blank one
+# into a code block when several fragments are emitted in one st.markdown call
+def _compact(template):
+    return "".join(line.strip() for line in template.strip().splitlines())
+
+
+CARD_TEMPLATE = _compact("""
+    <div style="background-color: white; border-radius: 10px; padding: 15px; margin-bottom: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+        <h3 style="color: #1E3A8A; margin-top: 0;">{rank_emoji}{name}</h3>
+        <div style="display: flex; margin-bottom: 10px;">
+            <div style="background-color: #3B82F6; color: white; font-weight: bold; padding: 3px 10px; border-radius: 15px; margin-right: 10px;">
+                ₹{price:,.0f}
+            </div>
+            <div style="background-color: #10B981; color: white; font-weight: bold; padding: 3px 10px; border-radius: 15px; margin-right: 10px;">
+                ⭐ {rating:g}
+            </div>
+            <div style="background-color: #8B5CF6; color: white; font-weight: bold; padding: 3px 10px; border-radius: 15px;">
+                {sentiment_label} ({sentiment:.2f})
+            </div>
+        </div>
+        <p style="color: #4B5563; margin-bottom: 5px;"><i class="fas fa-map-marker-alt"></i> {destination}</p>
+        <p style="color: #4B5563; font-style: italic; margin-bottom: 15px;">{sentiment_desc}</p>
+        <a href="https://www.google.com/maps/search/?api=1&amp;query={maps_query}" target="_blank">🗺 View on Google Maps</a>
+    </div>
+""")
+
+SEPARATOR = "<hr style='margin: 30px 0; border-color: #E5E7EB;'>"
+
+POPUP_TEMPLATE = _compact("""
+    <div style="width: 250px; font-family: 'Arial', sans-serif;">
+        <h4 style="color: #2C3E50; margin-bottom: 10px;">{name}</h4>
+        <p style="margin: 5px 0;"><b style="color: #2980B9;">Price:</b> ₹{price:,.0f}</p>
+        <p style="margin: 5px 0;"><b style="color: #2980B9;">Rating:</b> {rating:g}</p>
+        <p style="margin: 5px 0;"><b style="color: #2980B9;">Sentiment:</b> {sentiment:.2f}</p>
+    </div>
+""")
+
+WEATHER_CARD_TEMPLATE = _compact("""
+    <div class="weather-card">
+        <h3 style="color: #3B82F6; margin-top: 0;">{label}</h3>
+        <p style="font-size: 1.5rem; font-weight: bold;">{value}</p>
+    </div>
+""")
+
+WEATHER_ICON_TEMPLATE = _compact("""
+    <div style="text-align: center; margin-top: 10px;">
+        <img src="{icon}" alt="Weather Icon" style="width: 60px; height: 60px;">
+    </div>
+""")
+
+WEATHER_SECTION_TEMPLATE = _compact("""
+    <h2 class="subheader">Current Weather in {city}</h2>
+    <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem;">{cards}</div>
+    {icon}
+""")
+
+
+# Generate sentiment description based on score
+def get_sentiment_description(score):
+    if score >= 0.8:
+        return "Excellent", "Guests absolutely love this hotel!"
+    elif score >= 0.7:
+        return "Very Good", "Very positive guest experiences reported"
+    elif score >= 0.6:
+        return "Good", "Guests generally have positive experiences"
+    elif score >= 0.5:
+        return "Satisfactory", "Mixed reviews with positive experiences"
+    else:
+        return "Mixed", "Some guests had concerns about their stay"
+
+
+# The row values a card shows; together with the rank they key the fragment cache
+def card_fields(hotel):
+    return (hotel['Hotel Name'], str(hotel['Destination']), float(hotel['Price']),
+            float(hotel['Ratings']), float(hotel['sentiment_score']))
+
+
+@lru_cache(maxsize=MAX_CACHED_FRAGMENTS)
+def _card_fragment(name, destination, price, rating, sentiment, rank):
+    sentiment_label, sentiment_desc = get_sentiment_description(sentiment)
+    return CARD_TEMPLATE.format(
+        rank_emoji=RANK_EMOJI[rank] if rank is not None and rank < len(RANK_EMOJI) else "",
+        name=html.escape(name),
+        destination=html.escape(destination),
+        price=price,
+        rating=rating,
+        sentiment=sentiment,
+        sentiment_label=sentiment_label,
+        sentiment_desc=sentiment_desc,
+        maps_query=html.escape(quote_plus(f"{name} {destination}")),
+    )
+
+
+# Custom card for hotel display
+def create_hotel_card(hotel, rank=None):
+    return _card_fragment(*card_fields(hotel), rank)
+
+
+# A whole result list as one HTML string, so it goes to the browser in a single message.
+# first_rank numbers the cards when the list is a later slice of the ranking.
+def render_card_list(hotels, first_rank=0):
+    cards = [create_hotel_card(hotel, rank=first_rank + i) for i, (_, hotel) in enumerate(hotels.iterrows())]
+    return SEPARATOR.join(cards)
+
+
+# Create a popup with hotel info
+@lru_cache(maxsize=MAX_CACHED_FRAGMENTS)
+def hotel_popup_html(hotel_name, hotel_price, hotel_ratings, sentiment_score):
+    return POPUP_TEMPLATE.format(name=html.escape(hotel_name), price=hotel_price,
+                                 rating=hotel_ratings, sentiment=sentiment_score)
+
+
+# The weather panel (heading, one card per reading and the icon) as one HTML string
+def render_weather(city, weather, icon=None):
+    cards = "".join(WEATHER_CARD_TEMPLATE.format(label=html.escape(label), value=html.escape(str(value)))
+                    for label, value in weather.items())
+    return WEATHER_SECTION_TEMPLATE.format(
+        city=html.escape(city),
+        cards=cards,
+        icon=WEATHER_ICON_TEMPLATE.format(icon=html.escape(icon)) if icon else "",
+    )
+
+
+# Hit/miss counters of the fragment caches
+def fragment_cache_info():
+    return {
+        "cards": _card_fragment.cache_info()._asdict(),
+        "popups": hotel_popup_html.cache_info()._asdict(),
+    }
+
+
+# Empty the fragment caches, e.g. to measure cold rendering
+def clear_fragment_caches():
+    _card_fragment.cache_clear()
+    hotel_popup_html.cache_clear()
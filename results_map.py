@@ -0,0 +1,49 @@
+from render import hotel_popup_html
+
+# folium is imported inside create_results_map so importing this module stays cheap
+
+
+# Use sentiment score to determine marker color
+def sentiment_color(sentiment_score):
+    if sentiment_score >= 0.75:
+        return 'green'
+    elif sentiment_score >= 0.5:
+        return 'blue'
+    else:
+        return 'orange'
+
+
+# One map for a whole result list: every hotel in a marker cluster, top picks pinned on top.
+# coordinates lines up with the rows of hotels; focus is a hotel name to centre on with its popup open.
+def create_results_map(hotels, coordinates, center, focus=None, highlight=()):
+    import folium
+    from folium.plugins import MarkerCluster
+
+    focus_location = next(
+        (list(point) for name, point in zip(hotels['Hotel Name'], coordinates) if name == focus), None
+    )
+    m = folium.Map(location=focus_location or center, zoom_start=16 if focus_location else 13,
+                   tiles="CartoDB positron")
+    cluster = MarkerCluster(name="Hotels").add_to(m)
+
+    for (_, hotel), (lat, lon) in zip(hotels.iterrows(), coordinates):
+        name = hotel['Hotel Name']
+        is_top = name in highlight
+        marker = folium.Marker(
+            location=[lat, lon],
+            popup=folium.Popup(
+                hotel_popup_html(name, float(hotel['Price']), float(hotel['Ratings']),
+                                 float(hotel['sentiment_score'])),
+                max_width=300,
+                show=name == focus,
+            ),
+            tooltip=name,
+            icon=folium.Icon(color=sentiment_color(hotel['sentiment_score']),
+                             icon="star" if is_top else "hotel", prefix="fa"),
+        )
+        # Top picks and the focused hotel stay visible instead of disappearing into a cluster
+        marker.add_to(m if is_top or name == focus else cluster)
+
+    if focus_location is None and len(coordinates) > 1:
+        m.fit_bounds(coordinates)
+    return m
@@ -0,0 +1,179 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Review scores and per-hotel aggregates; the snapshot build reads the aggregates from here.
+# Offline only: the web process never imports NLTK.
+SENTIMENT_DB = os.environ.get("SENTIMENT_DB", "sentiment.sqlite")
+
+# Worker-local analyzer, built once per pool process
+_analyzer = None
+
+
+# Stream review records from a .jsonl or .csv file as (hotel_name, destination, review) tuples.
+# Records need "Hotel Name", "Destination" and "Review" fields.
+def read_reviews(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        for record in records:
+            review = (record.get("Review") or "").strip()
+            if review:
+                yield record["Hotel Name"], record["Destination"], review
+
+
+def review_hash(review):
+    return hashlib.sha1(review.encode("utf-8")).hexdigest()
+
+
+def open_db(path=SENTIMENT_DB):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS review_scores (review_hash TEXT PRIMARY KEY, compound REAL NOT NULL)")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS hotel_sentiment (
+                hotel_name TEXT NOT NULL,
+                city TEXT NOT NULL,
+                score REAL NOT NULL,
+                reviews INTEGER NOT NULL,
+                PRIMARY KEY (hotel_name, city)
+            )"""
+        )
+    return conn
+
+
+def _init_worker():
+    global _analyzer
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+    _analyzer = SentimentIntensityAnalyzer()
+
+
+# Score a batch of (hash, review) pairs in a worker process
+def score_batch(batch):
+    return [(digest, _analyzer.polarity_scores(review)["compound"]) for digest, review in batch]
+
+
+# Reviews whose hash has not been scored yet, in batches; each text is yielded once
+def _unscored_batches(path, conn, batch_size):
+    seen = set()
+    batch = []
+    for _, _, review in read_reviews(path):
+        digest = review_hash(review)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        if conn.execute("SELECT 1 FROM review_scores WHERE review_hash = ?", (digest,)).fetchone():
+            continue
+        batch.append((digest, review))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Score every new or changed review in parallel; returns the number scored
+def score_new_reviews(path, conn, jobs=None, batch_size=500):
+    import nltk
+
+    # Fetch the lexicon once here rather than in every worker
+    nltk.download("vader_lexicon", quiet=True)
+
+    scored = 0
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        pending = set()
+        for batch in _unscored_batches(path, conn, batch_size):
+            pending.add(pool.submit(score_batch, batch))
+            # Keep a bounded number of batches in flight so memory stays flat on large files
+            if len(pending) >= jobs * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                scored += _save_scores(conn, done)
+        done, _ = wait(pending)
+        scored += _save_scores(conn, done)
+    return scored
+
+
+def _save_scores(conn, futures):
+    count = 0
+    with conn:
+        for future in futures:
+            rows = future.result()
+            conn.executemany("INSERT OR REPLACE INTO review_scores VALUES (?, ?)", rows)
+            count += len(rows)
+    return count
+
+
+# Recompute per-hotel mean scores from the reviews currently in the file, so removed or
+# edited reviews stop counting. Returns the number of hotels scored.
+def aggregate_hotel_scores(path, conn):
+    totals = {}
+    for hotel_name, destination, review in read_reviews(path):
+        row = conn.execute("SELECT compound FROM review_scores WHERE review_hash = ?",
+                           (review_hash(review),)).fetchone()
+        if row is None:
+            continue
+        total, count = totals.get((hotel_name, destination), (0.0, 0))
+        totals[(hotel_name, destination)] = (total + row[0], count + 1)
+
+    with conn:
+        conn.execute("DELETE FROM hotel_sentiment")
+        conn.executemany(
+            "INSERT INTO hotel_sentiment VALUES (?, ?, ?, ?)",
+            [(hotel, city, total / count, count) for (hotel, city), (total, count) in totals.items()],
+        )
+    return len(totals)
+
+
+# Overwrite sentiment_score for hotels that have aggregated review scores; no-op without a store
+def apply_hotel_sentiment(df, db_path=SENTIMENT_DB):
+    if not os.path.exists(db_path):
+        return df
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT hotel_name, city, score FROM hotel_sentiment").fetchall()
+    except sqlite3.OperationalError:
+        rows = []
+    finally:
+        conn.close()
+    if not rows:
+        return df
+    scores = {(hotel, city): score for hotel, city, score in rows}
+    keys = zip(df["Hotel Name"], df["Destination"])
+    rescored = [scores.get(key) for key in keys]
+    df["sentiment_score"] = [
+        original if score is None else score for original, score in zip(df["sentiment_score"], rescored)
+    ]
+    return df
+
+
+def main():
+    from snapshot import DATASET_PATH, build_snapshot
+
+    parser = argparse.ArgumentParser(description="Score hotel reviews with VADER and update the dataset snapshot")
+    parser.add_argument("reviews", help="reviews file (.jsonl or .csv) with Hotel Name, Destination and Review")
+    parser.add_argument("--source", default=DATASET_PATH, help="path to the .xlsx workbook")
+    parser.add_argument("--jobs", type=int, help="worker processes (defaults to the CPU count)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    conn = open_db(SENTIMENT_DB)
+    scored = score_new_reviews(args.reviews, conn, jobs=args.jobs, batch_size=args.batch_size)
+    hotels = aggregate_hotel_scores(args.reviews, conn)
+    conn.close()
+    print(f"Scored {scored} new reviews; {hotels} hotels have review sentiment")
+
+    # Rebuilding the snapshot picks up the new per-hotel scores
+    df = build_snapshot(args.source)
+    print(f"Updated snapshot with {len(df)} hotels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+# "More like this": each hotel's nearest neighbours by content, computed offline.
+#   python similar_hotels.py [Dataset.xlsx]
+# Hotels are described by TF-IDF over their description, a one-hot hotel type and their
+# amenity set. Neighbour lists are saved next to the dataset snapshot, so the app only does
+# an array lookup and never loads scikit-learn.
+
+# Neighbours kept per hotel
+TOP_N = 10
+# Relative weight of each feature block in the cosine similarity
+BLOCK_WEIGHTS = {"description": 1.0, "hotel_type": 0.5, "amenities": 1.0}
+# Upper bound on the dense similarity block (and its partition indices) held in memory at once
+CHUNK_BYTES = 64 * 1024 * 1024
+# Bump when the features or file layout change so saved neighbour lists are rebuilt
+SIMILAR_SCHEMA_VERSION = "1"
+
+
+def similar_path_for(source_path):
+    return os.path.splitext(source_path)[0] + ".similar.npz"
+
+
+# Sparse, row-normalised feature matrix with one row per hotel
+def feature_matrix(df):
+    from scipy import sparse
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+
+    from amenities import AmenityCatalogue
+
+    blocks = []
+    descriptions = df["Additional facilities"].fillna("").astype(str) if "Additional facilities" in df else None
+    if descriptions is not None and descriptions.str.strip().any():
+        tfidf = TfidfVectorizer(stop_words="english", sublinear_tf=True).fit_transform(descriptions)
+        blocks.append(normalize(tfidf) * BLOCK_WEIGHTS["description"])
+    if "Hotel Type" in df:
+        types = df["Hotel Type"].fillna("").astype(str).str.lower().str.strip()
+        codes, _ = types.factorize()
+        one_hot = sparse.csr_matrix((np.ones(len(codes)), (np.arange(len(codes)), codes)))
+        blocks.append(one_hot * BLOCK_WEIGHTS["hotel_type"])
+
+    catalogue = AmenityCatalogue(df["Amenities"])
+    bits = np.unpackbits(catalogue.masks.view(np.uint8), axis=1, bitorder="little")[:, :len(catalogue.names)]
+    blocks.append(normalize(sparse.csr_matrix(bits, dtype=np.float64)) * BLOCK_WEIGHTS["amenities"])
+    return normalize(sparse.hstack(blocks, format="csr")).astype(np.float32)
+
+
+# Top-n most similar rows within a group for each of its rows. Rows are processed in chunks
+# so the dense similarity block (and argpartition's index array over it) stays under chunk_bytes.
+def _top_neighbours(features, rows, n, chunk_bytes, neighbours, scores):
+    k = min(n, len(rows) - 1)
+    if k <= 0:
+        return
+    group = features[rows]
+    # float32 similarities + int64 partition indices per pair, plus the chunk's dense features
+    chunk = max(1, chunk_bytes // (12 * len(rows) + 4 * group.shape[1]))
+    for start in range(0, len(rows), chunk):
+        stop = min(start + chunk, len(rows))
+        # Sparse x dense gives the dense block directly, without a sparse intermediate
+        similarity = np.asarray(group @ group[start:stop].toarray().T).T
+        # A hotel is not its own neighbour
+        similarity[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        best = np.argpartition(similarity, -k, axis=1)[:, -k:]
+        best_scores = np.take_along_axis(similarity, best, axis=1)
+        # Ties are broken by row so rebuilds give the same lists
+        order = np.lexsort((rows[best], -best_scores), axis=1)
+        neighbours[rows[start:stop], :k] = rows[np.take_along_axis(best, order, axis=1)]
+        scores[rows[start:stop], :k] = np.take_along_axis(best_scores, order, axis=1)
+
+
+# (neighbours, scores): n_rows x n arrays, best first, padded with -1 / 0.
+# Neighbours come from the same destination unless same_destination is False.
+def compute_neighbours(df, n=TOP_N, same_destination=True, chunk_bytes=CHUNK_BYTES):
+    features = feature_matrix(df)
+    neighbours = np.full((len(df), n), -1, dtype=np.int32)
+    scores = np.zeros((len(df), n), dtype=np.float32)
+    if same_destination:
+        groups = df.groupby("Destination", sort=False, observed=True).indices.values()
+    else:
+        groups = [np.arange(len(df))]
+    for rows in groups:
+        _top_neighbours(features, rows, n, chunk_bytes, neighbours, scores)
+    return neighbours, scores
+
+
+def save_neighbours(path, neighbours, scores, version):
+    tmp_path = f"{path}.tmp.{os.getpid()}.npz"
+    np.savez(tmp_path, neighbours=neighbours, scores=scores, meta=np.array([SIMILAR_SCHEMA_VERSION, version or ""]))
+    os.replace(tmp_path, path)
+
+
+# Precomputed neighbour lists, or None when missing or built from another dataset version
+class SimilarHotels:
+    def __init__(self, neighbours, scores):
+        self.neighbours = neighbours
+        self.scores = scores
+
+    @classmethod
+    def load(cls, path, version=None):
+        try:
+            with np.load(path) as data:
+                schema_version, saved_version = data["meta"]
+                if schema_version != SIMILAR_SCHEMA_VERSION or (version and saved_version != version):
+                    return None
+                return cls(data["neighbours"], data["scores"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    # Lists for a new dataset version until they are recomputed: rows with source[row] >= 0 are
+    # unchanged hotels and keep that row's neighbours, renumbered through old_to_new with removed
+    # hotels dropped; new and changed hotels get none
+    def remapped(self, source, old_to_new):
+        neighbours = np.full((len(source), self.neighbours.shape[1]), -1, dtype=np.int32)
+        scores = np.zeros(neighbours.shape, dtype=np.float32)
+        kept = np.flatnonzero(source >= 0)
+        old = self.neighbours[source[kept]]
+        mapped = np.where(old >= 0, old_to_new[np.maximum(old, 0)], -1)
+        # Dropped neighbours move to the end so the rest stay best first
+        order = np.argsort(mapped < 0, axis=1, kind="stable")
+        neighbours[kept] = np.take_along_axis(mapped, order, axis=1)
+        scores[kept] = np.where(neighbours[kept] >= 0,
+                                np.take_along_axis(self.scores[source[kept]], order, axis=1), 0)
+        return SimilarHotels(neighbours, scores)
+
+    # (rows, scores) of up to n hotels most like the one at row
+    def of(self, row, n=5):
+        neighbours = self.neighbours[row, :n]
+        found = neighbours >= 0
+        return neighbours[found], self.scores[row, :n][found]
+
+
+def main():
+    from snapshot import DATASET_PATH, load_dataset
+
+    parser = argparse.ArgumentParser(description="Precompute similar hotels next to the dataset snapshot")
+    parser.add_argument("source", nargs="?", default=DATASET_PATH, help="path to the .xlsx workbook")
+    parser.add_argument("--top", type=int, default=TOP_N, help="neighbours kept per hotel")
+    parser.add_argument("--any-destination", action="store_true", help="allow neighbours in other destinations")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_BYTES // (1024 * 1024),
+                        help="memory for each block of similarities")
+    args = parser.parse_args()
+
+    df = load_dataset(args.source)
+    start = time.perf_counter()
+    neighbours, scores = compute_neighbours(df, args.top, not args.any_destination, args.chunk_mb * 1024 * 1024)
+    save_neighbours(similar_path_for(args.source), neighbours, scores, df.attrs.get("snapshot_version"))
+    print(f"Saved {args.top} similar hotels for each of {len(df)} hotels in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
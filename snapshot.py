@@ -0,0 +1,170 @@
+import argparse
+import hashlib
+import logging
+import os
+import time
+
+import pandas as pd
+
+# Source workbook; can be pointed elsewhere for staging data or benchmarks
+DATASET_PATH = os.environ.get("YAATRIMITRA_DATASET", "Dataset.xlsx")
+
+# Bump when the cleaning rules or column types change so old snapshots are rebuilt
+SNAPSHOT_SCHEMA_VERSION = "1"
+
+logger = logging.getLogger("yaatrimitra.snapshot")
+
+
+# Path of the Arrow IPC snapshot that sits next to the source workbook
+def snapshot_path_for(source_path):
+    return os.path.splitext(source_path)[0] + ".arrow"
+
+
+# Hash the workbook contents in chunks so large files don't need to fit in memory
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Apply the column coercions the app relies on
+def clean_dataset(df):
+    # Ensure sentiment_score is numeric
+    df["sentiment_score"] = pd.to_numeric(df["sentiment_score"], errors="coerce")
+    # Ensure Price Column is Numeric
+    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    return df
+
+
+# Read the workbook through openpyxl (slow path), with any rescored review sentiment applied
+def read_source(source_path=DATASET_PATH):
+    from sentiment_pipeline import apply_hotel_sentiment
+
+    return apply_hotel_sentiment(clean_dataset(pd.read_excel(source_path)))
+
+
+# Read the provenance stored in the snapshot's schema metadata
+def read_snapshot_meta(snapshot_path):
+    from pyarrow import ipc
+
+    with ipc.open_file(snapshot_path) as reader:
+        metadata = reader.schema.metadata or {}
+    return {key.decode(): value.decode() for key, value in metadata.items()}
+
+
+# Check the snapshot against the source; mtime/size first, content hash only if those moved
+def snapshot_is_fresh(source_path, snapshot_path):
+    if not os.path.exists(snapshot_path):
+        return False
+    meta = read_snapshot_meta(snapshot_path)
+    if meta.get("schema_version") != SNAPSHOT_SCHEMA_VERSION:
+        return False
+    stat = os.stat(source_path)
+    if meta.get("source_mtime_ns") == str(stat.st_mtime_ns) and meta.get("source_size") == str(stat.st_size):
+        return True
+    # A redeploy may touch the workbook without changing it
+    return meta.get("source_sha256") == file_sha256(source_path)
+
+
+# Write a cleaned frame as a typed, memory-mappable Arrow IPC snapshot
+def write_snapshot(df, source_path=DATASET_PATH, snapshot_path=None, stat=None):
+    import pyarrow as pa
+    from pyarrow import feather
+
+    snapshot_path = snapshot_path or snapshot_path_for(source_path)
+    stat = stat or os.stat(source_path)
+
+    source_sha256 = file_sha256(source_path)
+    # Changes on every write, including rescoring runs that leave the workbook untouched
+    version = f"{source_sha256[:16]}-{time.time_ns()}"
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata.update({
+        b"schema_version": SNAPSHOT_SCHEMA_VERSION.encode(),
+        b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+        b"source_size": str(stat.st_size).encode(),
+        b"source_sha256": source_sha256.encode(),
+        b"version": version.encode(),
+    })
+    table = table.replace_schema_metadata(metadata)
+
+    # Write to a temp file and swap it in so readers never see a partial snapshot
+    tmp_path = f"{snapshot_path}.tmp.{os.getpid()}"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, snapshot_path)
+    df.attrs["snapshot_version"] = version
+    return snapshot_path
+
+
+# Convert the workbook into a snapshot (the build step)
+def build_snapshot(source_path=DATASET_PATH, snapshot_path=None):
+    # Stat before reading so an edit during the parse leaves the snapshot stale
+    stat = os.stat(source_path)
+    df = read_source(source_path)
+    write_snapshot(df, source_path, snapshot_path, stat=stat)
+    return df
+
+
+# Memory-map the snapshot, or return None when it is missing or stale
+def load_snapshot(source_path=DATASET_PATH, snapshot_path=None):
+    snapshot_path = snapshot_path or snapshot_path_for(source_path)
+    try:
+        if not snapshot_is_fresh(source_path, snapshot_path):
+            return None
+        from pyarrow import feather
+
+        df = feather.read_table(snapshot_path, memory_map=True).to_pandas()
+        meta = read_snapshot_meta(snapshot_path)
+        df.attrs["snapshot_version"] = meta.get("version") or meta["source_sha256"][:16]
+        return df
+    except (ImportError, OSError, ValueError):
+        # Missing pyarrow or an unreadable snapshot both mean "rebuild"
+        return None
+
+
+# Errors that leave the dataset without a snapshot rather than fail the load: no pyarrow, a
+# read-only deploy, or columns Arrow can't type (e.g. numbers and text mixed in an edited workbook)
+def _snapshot_write_errors():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return ImportError, OSError
+    return ImportError, OSError, pa.ArrowException
+
+
+# Load the hotel dataset, preferring the snapshot and rebuilding it when stale
+def load_dataset(source_path=DATASET_PATH, snapshot_path=None):
+    df = load_snapshot(source_path, snapshot_path)
+    if df is not None:
+        return df
+    stat = os.stat(source_path)
+    df = read_source(source_path)
+    try:
+        write_snapshot(df, source_path, snapshot_path, stat=stat)
+    except _snapshot_write_errors() as e:
+        # Keep serving from the Excel parse
+        logger.warning("Serving %s without a snapshot: %s: %s", source_path, type(e).__name__, e)
+        df.attrs["snapshot_version"] = f"{file_sha256(source_path)[:16]}-xlsx"
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the hotel workbook into an Arrow snapshot")
+    parser.add_argument("source", nargs="?", default=DATASET_PATH, help="path to the .xlsx workbook")
+    parser.add_argument("-o", "--output", help="snapshot path (defaults to <source>.arrow)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the snapshot is fresh")
+    args = parser.parse_args()
+
+    output = args.output or snapshot_path_for(args.source)
+    if not args.force and snapshot_is_fresh(args.source, output):
+        print(f"{output} is up to date")
+        return
+    df = build_snapshot(args.source, output)
+    print(f"Wrote {len(df)} rows to {output}")
+
+
+if __name__ == "__main__":
+    main()
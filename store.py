@@ -0,0 +1,165 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from amenities import AmenityCatalogue
+from hotel_index import HotelIndex
+from name_search import NameIndex, name_index_path_for
+from pricing import load_price_calendar
+from ranking import HotelRanker
+from similar_hotels import SimilarHotels, similar_path_for
+
+# Low-cardinality text columns stored as categoricals
+CATEGORICAL_COLUMNS = ("Destination", "Hotel Type")
+# Numeric columns that don't need double precision
+FLOAT32_COLUMNS = ("Price", "Ratings", "sentiment_score")
+
+
+# Shrink the frame: categorical labels, float32 numbers and interned hotel names
+def compact_dataset(df):
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("category")
+    for column in FLOAT32_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype("float32")
+    df["Hotel Name"] = [sys.intern(name) if isinstance(name, str) else name for name in df["Hotel Name"]]
+    return df
+
+
+# Hotels are matched across dataset versions by these columns; repeats of a pair are told apart by their order
+IDENTITY_COLUMNS = ("Hotel Name", "Destination")
+
+
+# Row-level difference between two versions of the dataset, keyed by hotel identity.
+# new_to_old[row] is a new row's position in the old version (-1 for an added hotel) and
+# old_to_new the reverse (-1 for a removed one); changed marks matched rows whose other values differ.
+class DatasetDiff:
+    def __init__(self, new_to_old, old_to_new, changed):
+        self.new_to_old = new_to_old
+        self.old_to_new = old_to_new
+        self.changed = changed
+        self.added = np.flatnonzero(new_to_old < 0)
+        self.removed = np.flatnonzero(old_to_new < 0)
+        # Old row each new row is an identical copy of, -1 for added or changed hotels
+        self.unchanged_source = np.where(changed, -1, new_to_old)
+
+    # Old rows whose values don't carry over as they are: removed or changed hotels
+    def dropped(self):
+        return np.union1d(self.removed, self.new_to_old[self.changed])
+
+    def is_empty(self):
+        return (len(self.new_to_old) == len(self.old_to_new) and not self.changed.any()
+                and np.array_equal(self.new_to_old, np.arange(len(self.new_to_old))))
+
+    def summary(self):
+        return {"added": len(self.added), "removed": len(self.removed), "changed": int(self.changed.sum()),
+                "unchanged": int((self.unchanged_source >= 0).sum())}
+
+
+# Integer identity of every row of two frames: a code per (name, destination) pair shared by both,
+# combined with the pair's occurrence number so repeated pairs match up in order
+def _identities(old_df, new_df):
+    pairs = np.zeros(len(old_df) + len(new_df), dtype=np.int64)
+    for column in IDENTITY_COLUMNS:
+        values = np.concatenate([old_df[column].astype(str).to_numpy(), new_df[column].astype(str).to_numpy()])
+        codes, uniques = pd.factorize(values)
+        pairs, _ = pd.factorize(pairs * len(uniques) + codes)
+    identities = []
+    for part in (pairs[:len(old_df)], pairs[len(old_df):]):
+        repeat = pd.Series(part).groupby(part).cumcount().to_numpy()
+        identities.append(part.astype(np.int64) * (len(old_df) + len(new_df)) + repeat)
+    return identities
+
+
+# Diff of two compact frames, or None when they can't be compared row by row (different columns)
+def diff_datasets(old_df, new_df):
+    if old_df.empty or list(old_df.columns) != list(new_df.columns):
+        return None
+    old_identities, new_identities = _identities(old_df, new_df)
+    new_to_old = pd.Index(old_identities).get_indexer(new_identities)
+    old_to_new = np.full(len(old_df), -1, dtype=np.int64)
+    matched = np.flatnonzero(new_to_old >= 0)
+    old_to_new[new_to_old[matched]] = matched
+
+    changed = np.zeros(len(new_df), dtype=bool)
+    for column in new_df.columns:
+        old_values = old_df[column].to_numpy()[new_to_old[matched]]
+        new_values = new_df[column].to_numpy()[matched]
+        same = (old_values == new_values) | (pd.isna(old_values) & pd.isna(new_values))
+        changed[matched[~same]] = True
+    return DatasetDiff(new_to_old, old_to_new, changed)
+
+
+# Mark every array attribute of an object read-only so shared state can't be mutated by a session
+def _freeze(obj):
+    for value in vars(obj).values():
+        arrays = value.values() if isinstance(value, dict) else [value]
+        for array in arrays:
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+
+
+# The process-wide, read-only hotel data: one compact frame plus the indexes built over it.
+# Built once and handed out by reference; sessions only hold row-position arrays into it.
+# With source_path, indexes that can be saved (the name index) are kept next to its snapshot.
+# With previous, the store of an earlier dataset version, parts derived from hotels that didn't
+# change are carried over instead of rebuilt; diff then holds the row-level changes.
+class HotelStore:
+    def __init__(self, df, source_path=None, previous=None):
+        # Identifies the dataset build; caches derived from the store are keyed on it
+        self.version = df.attrs.get("snapshot_version")
+        self.df = compact_dataset(df)
+        self.diff = diff_datasets(previous.df, self.df) if previous is not None else None
+        if self.diff is None:
+            previous = None
+        self.hotel_index = HotelIndex(self.df)
+        if previous is None:
+            self.amenity_catalogue = AmenityCatalogue(self.df["Amenities"])
+        else:
+            # Only new and changed hotels are parsed again
+            self.amenity_catalogue = previous.amenity_catalogue.updated(
+                self.df["Amenities"], self.diff.unchanged_source,
+                previous.df["Amenities"].iloc[self.diff.dropped()])
+        self.ranker = HotelRanker(self.df, self.hotel_index, self.amenity_catalogue)
+        # Nightly rates for date-aware prices; None when there is no rate file
+        self.calendar = load_price_calendar(self.df)
+        self.names = self.df["Hotel Name"].to_numpy()
+        self.destinations = self.df["Destination"].astype(str).to_numpy()
+        # Trigram index for name search, reused from disk while the snapshot version matches
+        index_path = name_index_path_for(source_path) if source_path else None
+        if previous is None:
+            self.name_index = NameIndex.load_or_build(self.df, index_path, self.version)
+        else:
+            # Hotels still present keep their trigram postings; only added ones are tokenised
+            self.name_index = previous.name_index.updated(self.diff.old_to_new, self.diff.added, self.names,
+                                                          self.destinations, self.version)
+            if index_path and self.version:
+                try:
+                    self.name_index.save(index_path)
+                except OSError:
+                    pass
+        # Precomputed "more like this" lists (python similar_hotels.py); None until built for this version.
+        # After a reload, unchanged hotels keep their previous lists until they are recomputed.
+        self.similar = SimilarHotels.load(similar_path_for(source_path), self.version) if source_path else None
+        if self.similar is None and previous is not None and previous.similar is not None:
+            self.similar = previous.similar.remapped(self.diff.unchanged_source, self.diff.old_to_new)
+        for part in (self.hotel_index, self.amenity_catalogue, self.ranker, self.calendar, self.name_index):
+            if part is not None:
+                _freeze(part)
+
+    # Placeholder store for when the dataset can't be loaded
+    @classmethod
+    def empty(cls):
+        store = cls.__new__(cls)
+        store.version = None
+        store.df = pd.DataFrame()
+        store.hotel_index = store.amenity_catalogue = store.ranker = store.calendar = store.name_index = None
+        store.similar = store.diff = None
+        return store
+
+    # Materialise a small frame for the given row positions (for rendering)
+    def rows(self, positions):
+        return self.df.iloc[positions]
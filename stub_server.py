@@ -0,0 +1,116 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for the OpenWeatherMap and Nominatim APIs, for tests and benchmarks.
+# Run it and point the app and geocoder at it:
+#   python stub_server.py --port 8765 --latency 0.2
+#   OPENWEATHER_BASE_URL=http://127.0.0.1:8765/data/2.5 streamlit run Yaatrimitra.py
+#   NOMINATIM_URL=http://127.0.0.1:8765/search python geocode.py
+
+CONDITIONS = [("clear sky", "01d"), ("few clouds", "02d"), ("light rain", "10d"), ("mist", "50d")]
+
+
+# Deterministic fake reading for a city so repeated runs are comparable
+def fake_weather(city):
+    seed = int(hashlib.md5(city.lower().encode()).hexdigest()[:8], 16)
+    description, icon = CONDITIONS[seed % len(CONDITIONS)]
+    return {
+        "cod": 200,
+        "name": city,
+        "main": {"temp": round(5 + seed % 250 / 10, 1), "humidity": 40 + seed % 50},
+        "weather": [{"description": description, "icon": icon}],
+        "wind": {"speed": round(seed % 80 / 10, 1)},
+    }
+
+
+# Deterministic fake geocode near the middle of India; a few hotels get no match
+def fake_geocode(query):
+    seed = int(hashlib.md5(query.lower().encode()).hexdigest()[:8], 16)
+    if seed % 10 == 0:
+        return []
+    return [{"lat": str(20.0 + seed % 1000 / 100), "lon": str(78.0 + seed // 1000 % 1000 / 100)}]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.fail_status:
+            # Simulated upstream outage, e.g. to test serving stale readings
+            self._send(server.fail_status, {"cod": str(server.fail_status), "message": "upstream error"})
+            return
+
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path.endswith("/weather") and query.get("q"):
+            self._send(200, fake_weather(query["q"]))
+        elif url.path.endswith("/search") and query.get("q"):
+            self._send(200, fake_geocode(query["q"]))
+        else:
+            self._send(404, {"cod": "404", "message": "not found"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Start the stub on a background thread; port 0 picks a free port. Returns the server; set its
+# fail_status (e.g. 503) to answer every request with that error until it is cleared.
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0):
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.fail_status = None
+    server.lock = threading.Lock()
+    server.request_count = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+# Base URL to use as OPENWEATHER_BASE_URL for a running stub
+def weather_base_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/data/2.5"
+
+
+# URL to use as NOMINATIM_URL for a running stub
+def nominatim_url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/search"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake weather and geocoding responses locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay each response")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.host, args.port, args.latency)
+    print(f"Weather stub listening on {weather_base_url(server)}")
+    print(f"Nominatim stub listening on {nominatim_url(server)}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root; the synthetic catalogue generator in benchmarks/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+# No date-dependent rates unless a test sets them up
+os.environ["PRICE_CALENDAR"] = ""
+
+
+# A small synthetic catalogue with the workbook's schema
+@pytest.fixture
+def hotels():
+    from synthetic_dataset import generate
+
+    df = generate(2000, seed=0, destinations=3)
+    df.attrs["snapshot_version"] = "test-1"
+    return df
+
+
+@pytest.fixture
+def engine(hotels):
+    from engine import RecommendationEngine
+    from store import HotelStore
+
+    return RecommendationEngine(HotelStore(hotels))
+
+
+# The JSON API over the engine on a free port; yields its base URL
+@pytest.fixture
+def api_url(engine):
+    from api import start_api_server
+
+    server = start_api_server(engine, "127.0.0.1", 0, workers=2)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
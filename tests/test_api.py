@@ -0,0 +1,82 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_search_returns_a_page(api_url):
+    status, body = _get(f"{api_url}/search?destination=Manali&max_price=5000")
+    assert status == 200
+    assert body["total"] > 0 and len(body["hotels"]) == body["page_size"]
+
+
+@pytest.mark.parametrize("query", ["bbox=nan,1,2,3", "bbox=1,2,inf,4", "near=nan,77&radius_km=5",
+                                   "near=32,77&radius_km=nan", "max_price=nan", "min_price=-inf"])
+def test_non_finite_numbers_are_rejected(api_url, query):
+    status, body = _get(f"{api_url}/search?destination=Manali&{query}")
+    assert status == 400
+    assert "finite" in body["error"]
+
+
+def test_unexpected_errors_answer_500(api_url, engine, monkeypatch):
+    def broken(*args, **kwargs):
+        raise AttributeError("boom")
+
+    monkeypatch.setattr(engine, "nearby", broken)
+    status, body = _get(f"{api_url}/hotel/0/nearby")
+    assert status == 500 and body == {"error": "internal server error"}
+    # The worker keeps serving
+    assert _get(f"{api_url}/hotel/0")[0] == 200
+
+
+@pytest.mark.parametrize("path", ["hotel/0/nearby?n=0", "hotel/0/nearby?n=-3", "hotel/0/similar?n=51",
+                                  "suggest?q=pine&limit=0", "suggest?q=pine&limit=1000"])
+def test_result_counts_out_of_range_are_rejected(api_url, path):
+    status, body = _get(f"{api_url}/{path}")
+    assert status == 400 and "between 1 and 50" in body["error"]
+
+
+def test_result_counts_are_honoured(api_url):
+    assert len(_get(f"{api_url}/hotel/0/nearby?n=3")[1]["hotels"]) == 3
+    assert len(_get(f"{api_url}/hotel/0/nearby")[1]["hotels"]) == 5
+
+
+def test_connections_past_the_queue_get_503(engine, monkeypatch):
+    from api import start_api_server
+
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(*args, **kwargs):
+        started.set()
+        release.wait(10)
+        return np.empty(0, dtype=np.intp), np.empty(0)
+
+    monkeypatch.setattr(engine, "nearby", slow)
+    server = start_api_server(engine, workers=1, queue=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        busy = threading.Thread(target=_get, args=(f"{url}/hotel/0/nearby",))
+        busy.start()
+        assert started.wait(10)
+        status, body = _get(f"{url}/hotel/0")
+        assert status == 503 and "overloaded" in body["error"]
+        release.set()
+        busy.join(10)
+        # The slot is free again once the slow request finishes
+        assert _get(f"{url}/hotel/0")[0] == 200
+    finally:
+        release.set()
+        server.shutdown()
+        server.server_close()
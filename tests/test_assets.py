@@ -0,0 +1,40 @@
+import os
+
+from PIL import Image
+
+from assets import build_assets, hero_background_css, load_assets
+
+
+def _image(path, width=2000, color=(200, 120, 40)):
+    Image.new("RGB", (width, width // 2), color).save(path, "JPEG")
+    return str(path)
+
+
+def test_build_resizes_and_names_files_by_content(tmp_path):
+    source = _image(tmp_path / "Hero.jpg")
+    static_dir = str(tmp_path / "static")
+    manifest = build_assets(source, static_dir, width=640)
+    assert (manifest["width"], manifest["height"]) == (640, 320)
+    for entry in manifest["files"].values():
+        assert entry["digest"] in entry["file"] and os.path.exists(os.path.join(static_dir, entry["file"]))
+    # Built once; an unchanged source reuses the build
+    assert load_assets(source, static_dir) == manifest
+
+
+def test_changed_source_gets_new_urls_and_old_files_go(tmp_path):
+    static_dir = str(tmp_path / "static")
+    old = build_assets(_image(tmp_path / "Hero.jpg"), static_dir, width=640)
+    new = load_assets(_image(tmp_path / "Hero.jpg", color=(10, 90, 200)), static_dir)
+    assert new["files"]["jpeg"]["file"] != old["files"]["jpeg"]["file"]
+    assert sorted(os.listdir(static_dir)) == sorted([entry["file"] for entry in new["files"].values()]
+                                                    + ["manifest.json"])
+
+
+def test_background_css_serves_static_files_or_inlines_the_smallest(tmp_path):
+    static_dir = str(tmp_path / "static")
+    manifest = build_assets(_image(tmp_path / "Hero.jpg"), static_dir, width=640)
+    css = hero_background_css(manifest, serve_static=True, static_dir=static_dir)
+    assert "image-set(" in css and f"app/static/{manifest['files']['webp']['file']}?v=" in css
+    inline = hero_background_css(manifest, serve_static=False, static_dir=static_dir)
+    smallest = min(manifest["files"].values(), key=lambda entry: entry["bytes"])
+    assert inline.count("data:") == 1 and f"data:{smallest['mime']};base64," in inline
@@ -0,0 +1,20 @@
+import numpy as np
+
+from engine import RecommendationEngine
+from store import HotelStore
+
+
+def test_ranked_count_leaves_out_rows_the_ranking_drops(hotels):
+    hotels.loc[hotels.index[::4], "sentiment_score"] = np.nan
+    engine = RecommendationEngine(HotelStore(hotels))
+    result = engine.search("Manali")
+    listed = []
+    page = 0
+    while True:
+        rows = engine.results_page(result, page, "Manali").rows
+        listed.extend(rows)
+        if len(rows) < engine.page_size:
+            break
+        page += 1
+    # Every page there is to show adds up to the count, though the search matched more rows
+    assert engine.ranked_count(result) == len(listed) < len(result.rows)
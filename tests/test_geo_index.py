@@ -0,0 +1,24 @@
+import numpy as np
+
+from geo_index import GeoIndex
+
+
+def _index():
+    rng = np.random.default_rng(0)
+    return GeoIndex(np.column_stack([32.2 + rng.normal(0, 0.05, 500), 77.2 + rng.normal(0, 0.05, 500)]))
+
+
+def test_bbox_and_radius_find_nearby_hotels():
+    index = _index()
+    assert len(index.within_bbox(32.0, 77.0, 32.4, 77.4)) > 400
+    rows, distances = index.within_radius(32.2, 77.2, 5)
+    assert len(rows) and (np.diff(distances) >= 0).all()
+
+
+def test_non_finite_bounds_return_nothing_instead_of_hanging():
+    index = _index()
+    assert len(index.within_bbox(np.nan, 1, 2, 3)) == 0
+    assert len(index.within_radius(np.nan, 77.2, 5)[0]) == 0
+    assert len(index.within_radius(32.2, 77.2, np.nan)[0]) == 0
+    # Infinite bounds are clamped to the globe
+    assert len(index.within_bbox(-np.inf, -np.inf, np.inf, np.inf)) == 500
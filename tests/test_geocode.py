@@ -0,0 +1,30 @@
+import stub_server
+from geocode import SOURCE_FALLBACK, SOURCE_NOMINATIM, GeocodeStore, geocode_all
+from stub_server import nominatim_url, start_stub_server
+
+# Nominatim answers of the wrong shape, keyed by the hotel they are returned for
+MALFORMED = {
+    "No Lon": [{"lat": "32.1"}],
+    "Object": {"error": "Unable to geocode"},
+    "Strings": ["32.1,77.2"],
+    "Null": [None],
+}
+
+
+def test_malformed_answers_fall_back_without_stopping_the_batch(tmp_path, monkeypatch):
+    good = stub_server.fake_geocode
+    monkeypatch.setattr(stub_server, "fake_geocode",
+                        lambda query: MALFORMED.get(query.split(",")[0], good(query)))
+    server = start_stub_server()
+    store = GeocodeStore(str(tmp_path / "geocode.sqlite"))
+    pairs = [(name, "Manali") for name in MALFORMED] + [("Hotel Pine Inn", "Manali")]
+    try:
+        geocode_all(pairs, store, rate=1000, base_url=nominatim_url(server), log=lambda message: None)
+    finally:
+        server.shutdown()
+        server.server_close()
+    # Each malformed answer is asked for once, and every hotel ends up with coordinates
+    assert server.request_count == len(pairs)
+    sources = {name: source for (name, _), (_, _, source) in store.all().items()}
+    assert sources == {**{name: SOURCE_FALLBACK for name in MALFORMED}, "Hotel Pine Inn": SOURCE_NOMINATIM}
+    store.close()
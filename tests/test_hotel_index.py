@@ -0,0 +1,11 @@
+import pandas as pd
+
+from hotel_index import PRICE_BANDS, HotelIndex, band_range
+
+
+def test_price_bands_cover_every_price_once():
+    prices = [0, 4999.5, 5000, 5000.5, 5001, 9999.99, 10000, 10000.5, 10001, 250000]
+    index = HotelIndex(pd.DataFrame({"Destination": "Manali", "Price": prices}))
+    matched = [row for band in PRICE_BANDS for row in index.select("Manali", *band_range(band))]
+    assert sorted(matched) == list(range(len(prices)))
+    assert [prices[row] for row in index.select("Manali", *band_range("Luxury (₹10001+)"))] == [10000.5, 10001, 250000]
@@ -0,0 +1,126 @@
+import threading
+import time
+import urllib.request
+
+import pytest
+
+import metrics
+from metrics import Histogram, MetricsRegistry, end_trace, gauges_from, start_trace, timed
+
+
+def test_histogram_quantiles_are_bucket_upper_bounds():
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.005, 0.01, 0.05, 0.5, 2.0):
+        histogram.observe(value)
+    # Bounds are inclusive: 0.01 lands in the first bucket
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5 and histogram.sum == pytest.approx(2.565)
+    assert histogram.quantile(0.4) == 0.01
+    assert histogram.quantile(0.6) == 0.1
+    assert histogram.quantile(0.99) == float("inf")
+
+
+def test_timed_records_blocks_and_decorated_calls():
+    registry = MetricsRegistry()
+    with timed("block", registry):
+        pass
+
+    @timed("call", registry)
+    def double(x):
+        return 2 * x
+
+    assert [double(i) for i in range(3)] == [0, 2, 4]
+    summary = registry.summary()
+    assert summary["block"]["count"] == 1 and summary["call"]["count"] == 3
+
+
+def test_timed_records_even_when_the_block_raises():
+    registry = MetricsRegistry()
+    with pytest.raises(ValueError):
+        with timed("failing", registry):
+            raise ValueError
+    assert registry.summary()["failing"]["count"] == 1
+
+
+def test_counters_are_keyed_by_name_and_labels():
+    registry = MetricsRegistry()
+    registry.count("hits", route="search")
+    registry.count("hits", 2, route="search")
+    registry.count("hits", route="hotel")
+    assert registry.counters() == {("hits", (("route", "hotel"),)): 1,
+                                   ("hits", (("route", "search"),)): 3}
+
+
+def test_concurrent_counts_are_not_lost():
+    registry = MetricsRegistry()
+
+    def work():
+        for _ in range(2000):
+            registry.count("calls")
+            registry.observe("stage", 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert registry.counters()[("calls", ())] == 16000
+    assert registry.summary()["stage"]["count"] == 16000
+
+
+def test_trace_collects_this_threads_stages_only(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    trace = start_trace()
+    with timed("first", registry):
+        pass
+    other = threading.Thread(target=timed("elsewhere", registry)(lambda: None))
+    other.start()
+    other.join()
+    with timed("second", registry):
+        pass
+    assert end_trace("rerun") is trace
+    assert [stage for stage, _ in trace.stages] == ["first", "second"]
+    assert registry.summary()["rerun"]["count"] == 1
+    # Nothing is traced once the trace has ended
+    assert end_trace() is None
+
+
+def test_prometheus_text_is_cumulative_and_escaped():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.observe("search", 0.05)
+    registry.observe("search", 0.5)
+    registry.count("errors_total", route='say "hi"\n')
+    text = registry.prometheus_text([("hotels", {"version": "v1"}, 3), ("missing", {}, None)])
+    lines = text.splitlines()
+    assert 'yaatrimitra_stage_seconds_bucket{stage="search",le="0.1"} 1' in lines
+    assert 'yaatrimitra_stage_seconds_bucket{stage="search",le="1.0"} 2' in lines
+    assert 'yaatrimitra_stage_seconds_bucket{stage="search",le="+Inf"} 2' in lines
+    assert 'yaatrimitra_stage_seconds_count{stage="search"} 2' in lines
+    assert "# TYPE yaatrimitra_errors_total counter" in lines
+    assert 'yaatrimitra_errors_total{route="say \\"hi\\"\\n"} 1' in lines
+    assert 'yaatrimitra_hotels{version="v1"} 3' in lines
+    # Gauges without a value are left out
+    assert "missing" not in text
+
+
+def test_gauges_from_skips_non_numeric_fields():
+    samples = gauges_from("weather", {"Manali": {"age_seconds": 12.0, "stale": True, "city": "x"}}, "city")
+    assert samples == [("weather_age_seconds", {"city": "Manali"}, 12.0)]
+
+
+def test_api_exposes_metrics(api_url):
+    urllib.request.urlopen(f"{api_url}/search?destination=Manali", timeout=10).read()
+    # The route's timing is recorded once its response has gone out, so it can trail the reply
+    deadline = time.monotonic() + 5
+    while True:
+        with urllib.request.urlopen(f"{api_url}/metrics", timeout=10) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            text = response.read().decode()
+        if 'yaatrimitra_stage_seconds_count{stage="api_search"}' in text or time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+    assert 'yaatrimitra_stage_seconds_count{stage="api_search"}' in text
+    assert "yaatrimitra_query_cache_hits" in text
+    assert 'yaatrimitra_hotels{version="test-1"} 2000' in text
@@ -0,0 +1,34 @@
+import name_search
+from name_search import NameIndex, normalise, trigrams
+
+
+def _catalogue(hotels):
+    names = hotels["Hotel Name"].to_numpy()
+    destinations = hotels["Destination"].astype(str).to_numpy()
+    return NameIndex.build(names, destinations), names, destinations
+
+
+def test_one_typo_finds_the_hotel(hotels):
+    index, names, destinations = _catalogue(hotels)
+    row = 123
+    query = f"{names[row]} {destinations[row]}"
+    query = query[:5] + query[6:]
+    assert row in [match for match, _ in index.search(query, names, destinations)]
+
+
+def test_capped_merge_still_counts_every_shared_trigram(hotels, monkeypatch):
+    index, names, destinations = _catalogue(hotels)
+    monkeypatch.setattr(name_search, "MAX_MERGED_POSTINGS", 10)
+    grams = trigrams(normalise("hotel pine retreat"))
+    rows, shared = index.candidates(grams)
+    assert 0 < len(rows) <= name_search.MAX_CANDIDATES
+    # Counts from the merged lists plus the checks against the others are exact shared-trigram counts
+    for row, count in zip(rows, shared):
+        assert count == len(grams & trigrams(normalise(f"{names[row]} {destinations[row]}")))
+
+
+def test_scores_are_similarities_best_first(hotels):
+    index, names, destinations = _catalogue(hotels)
+    matches = index.search("pine", names, destinations)
+    scores = [score for _, score in matches]
+    assert matches and scores == sorted(scores, reverse=True) and all(0.4 <= score <= 1 for score in scores)
@@ -0,0 +1,45 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from pricing import load_price_calendar
+
+
+def _rates(path, rows):
+    pd.DataFrame(rows, columns=["Hotel Name", "Destination", "Date", "Price"]).to_csv(path, index=False)
+    return str(path)
+
+
+def test_stay_prices_use_nightly_rates(hotels, tmp_path):
+    name, destination, base = hotels.iloc[0][["Hotel Name", "Destination", "Price"]]
+    path = _rates(tmp_path / "rates.csv", [(name, destination, "2026-01-01", 100.0),
+                                           (name, destination, "2026-01-02", 300.0)])
+    calendar = load_price_calendar(hotels, path)
+    assert calendar.nightly_prices(np.array([0]), np.datetime64("2026-01-01"), np.datetime64("2026-01-03"))[0] == 200
+    # Nights outside the calendar cost the base price
+    total = calendar.stay_totals(np.array([0]), np.datetime64("2026-01-02"), np.datetime64("2026-01-04"))[0]
+    assert total == 300 + base
+
+
+def test_rate_file_matching_no_hotel_falls_back_to_base_prices(hotels, tmp_path, caplog):
+    path = _rates(tmp_path / "rates.csv", [("No Such Hotel", "Nowhere", "2026-01-01", 100.0)])
+    with caplog.at_level(logging.WARNING, logger="yaatrimitra.pricing"):
+        assert load_price_calendar(hotels, path) is None
+    assert "No rate" in caplog.text
+
+
+def test_storage_follows_the_rates_not_the_date_range(hotels, tmp_path, caplog):
+    (name, destination), (other, other_destination) = hotels[["Hotel Name", "Destination"]].iloc[:2].values.tolist()
+    path = _rates(tmp_path / "rates.csv", [(name, destination, "2026-01-01", 100.0),
+                                           (other, other_destination, "2026-06-01", 500.0),
+                                           (name, destination, "2026-01-01", 150.0),
+                                           (name, destination, "2036-01-01", 900.0)])
+    with caplog.at_level(logging.WARNING, logger="yaatrimitra.pricing"):
+        calendar = load_price_calendar(hotels, path)
+    # One entry per rated night: the duplicate keeps its last rate, the one ten years on is dropped
+    assert len(calendar.keys) == 2 and "Dropped 1 rates" in caplog.text
+    totals = calendar.stay_totals(np.array([0, 1, 2]), np.datetime64("2025-12-31"), np.datetime64("2026-06-02"))
+    bases = hotels["Price"].to_numpy(dtype="float64")[:3]
+    nights = 153
+    assert np.allclose(totals, [150 + (nights - 1) * bases[0], 500 + (nights - 1) * bases[1], nights * bases[2]])
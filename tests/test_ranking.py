@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from amenities import AmenityCatalogue
+from hotel_index import HotelIndex
+from ranking import HotelRanker
+
+
+def _ranker(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Destination": "Manali",
+        "Hotel Name": [f"Hotel {i}" for i in range(n)],
+        # Few distinct values, so most hotels tie with many others
+        "Ratings": rng.choice([4.0, 4.5, 5.0], n),
+        "Price": rng.choice([1000.0, 2000.0, 3000.0], n),
+        "Amenities": rng.choice(["Pool", "Wi-Fi", None], n),
+        "sentiment_score": rng.choice([0.1, 0.5], n),
+    })
+    hotel_index = HotelIndex(df)
+    return HotelRanker(df, hotel_index, AmenityCatalogue(df["Amenities"])), hotel_index
+
+
+def test_pages_with_ties_never_repeat_or_drop_a_row():
+    ranker, hotel_index = _ranker()
+    # A price-filtered subset, so the cached per-destination ordering isn't used
+    rows = hotel_index.select("Manali", None, 2000)
+    weights = {"sentiment": 0, "ratings": 1, "price": 0, "amenities": 0}
+    page_size = 7
+    pages = [ranker.page(rows, page, page_size, weights=weights) for page in range(-(-len(rows) // page_size))]
+    paged = np.concatenate(pages)
+    assert len(paged) == len(np.unique(paged)) == len(rows)
+    scores = ranker.scores(paged, weights)
+    assert (np.diff(scores) <= 0).all()
+    # Within a score, dataset order
+    for score in np.unique(scores):
+        tied = paged[scores == score]
+        assert (np.diff(tied) > 0).all()
+
+
+def test_top_k_matches_full_ordering():
+    ranker, hotel_index = _ranker(seed=1)
+    rows = hotel_index.select("Manali", 1500, None)
+    scores = ranker.scores(rows)
+    expected = rows[np.lexsort((rows, -scores))]
+    for k in (1, 5, 37, len(rows), len(rows) + 3):
+        assert (ranker.top_k(rows, k) == expected[:k]).all()
+
+
+def test_amenity_term_scores_the_match_with_the_selected_amenities():
+    df = pd.DataFrame({
+        "Destination": "Manali",
+        "Hotel Name": ["Many", "Pool only", "Pool and spa", "Neither"],
+        "Ratings": 4.0,
+        "Price": 1000.0,
+        # The first hotel has the most amenities but not the ones asked for
+        "Amenities": ["Wi-Fi, Parking, Gym, Bar", "Pool", "Pool, Spa", "Wi-Fi"],
+        "sentiment_score": 0.5,
+    })
+    ranker = HotelRanker(df, HotelIndex(df), AmenityCatalogue(df["Amenities"]))
+    rows = np.arange(4)
+    weights = {"sentiment": 0, "ratings": 0, "price": 0, "amenities": 1}
+    assert list(ranker.scores(rows, weights, amenities=["pool", "SPA"])) == [0.0, 0.5, 1.0, 0.0]
+    assert list(ranker.top_k(rows, 2, weights, destination="Manali", amenities=["Pool", "Spa"])) == [2, 1]
+    # With nothing selected, more amenities rank higher
+    assert list(ranker.top_k(rows, 2, weights, destination="Manali")) == [0, 2]
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import RecommendationEngine
+from reload import DatasetReloader
+from similar_hotels import SimilarHotels
+from store import HotelStore
+
+
+# A new version of the catalogue: removals, a reorder, price and amenity edits (including a
+# respelling and an amenity no hotel had) and added hotels
+def _next_version(hotels):
+    rng = np.random.default_rng(1)
+    df = hotels.drop(index=rng.choice(len(hotels), 60, replace=False))
+    df = df.sample(frac=1, random_state=2).reset_index(drop=True)
+    edited = rng.choice(len(df), 80, replace=False)
+    df.loc[edited[:30], "Price"] += 250
+    df.loc[edited[30:55], "Amenities"] = "WIFI, Sauna"
+    df.loc[edited[55:], "Ratings"] += 0.05
+    added = hotels.iloc[:40].copy()
+    added["Hotel Name"] = added["Hotel Name"] + " Annex"
+    df = pd.concat([df, added], ignore_index=True)
+    df.attrs["snapshot_version"] = "test-2"
+    return df
+
+
+def test_diff_counts_every_kind_of_change(hotels):
+    store = HotelStore(_next_version(hotels), previous=HotelStore(hotels))
+    assert store.diff.summary() == {"added": 40, "removed": 60, "changed": 80, "unchanged": len(hotels) - 140}
+
+
+def test_incremental_store_equals_a_fresh_build(hotels):
+    previous = RecommendationEngine(HotelStore(hotels))
+    df = _next_version(hotels)
+    incremental = previous.updated(HotelStore(df, previous=previous.store))
+    fresh = RecommendationEngine(HotelStore(df))
+    assert incremental.store.diff is not None
+
+    catalogue, expected = incremental.store.amenity_catalogue, fresh.store.amenity_catalogue
+    assert "Sauna" in expected.names
+    assert catalogue.names == expected.names
+    assert np.array_equal(catalogue.masks, expected.masks)
+
+    index, expected = incremental.store.name_index, fresh.store.name_index
+    for field in ("vocabulary", "offsets", "postings", "gram_counts"):
+        assert np.array_equal(getattr(index, field), getattr(expected, field)), field
+
+    assert np.array_equal(incremental.geo_index.lats, fresh.geo_index.lats)
+    assert np.array_equal(incremental.geo_index.lons, fresh.geo_index.lons)
+    assert np.array_equal(incremental.store.ranker.features, fresh.store.ranker.features)
+    assert np.array_equal(incremental.store.ranker.valid, fresh.store.ranker.valid)
+
+
+def test_similar_lists_follow_unchanged_hotels():
+    neighbours = np.array([[1, 2, 3], [0, 2, -1], [3, 1, 0], [2, 0, 1]], dtype=np.int32)
+    scores = np.array([[.9, .8, .7], [.9, .5, 0], [.6, .5, .4], [.9, .8, .7]], dtype=np.float32)
+    # New rows: old 3, old 0, an added hotel, old 2 (changed); old 1 was removed
+    remapped = SimilarHotels(neighbours, scores).remapped(np.array([3, 0, -1, -1]), np.array([1, -1, 3, 0]))
+    assert remapped.neighbours.tolist() == [[3, 1, -1], [3, 0, -1], [-1, -1, -1], [-1, -1, -1]]
+    assert remapped.scores[1].tolist() == pytest.approx([0.8, 0.7, 0.0])
+    assert len(remapped.of(2)[0]) == 0
+
+
+def test_reloader_swaps_in_the_changed_workbook(hotels, tmp_path):
+    from synthetic_dataset import write_dataset
+    from snapshot import load_dataset
+
+    path = str(tmp_path / "hotels.xlsx")
+    write_dataset(hotels.iloc[:300], path)
+    engine = RecommendationEngine(HotelStore(load_dataset(path), path))
+    reloader = DatasetReloader(engine, path, interval=0)
+    assert not reloader.reload()
+
+    swapped = []
+    reloader.on_reload(swapped.append)
+    write_dataset(_next_version(hotels.iloc[:300]), path)
+    assert reloader.reload()
+    assert swapped == [reloader.engine]
+    assert reloader.engine is not engine and reloader.engine.store.version != engine.store.version
+    assert reloader.status()["last_reload"]["added"] == 40
+    # The old engine is left as it was for requests still using it
+    assert len(engine.store.df) == 300
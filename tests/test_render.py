@@ -0,0 +1,44 @@
+import pandas as pd
+
+from render import SEPARATOR, clear_fragment_caches, fragment_cache_info, render_card_list, render_weather
+
+
+def _hotels():
+    return pd.DataFrame({
+        "Hotel Name": ["Pine <Inn>", "Snow View", "Cedar Lodge", "River Stay"],
+        "Destination": "Manali",
+        "Price": [1500.0, 2500.0, 3500.0, 4500.0],
+        "Ratings": [4.5, 4.0, 3.5, 5.0],
+        "sentiment_score": [0.9, 0.65, 0.4, 0.75],
+    })
+
+
+def test_card_list_is_one_compact_fragment_with_ranks():
+    html = render_card_list(_hotels())
+    cards = html.split(SEPARATOR)
+    assert len(cards) == 4
+    # No line breaks, so Markdown can't turn an indented line into a code block
+    assert "\n" not in html
+    assert cards[0].count("🥇") == 1 and "🥉" in cards[2] and "🥇" not in cards[3] and "🥉" not in cards[3]
+    assert "Pine &lt;Inn&gt;" in cards[0] and "₹1,500" in cards[0]
+    # A later page continues the numbering, so it gets no medals
+    assert "🥇" not in render_card_list(_hotels().head(1), first_rank=5)
+
+
+def test_cards_are_cached_by_the_values_they_show():
+    clear_fragment_caches()
+    hotels = _hotels()
+    render_card_list(hotels)
+    render_card_list(hotels)
+    assert fragment_cache_info()["cards"]["hits"] == 4
+    # A changed row renders afresh
+    hotels.loc[0, "Price"] = 999.0
+    assert "₹999" in render_card_list(hotels)
+    assert fragment_cache_info()["cards"]["misses"] == 5
+
+
+def test_weather_panel_escapes_values_and_skips_a_missing_icon():
+    html = render_weather("Manali", {"Error": "Failed <timeout>"}, None)
+    assert "Failed &lt;timeout&gt;" in html and "<img" not in html
+    assert 'src="https://example.com/01d.png"' in render_weather("Manali", {"Temperature": "5°C"},
+                                                                  "https://example.com/01d.png")
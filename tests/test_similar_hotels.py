@@ -0,0 +1,36 @@
+import numpy as np
+
+from similar_hotels import SimilarHotels, compute_neighbours, feature_matrix, save_neighbours
+
+
+def test_neighbours_are_the_most_similar_hotels_of_the_same_destination(hotels):
+    df = hotels.head(300)
+    neighbours, scores = compute_neighbours(df, n=5)
+    features = feature_matrix(df)
+    similarity = (features @ features.T).toarray()
+    destinations = df["Destination"].astype(str).to_numpy()
+    for row in range(0, len(df), 37):
+        found = neighbours[row][neighbours[row] >= 0]
+        assert row not in found and (destinations[found] == destinations[row]).all()
+        assert (np.diff(scores[row]) <= 1e-6).all()
+        # Nothing left out of the same destination is more similar than the last one kept
+        others = np.flatnonzero((destinations == destinations[row]) & ~np.isin(np.arange(len(df)), [row, *found]))
+        assert similarity[row, others].max() <= scores[row, -1] + 1e-5
+        assert np.allclose(similarity[row, found], scores[row], atol=1e-5)
+
+
+def test_chunked_computation_gives_the_same_lists(hotels):
+    df = hotels.head(300)
+    whole = compute_neighbours(df, n=5)
+    # A block budget far below one row's similarities processes one hotel at a time
+    chunked = compute_neighbours(df, n=5, chunk_bytes=1)
+    assert (whole[0] == chunked[0]).all() and np.allclose(whole[1], chunked[1])
+
+
+def test_saved_lists_are_ignored_for_another_dataset_version(hotels, tmp_path):
+    neighbours, scores = compute_neighbours(hotels.head(50), n=3)
+    path = str(tmp_path / "Dataset.similar.npz")
+    save_neighbours(path, neighbours, scores, "v1")
+    rows, similarity = SimilarHotels.load(path, "v1").of(0, n=3)
+    assert list(rows) == list(neighbours[0][neighbours[0] >= 0]) and len(similarity) == len(rows)
+    assert SimilarHotels.load(path, "v2") is None
@@ -0,0 +1,25 @@
+import logging
+import os
+
+from snapshot import load_dataset, snapshot_path_for
+
+
+def test_columns_arrow_cannot_type_load_without_a_snapshot(hotels, tmp_path, caplog):
+    path = str(tmp_path / "Dataset.xlsx")
+    workbook = hotels.head(20).copy()
+    # An edited workbook column holding both numbers and text
+    workbook["Notes"] = [7 if i % 2 else "renovated" for i in range(len(workbook))]
+    workbook.to_excel(path, index=False)
+    with caplog.at_level(logging.WARNING, logger="yaatrimitra.snapshot"):
+        df = load_dataset(path)
+    assert len(df) == 20 and df.attrs["snapshot_version"].endswith("-xlsx")
+    assert not os.path.exists(snapshot_path_for(path))
+    assert "without a snapshot" in caplog.text
+
+
+def test_snapshot_is_written_and_reused(hotels, tmp_path):
+    path = str(tmp_path / "Dataset.xlsx")
+    hotels.head(20).to_excel(path, index=False)
+    version = load_dataset(path).attrs["snapshot_version"]
+    assert os.path.exists(snapshot_path_for(path))
+    assert load_dataset(path).attrs["snapshot_version"] == version
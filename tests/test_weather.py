@@ -0,0 +1,112 @@
+import pytest
+
+import weather
+from stub_server import start_stub_server, weather_base_url
+from weather import WeatherClient, WeatherPrefetcher
+
+
+class FakeClient:
+    def __init__(self):
+        self.fetched = []
+
+    def fetch(self, city):
+        self.fetched.append(city)
+
+    def cached_entry(self, city):
+        return None
+
+
+def test_set_cities_retargets_the_prefetcher():
+    client = FakeClient()
+    prefetcher = WeatherPrefetcher(client, ["Manali", "Goa"])
+    assert prefetcher.run_once() == 2
+    prefetcher.set_cities(["Goa", "Leh"])
+    # Goa keeps its schedule, Leh is due straight away and Manali is no longer refreshed
+    assert prefetcher.run_once() == 1
+    assert client.fetched == ["Manali", "Goa", "Leh"]
+    assert set(prefetcher.metrics()) == {"Goa", "Leh"}
+
+
+# Stands in for the time module in weather.py, so tests can move past TTLs
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(weather, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def stub():
+    server = start_stub_server()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_one_upstream_call_per_city_within_the_ttl(stub, clock):
+    client = WeatherClient(base_url=weather_base_url(stub), ttl=600)
+    first = client.get("Manali")
+    clock.now += 599
+    assert client.get("Manali") == first and first[1] is not None
+    client.get("Goa")
+    assert stub.request_count == 2
+
+
+def test_expired_readings_are_fetched_again(stub, clock):
+    client = WeatherClient(base_url=weather_base_url(stub), ttl=600)
+    client.get("Manali")
+    clock.now += 601
+    client.get("Manali")
+    assert stub.request_count == 2
+
+
+def test_least_recently_used_city_is_evicted(stub, clock):
+    client = WeatherClient(base_url=weather_base_url(stub), max_entries=2)
+    for city in ("Manali", "Goa", "Manali", "Leh"):
+        client.get(city)
+    assert stub.request_count == 3
+    # Goa was the least recently used of the two kept, so it is fetched again; Manali is not
+    client.get("Manali")
+    client.get("Goa")
+    assert stub.request_count == 4
+
+
+def test_disk_tier_is_shared_between_clients(stub, clock, tmp_path):
+    WeatherClient(base_url=weather_base_url(stub), cache_dir=str(tmp_path)).get("Manali")
+    reading = WeatherClient(base_url=weather_base_url(stub), cache_dir=str(tmp_path)).get("Manali")
+    assert stub.request_count == 1 and reading[1] is not None
+
+
+def test_upstream_errors_serve_the_last_good_reading(stub, clock):
+    client = WeatherClient(base_url=weather_base_url(stub), ttl=600)
+    good = client.get("Manali")
+    clock.now += 601
+    stub.fail_status = 503
+    assert client.get("Manali") == good
+    # The failure is remembered, so upstream isn't asked again straight away
+    assert client.get("Manali") == good
+    assert stub.request_count == 2
+    # Without an earlier reading the error is shown
+    assert "Error" in client.get("Goa")[0]
+
+
+def test_readings_past_the_staleness_limit_are_not_served(stub, clock):
+    client = WeatherClient(base_url=weather_base_url(stub), ttl=600, max_stale=3600)
+    good = client.get("Manali")
+    client.serve_stale = True
+    clock.now += 1800
+    # While the prefetcher runs, an expired reading is served without waiting on upstream...
+    assert client.get("Manali") == good and stub.request_count == 1
+    clock.now += 1800
+    # ...but once it is past max_stale the client fetches again, and shows an error if that fails
+    stub.fail_status = 503
+    assert "Error" in client.get("Manali")[0]
+    assert stub.request_count == 2
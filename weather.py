@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import count, timed
+
+# Upstream API; point OPENWEATHER_BASE_URL at stub_server.py for tests and benchmarks
+OPENWEATHER_BASE_URL = os.environ.get("OPENWEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5")
+OPENWEATHER_API_KEY = os.environ.get("OPENWEATHER_API_KEY", "7a2bc514b43fc8dc820ae1566673cf29")
+
+# Seconds a reading is served without refreshing
+WEATHER_TTL = int(os.environ.get("WEATHER_TTL", "600"))
+# Oldest reading, in seconds, served in place of a fresh one while the prefetcher revalidates or
+# upstream fails; past it the page shows an error instead of weather from days ago
+WEATHER_MAX_STALE = int(os.environ.get("WEATHER_MAX_STALE", str(6 * WEATHER_TTL)))
+# Seconds an upstream failure is remembered before retrying (when no stale reading exists)
+ERROR_TTL = 60
+# (connect, read) timeouts in seconds
+WEATHER_TIMEOUT = (3.05, 5)
+# Seconds between background refreshes of each city; well inside the TTL so readings never expire
+PREFETCH_INTERVAL = int(os.environ.get("WEATHER_PREFETCH_INTERVAL", str(WEATHER_TTL // 2)))
+# Longest wait between retries for a city that keeps failing
+PREFETCH_MAX_BACKOFF = 900
+
+
+# Raised when the API answers but has no reading for the city
+class WeatherUnavailable(Exception):
+    pass
+
+
+# Turn an OpenWeatherMap response into the (weather, icon_url) pair the page renders
+def parse_weather(response):
+    weather = {
+        "Temperature": f"{response['main']['temp']}°C",
+        "Condition": response["weather"][0]["description"].capitalize(),
+        "Humidity": f"{response['main']['humidity']}%",
+        "Wind Speed": f"{response['wind']['speed']} m/s"
+    }
+    # Get weather icon
+    icon_code = response["weather"][0]["icon"]
+    weather_icon = f"https://openweathermap.org/img/wn/{icon_code}@2x.png"
+    return weather, weather_icon
+
+
+# Weather client with a pooled session, strict timeouts and a per-city TTL cache.
+# Readings live in an in-memory LRU and, when cache_dir is set, in JSON files other processes can share.
+class WeatherClient:
+    def __init__(self, base_url=OPENWEATHER_BASE_URL, api_key=OPENWEATHER_API_KEY, ttl=WEATHER_TTL,
+                 max_entries=256, cache_dir=None, timeout=WEATHER_TIMEOUT, pool_size=10, max_stale=WEATHER_MAX_STALE):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Set by WeatherPrefetcher: expired readings are served as-is while it revalidates them
+        self.serve_stale = False
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # Weather for a city as (weather, icon_url); never raises
+    def get(self, city):
+        entry = self.cached_entry(city)
+        if entry is not None and not self._is_fresh(entry) and self.cache_dir:
+            # Another process may already have refreshed it
+            shared = self._read_disk(city)
+            if shared is not None and shared["fetched_at"] > entry["fetched_at"]:
+                self._remember(city, shared)
+                entry = shared
+        if entry is not None and self._is_fresh(entry):
+            count("cache_requests_total", cache="weather", result="hit")
+            return entry["weather"], entry["icon"]
+        if entry is not None and self.serve_stale and self._servable(entry):
+            count("cache_requests_total", cache="weather", result="stale")
+            count("weather_stale_served_total", reason="revalidating")
+            return entry["weather"], entry["icon"]
+        count("cache_requests_total", cache="weather", result="miss")
+        return self.refresh(city, stale=entry)
+
+    # Fetch from upstream and cache; on failure fall back to the last good reading
+    def refresh(self, city, stale=None):
+        stale = stale or self.cached_entry(city)
+        try:
+            return self.fetch(city)
+        except WeatherUnavailable:
+            return self._failed(city, stale, "Weather data not available")
+        except Exception as e:
+            return self._failed(city, stale, f"Failed to fetch data: {str(e)}")
+
+    # Fetch from upstream and cache; raises on any failure
+    def fetch(self, city):
+        count("external_requests_total", service="openweathermap")
+        try:
+            with timed("weather_request"):
+                response = self.session.get(
+                    f"{self.base_url}/weather",
+                    params={"q": city, "appid": self.api_key, "units": "metric"},
+                    timeout=self.timeout,
+                ).json()
+        except Exception:
+            count("external_errors_total", service="openweathermap")
+            raise
+        if response.get("cod") != 200:
+            raise WeatherUnavailable(city)
+        weather, icon = parse_weather(response)
+        self._store(city, {"fetched_at": time.time(), "weather": weather, "icon": icon})
+        return weather, icon
+
+    def _failed(self, city, stale, message):
+        if stale is not None and self._servable(stale):
+            # Stale but valid beats an error card; hold off retrying for a while
+            count("weather_stale_served_total", reason="upstream_error")
+            self._remember(city, {**stale, "retry_at": time.time() + ERROR_TTL})
+            return stale["weather"], stale["icon"]
+        # Remember the failure briefly so every rerun doesn't hit upstream again
+        self._store(city, {"fetched_at": time.time(), "error": True,
+                           "weather": {"Error": message}, "icon": None}, persist=False)
+        return {"Error": message}, None
+
+    # Cached entry for a city from memory, then disk; None if never fetched
+    def cached_entry(self, city):
+        with self._lock:
+            entry = self._entries.get(city)
+            if entry is not None:
+                self._entries.move_to_end(city)
+                return entry
+        entry = self._read_disk(city)
+        if entry is not None:
+            self._remember(city, entry)
+        return entry
+
+    # A good reading young enough to stand in for a fresh one
+    def _servable(self, entry):
+        return not entry.get("error") and time.time() - entry["fetched_at"] < self.max_stale
+
+    def _is_fresh(self, entry):
+        if entry.get("retry_at", 0) > time.time():
+            return True
+        ttl = ERROR_TTL if entry.get("error") else self.ttl
+        return time.time() - entry["fetched_at"] < ttl
+
+    def _remember(self, city, entry):
+        with self._lock:
+            self._entries[city] = entry
+            self._entries.move_to_end(city)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _store(self, city, entry, persist=True):
+        self._remember(city, entry)
+        if persist and self.cache_dir:
+            self._write_disk(city, entry)
+
+    def _disk_path(self, city):
+        return os.path.join(self.cache_dir, hashlib.sha1(city.encode()).hexdigest() + ".json")
+
+    def _read_disk(self, city):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(city), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, city, entry):
+        path = self._disk_path(city)
+        tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+# Background stale-while-revalidate refresher that keeps every destination's weather warm.
+# One per server process; page renders then read from the client's cache and never wait on the API.
+class WeatherPrefetcher:
+    def __init__(self, client, cities, interval=PREFETCH_INTERVAL, jitter=0.1, max_concurrency=4,
+                 max_backoff=PREFETCH_MAX_BACKOFF):
+        self.client = client
+        self.cities = list(cities)
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="weather-prefetch")
+        self._next_due = {city: 0.0 for city in self.cities}
+        self._failures = {city: 0 for city in self.cities}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.client.serve_stale = True
+        self._thread = threading.Thread(target=self._run, name="weather-prefetcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=False)
+        self.client.serve_stale = False
+
+    # Change the cities kept warm, e.g. after a dataset reload; cities already tracked keep their schedule
+    def set_cities(self, cities):
+        with self._lock:
+            self.cities = list(cities)
+            self._next_due = {city: self._next_due.get(city, 0.0) for city in self.cities}
+            self._failures = {city: self._failures.get(city, 0) for city in self.cities}
+
+    # Refresh every city that is due now; returns the number refreshed successfully
+    def run_once(self):
+        now = time.time()
+        with self._lock:
+            due = [city for city in self.cities if self._next_due[city] <= now]
+        return sum(self._executor.map(self._refresh, due))
+
+    # Per-city freshness: age of the cached reading, consecutive failures and time to next refresh
+    def metrics(self):
+        now = time.time()
+        with self._lock:
+            schedule = {city: (self._failures[city], self._next_due[city]) for city in self.cities}
+        metrics = {}
+        for city, (failures, next_due) in schedule.items():
+            entry = self.client.cached_entry(city)
+            valid = entry is not None and not entry.get("error")
+            metrics[city] = {
+                "age_seconds": now - entry["fetched_at"] if valid else None,
+                "failures": failures,
+                "next_refresh_in": max(0.0, next_due - now),
+            }
+        return metrics
+
+    def _refresh(self, city):
+        try:
+            self.client.fetch(city)
+        except Exception:
+            with self._lock:
+                if city not in self._failures:
+                    # Dropped by set_cities while it was being fetched
+                    return False
+                self._failures[city] += 1
+                # Exponential backoff, capped, so a dead upstream isn't hammered
+                delay = min(self.interval * 2 ** (self._failures[city] - 1) / 4, self.max_backoff)
+                self._next_due[city] = time.time() + delay
+            return False
+        with self._lock:
+            if city not in self._failures:
+                return True
+            self._failures[city] = 0
+            self._next_due[city] = time.time() + self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            with self._lock:
+                wait = min(self._next_due.values(), default=time.time() + self.interval) - time.time()
+            self._stop.wait(max(wait, 1.0))